@@ -0,0 +1,105 @@
+"""
+Compare un backtest à un pas écrit comme l'étape 9 du notebook répétée à
+chaque origine (MCO, ARMA, EWMA et AR-GARCH réestimés à chaque date)
+contre scripts.backtest. Les prévisions sont vérifiées identiques avec une
+réestimation à chaque origine, puis le moteur est chronométré avec une
+réestimation tous les 12 mois, pour un secteur et pour les huit secteurs.
+
+    python -m benchmarks.bench_backtest --n-mois 300 --n-train 60
+"""
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from arch import arch_model
+from statsmodels.regression.linear_model import OLS
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from scripts.backtest import backtest_sectors, backtest_series
+from scripts.parametres import CORRESPONDANCES
+
+
+def boucle_notebook(y, x, p, q, n_train):
+    """ Modèles de l'étape 9 réestimés à chaque origine, en fenêtre croissante. """
+    previsions = {"Réel": [], "MCO": [], "ARMA": [], "EWMA": [], "GARCH": [], "Naïf": []}
+    for t in range(n_train, len(y)):
+        train = y[:t]
+        model_mco_pred = OLS(train, sm.add_constant(x[:t])).fit()
+        previsions["MCO"].append(model_mco_pred.params[0] + model_mco_pred.params[1] * x[t])
+        previsions["ARMA"].append(ARIMA(train, order=(p, 0, q)).fit().forecast(steps=1)[0])
+
+        ewma_model = ExponentialSmoothing(train, trend=None, seasonal=None).fit()
+        previsions["EWMA"].append(ewma_model.forecast(1)[0])
+
+        moyenne = {"mean": "AR", "lags": p} if p > 0 else {"mean": "Constant"}
+        garch_fit_train = arch_model(train * 100, vol="GARCH", p=1, q=1, **moyenne).fit(disp="off")
+        previsions["GARCH"].append(garch_fit_train.forecast(horizon=1, reindex=False).mean.values[-1, 0] / 100)
+        previsions["Naïf"].append(train[-1])
+        previsions["Réel"].append(y[t])
+    return pd.DataFrame(previsions)
+
+
+def donnees_synthetiques(n_mois=300, graine=0):
+    """ Rendements ARMA(1,1) liés à la croissance des brevets, un couple par secteur. """
+    rng = np.random.default_rng(graine)
+    donnees = {}
+    for secteur in CORRESPONDANCES:
+        x = rng.normal(0, 0.3, n_mois)
+        bruit = rng.normal(0, 0.05, n_mois)
+        y = 0.003 + 0.02 * x + bruit
+        y[1:] += 0.3 * bruit[:-1]
+        donnees[secteur] = (pd.Series(y), pd.Series(x), 1, 1)
+    return donnees
+
+
+def executer(n_mois=300, n_train=60, refit_every=12, n_workers=None):
+    """ Retourne les durées du backtest par boucle et par le moteur. """
+    n_workers = n_workers or min(len(CORRESPONDANCES), os.cpu_count() or 1)
+    donnees = donnees_synthetiques(n_mois)
+    y, x, p, q = donnees["auto"]
+
+    debut = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        attendu = boucle_notebook(y.to_numpy(), x.to_numpy(), p, q, n_train)
+    duree_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    obtenu = backtest_series(y, x, p, q, n_train=n_train, refit_every=1)
+    duree_moteur_1 = time.perf_counter() - debut
+    pd.testing.assert_frame_equal(obtenu.reset_index(drop=True), attendu, rtol=1e-6)
+
+    debut = time.perf_counter()
+    backtest_series(y, x, p, q, n_train=n_train, refit_every=refit_every)
+    duree_moteur_k = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    _, scores, tests = backtest_sectors(donnees, n_train=n_train, refit_every=refit_every,
+                                        n_workers=n_workers)
+    duree_secteurs = time.perf_counter() - debut
+    return {"n_origines": n_mois - n_train, "n_secteurs": len(donnees), "n_workers": n_workers,
+            "refit_every": refit_every, "boucle_s": duree_boucle, "moteur_refit_1_s": duree_moteur_1,
+            "moteur_refit_k_s": duree_moteur_k, "secteurs_s": duree_secteurs,
+            "scores": scores, "tests": tests}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-mois", type=int, default=300)
+    parser.add_argument("--n-train", type=int, default=60)
+    parser.add_argument("--refit-every", type=int, default=12)
+    parser.add_argument("--n-workers", type=int, default=None)
+    args = parser.parse_args()
+    res = executer(args.n_mois, args.n_train, args.refit_every, args.n_workers)
+    print(f"{res['n_origines']} origines par secteur")
+    print(f"boucle (un secteur)                       {res['boucle_s']:7.2f} s")
+    print(f"moteur, réestimation à chaque origine     {res['moteur_refit_1_s']:7.2f} s")
+    print(f"moteur, réestimation tous les {res['refit_every']:<3} mois    {res['moteur_refit_k_s']:7.2f} s")
+    print(f"{res['n_secteurs']} secteurs, {res['n_workers']} processus               {res['secteurs_s']:7.2f} s")
+    print(res["scores"][res["scores"]["Secteur"] == "auto"].to_string(index=False))
+    print(res["tests"][res["tests"]["Secteur"] == "auto"].to_string(index=False))
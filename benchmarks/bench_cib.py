@@ -0,0 +1,113 @@
+"""
+Compare les agrégations CIB du notebook (un str.extract + melt par niveau,
+puis un isin par secteur) contre scripts.cib (codes parsés une seule fois,
+comptage des secteurs en une passe).
+
+    python -m benchmarks.bench_cib --n 500000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.cib import CLASSIFICATION_COLUMNS, build_base_finale, count_all_levels, parse_ipc
+from scripts.cib import sector_monthly_counts
+from scripts.parametres import SECTEURS
+
+MOTIFS_NIVEAUX = {"section": r"^\s*([A-H])", "classe": r"^([A-Z]\d{2})",
+                  "sous_classe": r"^([A-Z]\d{2}[A-Z])"}
+
+
+def stats_class_notebook(data, motif):
+    """ Cellules stats_class1/3/4 du notebook. """
+    brevets = data.copy()
+    for col in CLASSIFICATION_COLUMNS:
+        brevets[col] = brevets[col].str.extract(motif)
+    brevets_long = brevets.melt(id_vars=["doc-number", "year"], value_vars=CLASSIFICATION_COLUMNS,
+                                value_name="classification")
+    brevets_long = brevets_long.dropna(subset=["classification"])
+    brevets_long = brevets_long.drop_duplicates(subset=["doc-number", "year", "classification"])
+    return brevets_long.groupby(["classification", "year"]).size().reset_index(name="nombre")
+
+
+def base_finale_notebook(data, secteurs):
+    """ Cellule base_finale du notebook. """
+    brevets_prep = data.copy()
+    for col in CLASSIFICATION_COLUMNS:
+        brevets_prep[col] = brevets_prep[col].str.extract(r"^([A-Z]\d{2}[A-Z]?)")
+    brevets_long = brevets_prep.melt(id_vars=["doc-number", "publication_date"],
+                                     value_vars=CLASSIFICATION_COLUMNS, value_name="classification")
+    brevets_long = brevets_long.drop_duplicates(subset=["doc-number", "classification"])
+    brevets_long["publication_date"] = pd.to_datetime(brevets_long["publication_date"])
+    brevets_long["mois"] = brevets_long["publication_date"].dt.to_period("M")
+
+    stats_secteurs = {}
+    for nom_secteur, classifications in secteurs.items():
+        data_filtre = brevets_long[brevets_long["classification"].isin(classifications)]
+        stats = data_filtre.groupby("mois").size().reset_index(name="nombre_brevets")
+        stats.columns = ["mois", f"brevets_{nom_secteur}"]
+        stats_secteurs[nom_secteur] = stats
+    noms = list(secteurs)
+    base_finale = stats_secteurs[noms[0]].copy()
+    for nom_secteur in noms[1:]:
+        base_finale = base_finale.merge(stats_secteurs[nom_secteur], on="mois", how="outer")
+    base_finale["mois"] = base_finale["mois"].astype(str)
+    base_finale["date"] = pd.to_datetime(base_finale["mois"] + "-01", format="%Y-%m-%d")
+    base_finale = base_finale.sort_values("date").reset_index(drop=True)
+    colonnes_brevets = [col for col in base_finale.columns if col.startswith("brevets_")]
+    base_finale[colonnes_brevets] = base_finale[colonnes_brevets].fillna(0)
+    for col in colonnes_brevets:
+        base_finale[f"croiss_log_{col}"] = np.log(base_finale[col] / base_finale[col].shift(1))
+        base_finale[f"croiss_log_{col}"] = base_finale[f"croiss_log_{col}"].replace([np.inf, -np.inf], np.nan)
+    return base_finale
+
+
+def corpus(n, graine=0):
+    """ Brevets avec jusqu'à trois codes CIB au format INPI ("B60R  16/023 ..."). """
+    rng = np.random.default_rng(graine)
+    codes_secteurs = sorted({c for codes in SECTEURS.values() for c in codes if len(c) == 4})
+    autres = [f"{s}{k:02d}{l}" for s in "ABCDEFGH" for k in range(1, 100, 7) for l in "BDFHKMN"]
+    sous_classes = np.array(codes_secteurs + autres, dtype=object)
+    textes = np.array([f"{c}{rng.integers(1, 99):4d}/{rng.integers(0, 99):02d}" for c in sous_classes
+                       for _ in range(3)], dtype=object)
+    dates = pd.to_datetime("2017-01-01") + pd.to_timedelta(rng.integers(0, 2900, n), unit="D")
+    df = pd.DataFrame({"doc-number": np.arange(3000000, 3000000 + n).astype(str),
+                       "publication_date": dates, "year": dates.year.astype(str)})
+    for k, col in enumerate(CLASSIFICATION_COLUMNS):
+        valeurs = textes[rng.integers(0, len(textes), n)]
+        valeurs[rng.random(n) < 0.2 * (k + 1)] = None
+        df[col] = pd.array(valeurs, dtype="string")
+    return df
+
+
+def executer(n=500000):
+    """ Retourne les durées du notebook et du module, après vérification des résultats. """
+    data = corpus(n)
+
+    debut = time.perf_counter()
+    attendu = {niveau: stats_class_notebook(data, motif) for niveau, motif in MOTIFS_NIVEAUX.items()}
+    attendu["base_finale"] = base_finale_notebook(data, SECTEURS)
+    duree_notebook = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    long = parse_ipc(data)
+    obtenu = count_all_levels(long)
+    obtenu["base_finale"] = build_base_finale(sector_monthly_counts(long, SECTEURS))
+    duree_module = time.perf_counter() - debut
+
+    for cle, df in attendu.items():
+        # Les comptes du notebook passent en flottants quand un secteur manque un mois
+        pd.testing.assert_frame_equal(obtenu[cle], df, check_dtype=False)
+    return {"n_brevets": n, "notebook_s": duree_notebook, "module_s": duree_module}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=500000)
+    args = parser.parse_args()
+    res = executer(args.n)
+    print(f"{res['n_brevets']} brevets")
+    print(f"notebook      {res['notebook_s']:7.2f} s")
+    print(f"scripts.cib   {res['module_s']:7.2f} s")
+    print(f"accélération x{res['notebook_s'] / res['module_s']:.1f}")
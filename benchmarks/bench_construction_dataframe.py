@@ -0,0 +1,71 @@
+"""
+Compare la construction du DataFrame des brevets : un DataFrame d'une ligne
+par XML puis pd.concat (chemin historique) contre un seul build colonne par colonne.
+
+    python -m benchmarks.bench_construction_dataframe --n 100000
+
+Les enregistrements proviennent de XML synthétiques déjà parsés, pour isoler
+le coût de construction (hors parsing).
+"""
+import argparse
+import io
+import multiprocessing
+import random
+import resource
+import time
+
+import pandas as pd
+
+from benchmarks.synthetique import generer_xml_brevet
+from scripts.importation import build_brevets_dataframe, extract_brevet_record
+
+
+def _historique(records):
+    # Ancienne sentinelle "NA" et un DataFrame par enregistrement
+    frames = [pd.DataFrame([{k: ("NA" if v is None else v) for k, v in r.items()}])
+              for r in records]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _mesurer(nom, n, n_distincts, file_resultat):
+    rng = random.Random(0)
+    modeles = [extract_brevet_record(io.BytesIO(generer_xml_brevet(rng, 3000000 + k)))
+               for k in range(n_distincts)]
+    records = [dict(modeles[k % n_distincts]) for k in range(n)]
+    fonction = _historique if nom == "historique" else build_brevets_dataframe
+    rss_initial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    debut = time.perf_counter()
+    df = fonction(records)
+    duree = time.perf_counter() - debut
+    rss_pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    file_resultat.put({"duree_s": duree, "rss_supplementaire_mo": (rss_pic - rss_initial) / 1024,
+                       "memoire_df_mo": df.memory_usage(deep=True).sum() / 1024 / 1024})
+
+
+def executer(n=100000, n_distincts=500):
+    """
+    Retourne durée, pic de RSS au-dessus de l'état initial et taille du
+    DataFrame (Mo) des deux constructions, chacune dans un processus neuf.
+    """
+    contexte = multiprocessing.get_context("spawn")
+    resultats = {"n_enregistrements": n}
+    for nom in ("historique", "colonnes"):
+        file_resultat = contexte.Queue()
+        processus = contexte.Process(target=_mesurer, args=(nom, n, n_distincts, file_resultat))
+        processus.start()
+        resultats[nom] = file_resultat.get()
+        processus.join()
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100000)
+    args = parser.parse_args()
+    res = executer(args.n)
+    print(f"{res['n_enregistrements']} enregistrements")
+    for nom in ("historique", "colonnes"):
+        r = res[nom]
+        print(f"{nom:<11} {r['duree_s']:8.2f} s  pic RSS +{r['rss_supplementaire_mo']:6.0f} Mo  "
+              f"DataFrame {r['memoire_df_mo']:6.0f} Mo")
+    print(f"accélération x{res['historique']['duree_s'] / res['colonnes']['duree_s']:.0f}")
@@ -0,0 +1,105 @@
+"""
+Compare le chargement des brevets pour l'analyse : lecture complète du
+parquet monolithique puis suppression de colonnes et filtrage en pandas,
+contre load_brevets sur le dataset partitionné (colonnes et filtres poussés).
+
+    python -m benchmarks.bench_dataset_partitionne --n 200000
+
+Les octets lus sont comptés au niveau du système de fichiers, comme le
+ferait la facturation d'un stockage S3.
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+
+from benchmarks.synthetique import generer_xml_brevet
+from scripts.dataset import ANALYSIS_COLUMNS, load_brevets, write_brevets_dataset
+from scripts.importation import build_brevets_dataframe, extract_brevet_record
+
+FILTRES = [("kind", "not in", ["B1", "A3"]), ("publication_year", ">=", 2017)]
+
+
+class ComptageFileSystem(LocalFileSystem):
+    """ Système de fichiers local qui compte les octets lus. """
+
+    octets_lus = 0
+
+    def _open(self, path, mode="rb", **kwargs):
+        f = super()._open(path, mode, **kwargs)
+        if "r" in mode:
+            lire = f.read
+
+            def read(*args):
+                donnees = lire(*args)
+                ComptageFileSystem.octets_lus += len(donnees)
+                return donnees
+            f.read = read
+        return f
+
+
+def _corpus(n, n_distincts=2000):
+    rng = random.Random(0)
+    modeles = [extract_brevet_record(io.BytesIO(generer_xml_brevet(rng, 3000000 + k)))
+               for k in range(n_distincts)]
+    records = []
+    for k in range(n):
+        record = dict(modeles[k % n_distincts])
+        record["doc-number"] = str(3000000 + k)
+        # Textes libres propres à chaque brevet, comme dans les bulletins réels
+        for champ in ("invention-title", "abstract"):
+            if record[champ] is not None:
+                record[champ] = f"{record[champ]} {k}"
+        record["year"] = record["publication_date"][:4]
+        records.append(record)
+    return build_brevets_dataframe(records, extra_columns=["year"])
+
+
+def _mesurer(fonction):
+    ComptageFileSystem.octets_lus = 0
+    debut = time.perf_counter()
+    df = fonction()
+    return {"duree_s": time.perf_counter() - debut, "n_lignes": len(df),
+            "mo_lus": ComptageFileSystem.octets_lus / 1024 / 1024}
+
+
+def executer(n=200000):
+    """ Retourne, pour chaque chargement, la durée, les lignes obtenues et les Mo lus. """
+    fs = ComptageFileSystem(skip_instance_cache=True)
+    df = _corpus(n)
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_parquet = os.path.join(dossier, "data_brevets.parquet")
+        chemin_dataset = os.path.join(dossier, "data_brevets")
+        with fs.open(chemin_parquet, "wb") as f:
+            df.to_parquet(f)
+        write_brevets_dataset(df, fs, chemin_dataset)
+
+        def monolithique():
+            with fs.open(chemin_parquet, "rb") as f:
+                data = pd.read_parquet(f)
+            data = data[ANALYSIS_COLUMNS]
+            return data[~data["kind"].isin(["B1", "A3"])
+                        & (data["publication_date"].dt.year >= 2017)]
+
+        resultats = {"n_brevets": n,
+                     "monolithique": _mesurer(monolithique),
+                     "partitionne": _mesurer(lambda: load_brevets(fs, chemin_dataset,
+                                                                  ANALYSIS_COLUMNS, FILTRES))}
+    assert resultats["monolithique"]["n_lignes"] == resultats["partitionne"]["n_lignes"]
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200000)
+    args = parser.parse_args()
+    res = executer(args.n)
+    print(f"{res['n_brevets']} brevets")
+    for nom in ("monolithique", "partitionne"):
+        r = res[nom]
+        print(f"{nom:<13} {r['duree_s']:7.2f} s  {r['n_lignes']} lignes  {r['mo_lus']:7.1f} Mo lus")
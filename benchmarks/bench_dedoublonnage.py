@@ -0,0 +1,77 @@
+"""
+Compare le dédoublonnage du notebook (deduplicate sur le titre puis sur
+l'abstract, chacun avec un tri complet) contre deduplicate_multi en une passe.
+
+    python -m benchmarks.bench_dedoublonnage --n 1000000
+
+La taille par défaut vaut environ dix fois le corpus 2017-2024.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetique import MOTS
+from scripts.cleaning import deduplicate_multi
+
+
+def deduplicate_historique(df, key):
+    """ Version par tri complet, gardée comme référence. """
+    df_sorted = df.sort_values(by=[key, "publication_date", "doc-number"],
+                               ascending=[True, False, False])
+    return df_sorted.drop_duplicates(subset=key, keep="first").sort_index()
+
+
+def corpus(n, graine=0):
+    """
+    Brevets synthétiques avec doublons de titre et d'abstract, dates et
+    numéros manquants ou égaux, comme dans la base INPI.
+    """
+    rng = np.random.default_rng(graine)
+    mots = np.array(MOTS, dtype=object)
+    n_titres = max(n // 3, 1)
+    titres = np.array([" ".join(rng.choice(mots, 6)) + f" {k}" for k in range(n_titres)],
+                      dtype=object)
+    resumes = np.array([" ".join(rng.choice(mots, 60)) + f" {k}" for k in range(n // 2)],
+                       dtype=object)
+    dates = pd.to_datetime("2017-01-01") + pd.to_timedelta(rng.integers(0, 2900, n), unit="D")
+    df = pd.DataFrame({
+        "doc-number": rng.integers(3000000, 3000000 + n, n).astype(float),
+        "publication_date": dates,
+        "invention-title": pd.array(titres[rng.integers(0, n_titres, n)], dtype="string"),
+        "abstract": pd.array(resumes[rng.integers(0, len(resumes), n)], dtype="string"),
+    })
+    df.loc[rng.random(n) < 0.01, "publication_date"] = pd.NaT
+    df.loc[rng.random(n) < 0.01, "doc-number"] = np.nan
+    return df
+
+
+def executer(n=1000000):
+    """ Retourne les durées des deux chaînes et vérifie qu'elles gardent les mêmes lignes. """
+    df = corpus(n)
+    debut = time.perf_counter()
+    attendu = deduplicate_historique(deduplicate_historique(df, "invention-title"), "abstract")
+    duree_historique = time.perf_counter() - debut
+    debut = time.perf_counter()
+    obtenu = deduplicate_multi(df, ["invention-title", "abstract"])
+    duree_multi = time.perf_counter() - debut
+    debut = time.perf_counter()
+    _, supprimees = deduplicate_multi(df, ["invention-title", "abstract"], return_dropped=True)
+    duree_rapport = time.perf_counter() - debut
+    assert obtenu.index.equals(attendu.index)
+    assert len(supprimees) == n - len(obtenu)
+    return {"n_brevets": n, "n_gardes": len(obtenu), "historique_s": duree_historique,
+            "multi_s": duree_multi, "multi_avec_rapport_s": duree_rapport}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1000000)
+    args = parser.parse_args()
+    res = executer(args.n)
+    print(f"{res['n_brevets']} brevets, {res['n_gardes']} gardés")
+    print(f"deduplicate x2        {res['historique_s']:7.2f} s")
+    print(f"deduplicate_multi     {res['multi_s']:7.2f} s")
+    print(f"  avec rapport        {res['multi_avec_rapport_s']:7.2f} s")
+    print(f"accélération x{res['historique_s'] / res['multi_s']:.1f}")
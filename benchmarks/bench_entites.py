@@ -0,0 +1,145 @@
+"""
+Compare le rapprochement des déposants avec les tickers écrit en double
+boucle (chaque nom comparé à chaque alias : inclusion des mots puis
+similarité de Jaccard des trigrammes) contre scripts.entites (index
+inversés, produits de matrices creuses). Les correspondances sont vérifiées
+identiques sur un échantillon ; la double boucle est extrapolée à tous les
+noms. --n-entreprises complète les 46 tickers du notebook d'entreprises
+fictives pour un univers plus large.
+
+    python -m benchmarks.bench_entites --n-noms 100000 --n-entreprises 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.entites import _trigrams, build_name_index, normalize_names, resolve_names
+from scripts.parametres import ENTREPRISES, ORG_FUSIONS
+
+SUFFIXES = ["SA", "S.A.S.", "GMBH", "FRANCE", "RECHERCHE ET DEVELOPPEMENT", "SYSTEMES", "INTERNATIONAL"]
+# Déposants de contrôle -> ticker attendu (None : homonyme ou nom exclu à ne pas rapprocher)
+CONTROLES = {"COOPERATIVE AGRICOLE ORANGE": None, "Jus d'Orange Bio SARL": None, "ORANGE CONSEIL": None,
+             "ORANGE BUSINESS SERVICES SA": "ORA", "Valeo Systemes Thermiques": "FR", "ORANGE S.A.": "ORA"}
+EXCLUSIONS = ["ORANGE CONSEIL"]
+SYLLABES = ["TECH", "NOVA", "BIO", "MED", "AERO", "INDUS", "LOGI", "ENER", "PHARM", "AGRI", "LUX", "ORA",
+            "VAL", "SAF", "DIOR", "CHIM", "ELEC", "PLAST", "VERRE", "BETON"]
+
+
+def nom_aleatoire(rng):
+    return " ".join("".join(rng.choice(SYLLABES, rng.integers(1, 4))) for _ in range(rng.integers(1, 4)))
+
+
+def entreprises_synthetiques(n_entreprises, graine=1):
+    """ ENTREPRISES complété d'entreprises fictives (univers plus large que le CAC 40). """
+    rng = np.random.default_rng(graine)
+    entreprises = dict(ENTREPRISES)
+    while len(entreprises) < n_entreprises:
+        entreprises[f"X{len(entreprises)}.PA"] = [f"{nom_aleatoire(rng)} {rng.choice(SYLLABES)}"]
+    return entreprises
+
+
+def noms_synthetiques(n_noms, entreprises, graine=0):
+    """ Déposants : 20 % de variantes des entreprises cotées, 80 % d'autres organisations. """
+    rng = np.random.default_rng(graine)
+    alias = [nom for noms in entreprises.values() for nom in noms] + list(ORG_FUSIONS)
+    noms = []
+    for _ in range(n_noms):
+        if rng.random() < 0.2:
+            nom = alias[rng.integers(len(alias))]
+            tirage = rng.random()
+            if tirage < 0.4:
+                nom = f"{nom} {SUFFIXES[rng.integers(len(SUFFIXES))]}"
+            elif tirage < 0.6:
+                nom = nom.replace(" ", "")
+            elif tirage < 0.7 and len(nom) > 8:
+                i = rng.integers(1, len(nom) - 1)
+                nom = nom[:i] + nom[i + 1:]
+            noms.append(nom.lower() if rng.random() < 0.3 else nom)
+        else:
+            suffixe = f" {SUFFIXES[rng.integers(len(SUFFIXES))]}" if rng.random() < 0.5 else ""
+            noms.append(nom_aleatoire(rng) + suffixe)
+    return pd.Series(noms)
+
+
+def boucle(noms, index, seuil=0.75):
+    """ Chaque nom distinct comparé à chaque alias. """
+    alias_mots = [set(alias.split()) for alias in index["noms"]]
+    alias_trigrammes = [_trigrams(alias) for alias in index["noms"]]
+    lignes = []
+    for nom in pd.unique(noms.dropna()):
+        choix, methode = None, None
+        if nom in index["exclusions"]:
+            lignes.append({"nom": nom, "ticker": None, "methode": None})
+            continue
+        if nom in index["exact"]:
+            choix, methode = index["exact"][nom], "exact"
+        if choix is None:
+            mots = set(nom.split())
+            candidats = [(len(a), len(alias_trigrammes[j]), -j) for j, a in enumerate(alias_mots)
+                         if a <= mots and (len(a) > 1 or nom.split()[0] in a)]
+            if candidats:
+                choix, methode = -max(candidats)[2], "mots"
+        if choix is None:
+            trigrammes = _trigrams(nom)
+            candidats = []
+            for j, t in enumerate(alias_trigrammes):
+                commun = len(trigrammes & t)
+                jaccard = commun / (len(trigrammes) + len(t) - commun)
+                if commun and jaccard >= seuil:
+                    candidats.append((jaccard, len(t), -j))
+            if candidats:
+                choix, methode = -max(candidats)[2], "trigrammes"
+        lignes.append({"nom": nom, "ticker": None if choix is None else index["tickers"][choix],
+                       "methode": methode})
+    return pd.DataFrame(lignes)
+
+
+def executer(n_noms=100000, n_entreprises=46, n_noms_boucle=2000):
+    """ Retourne les durées de normalisation, de la double boucle (extrapolée) et des index inversés. """
+    entreprises = entreprises_synthetiques(n_entreprises)
+    index = build_name_index(entreprises, ORG_FUSIONS, EXCLUSIONS)
+    noms = noms_synthetiques(n_noms, entreprises)
+
+    # Alias d'un seul mot courant : rapproché en tête du nom seulement, noms exclus jamais
+    controles = normalize_names(pd.Series(list(CONTROLES)))
+    tickers = resolve_names(controles, index).set_index("nom")["ticker"]
+    for nom, normalise in zip(CONTROLES, controles):
+        obtenu = None if pd.isna(tickers[normalise]) else tickers[normalise]
+        assert obtenu == CONTROLES[nom], (nom, obtenu)
+
+    debut = time.perf_counter()
+    normalises = normalize_names(noms)
+    duree_normalisation = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    correspondance = resolve_names(normalises, index)
+    duree_index = time.perf_counter() - debut
+
+    echantillon = normalises.iloc[:n_noms_boucle]
+    debut = time.perf_counter()
+    attendu = boucle(echantillon, index)
+    duree_echantillon = time.perf_counter() - debut
+    duree_boucle = duree_echantillon * len(correspondance) / len(attendu)
+
+    obtenu = correspondance.set_index("nom").loc[attendu["nom"], ["ticker", "methode"]].reset_index()
+    pd.testing.assert_frame_equal(obtenu, attendu, check_dtype=False)
+    return {"n_noms": n_noms, "n_distincts": len(correspondance), "n_alias": len(index["noms"]),
+            "taux_rapproches": correspondance["ticker"].notna().mean(),
+            "normalisation_s": duree_normalisation, "boucle_extrapolee_s": duree_boucle, "index_s": duree_index,
+            "methodes": correspondance["methode"].value_counts(dropna=False)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-noms", type=int, default=100000)
+    parser.add_argument("--n-entreprises", type=int, default=46)
+    args = parser.parse_args()
+    res = executer(args.n_noms, args.n_entreprises)
+    print(f"{res['n_noms']} déposants, {res['n_distincts']} noms distincts, {res['n_alias']} alias")
+    print(f"normalisation des noms       {res['normalisation_s']:7.2f} s")
+    print(f"double boucle (extrapolée)   {res['boucle_extrapolee_s']:7.2f} s")
+    print(f"index inversés               {res['index_s']:7.2f} s")
+    print(f"noms rapprochés d'un ticker : {res['taux_rapproches']:.1%}")
+    print(res["methodes"].to_string())
@@ -0,0 +1,121 @@
+"""
+Compare une étude d'événements écrite en boucle (fenêtres découpées et
+modèle de marché estimé par linregress, un événement à la fois) contre
+scripts.evenements (fenêtres extraites de vues glissantes, tous les
+événements d'un paquet estimés ensemble). Les paramètres, CAR et CAR
+standardisés sont vérifiés identiques sur un échantillon d'événements ;
+la boucle est extrapolée à tous les événements.
+
+    python -m benchmarks.bench_evenements --n-evenements 50000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from scripts.evenements import average_abnormal_returns, caar_tests, event_study
+
+ESTIMATION = (-250, -11)
+FENETRE = (-10, 10)
+FENETRES = ((-1, 1), (0, 0), (0, 5), (-10, 10))
+MIN_OBS = 100
+
+
+def donnees(n_tickers, n_jours, n_evenements, graine=0):
+    """
+    Prix journaliers synthétiques (modèle à un facteur, introductions en
+    bourse échelonnées, suspensions de cotation) et événements tirés au hasard,
+    week-ends compris.
+    """
+    rng = np.random.default_rng(graine)
+    dates = pd.bdate_range("2000-01-03", periods=n_jours)
+    marche = rng.normal(0.0002, 0.01, n_jours)
+    betas = rng.uniform(0.5, 1.5, n_tickers)
+    rendements = marche[:, None] * betas + rng.normal(0, 0.015, (n_jours, n_tickers))
+    prix = 100 * np.exp(np.cumsum(rendements, axis=0))
+    introductions = rng.integers(0, n_jours // 2, n_tickers)
+    prix[np.arange(n_jours)[:, None] < introductions * (rng.random(n_tickers) < 0.3)] = np.nan
+    prix[rng.random(prix.shape) < 0.001] = np.nan
+    tickers = [f"T{k}" for k in range(n_tickers)]
+    prices = pd.DataFrame(prix, columns=tickers)
+    prices.insert(0, "Date", dates)
+
+    jours_calendaires = pd.date_range(dates[0], dates[-1])
+    evenements = pd.DataFrame({"ticker": rng.choice(tickers, n_evenements),
+                               "date": rng.choice(jours_calendaires, n_evenements),
+                               "n_brevets": rng.integers(1, 20, n_evenements)})
+    return prices, evenements
+
+
+def boucle(prices, evenements):
+    """ Modèle de marché et CAR événement par événement. """
+    rendements = np.log(prices.set_index("Date")).diff()
+    rendements["marche"] = rendements.mean(axis=1)
+    dates = rendements.index
+    lignes = []
+    for ev in evenements.itertuples():
+        t = dates.searchsorted(pd.Timestamp(ev.date))
+        if ev.ticker not in rendements.columns or t + ESTIMATION[0] < 0 or t + FENETRE[1] >= len(dates):
+            continue
+        estimation = rendements[[ev.ticker, "marche"]].iloc[t + ESTIMATION[0]:t + ESTIMATION[1] + 1].dropna()
+        n = len(estimation)
+        if n < MIN_OBS:
+            continue
+        reg = stats.linregress(estimation["marche"], estimation[ev.ticker])
+        residus = estimation[ev.ticker] - reg.intercept - reg.slope * estimation["marche"]
+        s2 = (residus ** 2).sum() / (n - 2)
+        m_bar = estimation["marche"].mean()
+        sxx = ((estimation["marche"] - m_bar) ** 2).sum()
+
+        fenetre = rendements[[ev.ticker, "marche"]].iloc[t + FENETRE[0]:t + FENETRE[1] + 1]
+        if fenetre.isna().any().any():
+            continue
+        ar = fenetre[ev.ticker] - reg.intercept - reg.slope * fenetre["marche"]
+        ligne = {"ticker": ev.ticker, "date": ev.date, "alpha": reg.intercept, "beta": reg.slope,
+                 "sigma": np.sqrt(s2), "n_estimation": n}
+        for a, b in FENETRES:
+            tranche = slice(a - FENETRE[0], b - FENETRE[0] + 1)
+            longueur = b - a + 1
+            car = ar.iloc[tranche].sum()
+            ecart = (fenetre["marche"].iloc[tranche] - m_bar).sum()
+            ligne[f"CAR[{a},{b}]"] = car
+            ligne[f"SCAR[{a},{b}]"] = car / np.sqrt(s2 * (longueur + longueur ** 2 / n + ecart ** 2 / sxx))
+        lignes.append(ligne)
+    return pd.DataFrame(lignes)
+
+
+def executer(n_evenements=50000, n_tickers=50, n_jours=5000, n_evenements_boucle=1000):
+    """ Retourne les durées de la boucle (extrapolée) et du moteur. """
+    prices, evenements = donnees(n_tickers, n_jours, n_evenements)
+
+    debut = time.perf_counter()
+    resultats, anormaux = event_study(prices, evenements, ESTIMATION, FENETRE, FENETRES, min_obs=MIN_OBS)
+    tests = caar_tests(resultats, FENETRES)
+    aar = average_abnormal_returns(anormaux, FENETRE)
+    duree_moteur = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    attendu = boucle(prices, evenements.iloc[:n_evenements_boucle])
+    duree_boucle = (time.perf_counter() - debut) * n_evenements / n_evenements_boucle
+
+    obtenu = resultats.iloc[:len(attendu)]
+    assert (obtenu["ticker"].to_numpy() == attendu["ticker"].to_numpy()).all()
+    assert (obtenu["date"].to_numpy() == attendu["date"].to_numpy()).all()
+    for colonne in attendu.columns[2:]:
+        np.testing.assert_allclose(obtenu[colonne], attendu[colonne], rtol=1e-8, atol=1e-12)
+    return {"n_evenements": n_evenements, "n_retenus": len(resultats), "boucle_extrapolee_s": duree_boucle,
+            "moteur_s": duree_moteur, "tests": tests, "aar": aar}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-evenements", type=int, default=50000)
+    parser.add_argument("--n-tickers", type=int, default=50)
+    args = parser.parse_args()
+    res = executer(args.n_evenements, args.n_tickers)
+    print(f"{res['n_evenements']} événements, {res['n_retenus']} retenus")
+    print(f"boucle (extrapolée)   {res['boucle_extrapolee_s']:8.1f} s")
+    print(f"moteur                {res['moteur_s']:8.2f} s")
+    print(res["tests"].to_string(index=False))
@@ -0,0 +1,78 @@
+"""
+Vérifie extract_brevet_record contre l'extracteur historique à base de
+root.find(".//…") sur un corpus synthétique, puis compare le temps par document.
+
+    python -m benchmarks.bench_extracteur --n 3000 --max-entries 3 10
+"""
+import argparse
+import io
+import random
+import time
+
+from benchmarks.reference_extraction import extract_brevet_record_find
+from benchmarks.synthetique import generer_xml_brevet
+from scripts.importation import brevet_columns, extract_brevet_record
+
+# Structures atypiques : imbrications, doublons de sequence, citations
+# réparties sous plusieurs parents, <p> hors de <abstract>, éléments vides
+CAS_LIMITES = [
+    b'<r doc-number="1"><fr-publication-data><x><fr-publication-reference><country>F</country>'
+    b'</fr-publication-reference></x><fr-publication-reference><date>20200101</date>'
+    b'</fr-publication-reference></fr-publication-data><a><citation><nplcit/></citation>'
+    b'<citation><patcit><text>t</text></patcit></citation></a><citation/><b>'
+    b'<applicant sequence="2"><applicant sequence="1"><last-name>A</last-name><first-name/>'
+    b'</applicant></applicant></b><applicant sequence="1"><orgname>B</orgname></applicant>'
+    b'<abstract><q><p>non</p></q><p>oui</p></abstract><p>x</p><fr-date-availability>'
+    b'<fr-next-fee-payement><x><date>1</date></x><date>2</date></fr-next-fee-payement>'
+    b'</fr-date-availability></r>',
+    b'<abstract><p>racine</p><fr-publication-reference><country>z</country>'
+    b'</fr-publication-reference></abstract>',
+    b'<fr-publication-data><fr-publication-reference><country>z</country>'
+    b'</fr-publication-reference><abstract><p>ok</p></abstract></fr-publication-data>',
+]
+
+
+def verifier_corpus(documents, max_entries):
+    """ Lève AssertionError au premier document dont l'extraction diffère. """
+    colonnes = brevet_columns(max_entries)
+    for document in documents:
+        attendu = extract_brevet_record_find(io.BytesIO(document), max_entries)
+        obtenu = extract_brevet_record(io.BytesIO(document), max_entries)
+        ecarts = {c: (attendu.get(c), obtenu.get(c)) for c in colonnes
+                  if attendu.get(c) != obtenu.get(c)}
+        assert not ecarts, ecarts
+
+
+def _temps_par_document(fonction, documents, max_entries):
+    debut = time.perf_counter()
+    for document in documents:
+        fonction(io.BytesIO(document), max_entries)
+    return (time.perf_counter() - debut) / len(documents) * 1e6
+
+
+def executer(n=3000, max_entries=(3, 10)):
+    """ Retourne le temps moyen par document (µs) des deux extracteurs. """
+    rng = random.Random(0)
+    documents = [generer_xml_brevet(rng, 3000000 + k) for k in range(n)]
+    resultats = {"n_documents": n}
+    for m in max_entries:
+        verifier_corpus(documents + CAS_LIMITES, m)
+        resultats[f"max_entries_{m}"] = {
+            "find_us": _temps_par_document(extract_brevet_record_find, documents, m),
+            "parcours_unique_us": _temps_par_document(extract_brevet_record, documents, m),
+        }
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=3000)
+    parser.add_argument("--max-entries", type=int, nargs="+", default=[3, 10])
+    args = parser.parse_args()
+    res = executer(args.n, tuple(args.max_entries))
+    print(f"{res['n_documents']} documents, extraction identique à la référence")
+    for m in args.max_entries:
+        r = res[f"max_entries_{m}"]
+        print(f"max_entries={m:<3d} find {r['find_us']:7.0f} µs/doc   "
+              f"parcours unique {r['parcours_unique_us']:7.0f} µs/doc   "
+              f"x{r['find_us'] / r['parcours_unique_us']:.1f}")
@@ -0,0 +1,90 @@
+"""
+Compare le pic de mémoire (RSS) de l'extraction d'un gros ZIP imbriqué :
+chemin historique (copies complètes en BytesIO) contre lecture en flux.
+
+    python -m benchmarks.bench_extraction_streaming --taille-mo 300
+
+Chaque variante tourne dans un processus neuf pour que les pics soient comparables.
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+import zipfile
+
+import fsspec
+import pandas as pd
+
+from benchmarks.synthetique import generer_zip
+from scripts.importation import extract_brevet_info, extract_from_zip_s3
+
+
+def _historique_archive(zip_bytes):
+    """ Reproduction du chemin avant lecture en flux : chaque niveau copié en mémoire. """
+    all_brevets = []
+    with zipfile.ZipFile(zip_bytes, "r") as archive:
+        for name in archive.namelist():
+            if name.lower() == "toc.xml":
+                continue
+            if name.lower().endswith(".xml"):
+                with archive.open(name) as xml_file:
+                    all_brevets.append(extract_brevet_info(io.BytesIO(xml_file.read())))
+            elif name.lower().endswith(".zip"):
+                with archive.open(name) as nested_zip:
+                    all_brevets.append(_historique_archive(io.BytesIO(nested_zip.read())))
+    return pd.concat(all_brevets, ignore_index=True) if all_brevets else pd.DataFrame()
+
+
+def _mesurer(variante, chemin, file_resultat):
+    fs = fsspec.filesystem("file")
+    rss_initial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    debut = time.perf_counter()
+    if variante == "historique":
+        with fs.open(chemin, "rb") as f:
+            df = _historique_archive(io.BytesIO(f.read()))
+    else:
+        df = extract_from_zip_s3(fs, chemin, spool=(variante == "spool"))
+    duree = time.perf_counter() - debut
+    rss_pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est exprimé en kilo-octets sous Linux
+    file_resultat.put((len(df), duree, rss_initial / 1024, rss_pic / 1024))
+
+
+def executer(taille_mo=300, xml_par_zip=2000, profondeur=2):
+    """ Retourne, par variante, la durée et le pic de RSS (Mo) au-dessus de l'état initial. """
+    contexte = multiprocessing.get_context("spawn")
+    resultats = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "bulletin.zip")
+        taille_annexe = taille_mo * 1024 * 1024 // xml_par_zip
+        with open(chemin, "wb") as f:
+            generer_zip(random.Random(0), xml_par_zip, 3000000, profondeur,
+                        taille_annexe=taille_annexe, destination=f)
+        resultats["taille_archive_mo"] = os.path.getsize(chemin) / 1024 / 1024
+        for variante in ("historique", "flux", "spool"):
+            file_resultat = contexte.Queue()
+            processus = contexte.Process(target=_mesurer, args=(variante, chemin, file_resultat))
+            processus.start()
+            n, duree, rss_initial, rss_pic = file_resultat.get()
+            processus.join()
+            resultats[variante] = {"n_brevets": n, "duree_s": duree,
+                                   "rss_pic_mo": rss_pic, "rss_supplementaire_mo": rss_pic - rss_initial}
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--taille-mo", type=int, default=300)
+    parser.add_argument("--xml-par-zip", type=int, default=2000)
+    parser.add_argument("--profondeur", type=int, default=2)
+    args = parser.parse_args()
+    res = executer(args.taille_mo, args.xml_par_zip, args.profondeur)
+    print(f"Archive : {res['taille_archive_mo']:.0f} Mo")
+    for variante in ("historique", "flux", "spool"):
+        r = res[variante]
+        print(f"{variante:<11} {r['n_brevets']} brevets  {r['duree_s']:7.2f} s  "
+              f"pic RSS {r['rss_pic_mo']:7.0f} Mo  (+{r['rss_supplementaire_mo']:.0f} Mo)")
@@ -0,0 +1,83 @@
+"""
+Profil par étape de process_all_years_s3 (listing, parsing, dataframe) sur
+un bucket synthétique d'échelle et de profondeur d'imbrication des ZIP
+configurables : durée, enregistrements/s, pic de RSS et octets lus, relevés
+dans les logs structurés émis avec instrumentation=True. Le DataFrame est
+vérifié identique à celui d'un passage sans instrumentation.
+
+    python -m benchmarks.bench_importation --zips-par-annee 8 --xml-par-zip 200 --profondeur 3
+"""
+import argparse
+import logging
+import tempfile
+import time
+
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+
+from benchmarks.synthetique import generer_arborescence
+from scripts.importation import logger, process_all_years_s3
+
+
+class CollecteHandler(logging.Handler):
+    """ Conserve les champs structurés des logs d'étapes. """
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.etapes = []
+
+    def emit(self, record):
+        champs = getattr(record, "champs", {})
+        if "etape" in champs:
+            self.etapes.append(champs)
+
+
+def executer(annees=(2017, 2018), zips_par_annee=8, xml_par_zip=200, profondeur=2, taille_annexe=0,
+             n_workers=1):
+    """ Retourne, par étape, la durée, le débit, le pic de RSS et les octets lus. """
+    with tempfile.TemporaryDirectory() as racine:
+        generer_arborescence(racine, annees, zips_par_annee, xml_par_zip, profondeur, taille_annexe)
+        fs = LocalFileSystem(skip_instance_cache=True)
+
+        debut = time.perf_counter()
+        reference = process_all_years_s3(fs, racine, n_workers=n_workers)
+        duree_sans = time.perf_counter() - debut
+
+        handler = CollecteHandler()
+        niveau = logger.level
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            debut = time.perf_counter()
+            obtenu = process_all_years_s3(fs, racine, n_workers=n_workers, instrumentation=True)
+            duree_avec = time.perf_counter() - debut
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(niveau)
+    pd.testing.assert_frame_equal(obtenu, reference)
+
+    resultats = {"n_brevets": len(reference), "profondeur": profondeur, "sans_instrumentation_s": duree_sans,
+                 "avec_instrumentation_s": duree_avec}
+    for champs in handler.etapes:
+        resultats[champs["etape"]] = {cle: valeur for cle, valeur in champs.items() if cle != "etape"}
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zips-par-annee", type=int, default=8)
+    parser.add_argument("--xml-par-zip", type=int, default=200)
+    parser.add_argument("--profondeur", type=int, default=2)
+    parser.add_argument("--taille-annexe", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    res = executer(zips_par_annee=args.zips_par_annee, xml_par_zip=args.xml_par_zip,
+                   profondeur=args.profondeur, taille_annexe=args.taille_annexe, n_workers=args.workers)
+    print(f"{res['n_brevets']} brevets, profondeur {res['profondeur']}")
+    print(f"sans instrumentation  {res['sans_instrumentation_s']:7.2f} s")
+    print(f"avec instrumentation  {res['avec_instrumentation_s']:7.2f} s")
+    for etape in ("listing", "parsing", "dataframe"):
+        m = res[etape]
+        debit = f"{m['enregistrements_par_s']:10.0f} enr/s" if "enregistrements_par_s" in m else " " * 16
+        print(f"{etape:<10} {m['duree_s']:7.3f} s {debit}  pic {m['memoire_max_mo']:7.1f} Mo  "
+              f"{m['octets_lus'] / 1e6:8.2f} Mo lus")
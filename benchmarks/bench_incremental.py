@@ -0,0 +1,105 @@
+"""
+Vérifie et mesure l'ingestion incrémentale (scripts.incremental) sur un
+bucket synthétique local : après une ingestion complète, une relance sans
+changement, la modification, l'ajout et la suppression d'archives, puis une
+interruption simulée suivie d'une reprise, le dataset relu avec load_brevets
+doit être identique au parsing complet de process_all_years_s3.
+
+    python -m benchmarks.bench_incremental --zips-par-annee 8 --xml-par-zip 100
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+
+from benchmarks.synthetique import generer_arborescence, generer_zip
+from scripts import incremental
+from scripts.dataset import PARTITION_COLUMNS, load_brevets
+from scripts.importation import process_all_years_s3
+
+
+class Interruption(Exception):
+    """ Arrêt simulé pendant l'écriture des fragments. """
+
+
+def verifier(fs, racine, dataset_path):
+    """ Compare le dataset incrémental au parsing complet de l'arborescence actuelle. """
+    attendu = process_all_years_s3(fs, racine)
+    obtenu = load_brevets(fs, dataset_path).drop(columns=PARTITION_COLUMNS)[attendu.columns]
+    attendu = attendu.sort_values("doc-number").reset_index(drop=True)
+    obtenu = obtenu.sort_values("doc-number").reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtenu, attendu)
+    return len(attendu)
+
+
+def reecrire_archive(chemin, xml_par_zip, numero, graine):
+    """ Remplace le contenu d'une archive (nouveaux brevets) et avance sa date de modification. """
+    with open(chemin, "wb") as f:
+        generer_zip(random.Random(graine), xml_par_zip, numero, destination=f)
+    mtime = os.path.getmtime(chemin) + 10
+    os.utime(chemin, (mtime, mtime))
+
+
+def executer(annees=(2017, 2018), zips_par_annee=8, xml_par_zip=100, arret_apres=3):
+    """ Retourne, par scénario, la durée et le nombre d'archives (re)traitées. """
+    resultats = {}
+    with tempfile.TemporaryDirectory() as racine, tempfile.TemporaryDirectory() as sortie:
+        zips = generer_arborescence(racine, annees, zips_par_annee, xml_par_zip, profondeur=2)
+        fs = LocalFileSystem(skip_instance_cache=True)
+        dataset_path = os.path.join(sortie, "data_brevets")
+
+        def mesurer(nom):
+            debut = time.perf_counter()
+            traitees = incremental.process_incremental_s3(fs, racine, dataset_path)
+            resultats[nom] = {"duree_s": time.perf_counter() - debut, "archives": len(traitees),
+                              "n_brevets": verifier(fs, racine, dataset_path)}
+            return traitees
+
+        assert len(mesurer("complete")) == len(zips)
+        assert mesurer("sans_changement") == []
+
+        # Une archive modifiée, une supprimée, une ajoutée
+        reecrire_archive(zips[0], xml_par_zip // 2, 9000000, graine=1)
+        os.remove(zips[1])
+        nouvelle = os.path.join(os.path.dirname(zips[-1]), "FR_ajout.zip")
+        with open(nouvelle, "wb") as f:
+            generer_zip(random.Random(2), xml_par_zip, 9500000, destination=f)
+        assert sorted(mesurer("modifiees_supprimees")) == sorted([zips[0], nouvelle])
+
+        # Interruption après arret_apres archives, puis reprise
+        for k, chemin in enumerate(zips[2:2 + 2 * arret_apres]):
+            reecrire_archive(chemin, xml_par_zip, 9600000 + k * xml_par_zip, graine=10 + k)
+        ecriture = incremental.write_fragment
+        ecrites = []
+
+        def write_fragment_interrompu(*args, **kwargs):
+            if len(ecrites) == arret_apres:
+                raise Interruption()
+            ecrites.append(args[2])
+            return ecriture(*args, **kwargs)
+
+        incremental.write_fragment = write_fragment_interrompu
+        try:
+            incremental.process_incremental_s3(fs, racine, dataset_path)
+            raise AssertionError("L'interruption simulée n'a pas eu lieu")
+        except Interruption:
+            pass
+        finally:
+            incremental.write_fragment = ecriture
+        reprises = mesurer("reprise")
+        assert len(reprises) == arret_apres and not set(reprises) & set(ecrites), reprises
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zips-par-annee", type=int, default=8)
+    parser.add_argument("--xml-par-zip", type=int, default=100)
+    args = parser.parse_args()
+    for nom, res in executer(zips_par_annee=args.zips_par_annee, xml_par_zip=args.xml_par_zip).items():
+        print(f"{nom:<22} {res['duree_s']:7.2f} s   archives traitées : {res['archives']:3d}   "
+              f"brevets : {res['n_brevets']}")
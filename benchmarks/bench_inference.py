@@ -0,0 +1,95 @@
+"""
+Compare un bootstrap par blocs mobiles et une permutation par blocs écrits
+en boucle (une régression linregress par réplication, secteur et retard)
+contre scripts.inference (index de toutes les réplications générés d'un
+coup, pentes en forme fermée par paquets). Les pentes du moteur sont
+vérifiées contre linregress sur les mêmes index. La boucle est chronométrée
+sur peu de réplications puis extrapolée.
+
+    python -m benchmarks.bench_inference --n-replications 10000 --n-workers 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from scipy import stats
+
+from benchmarks.bench_regressions import donnees
+from scripts.inference import (batched_slopes, block_bootstrap_indices, block_permutation_indices,
+                               default_block_length, inference_lags, lagged_samples)
+from scripts.parametres import CORRESPONDANCES
+
+
+def boucle(data_complete, lags, n_replications, block_length, graine=0):
+    """ Bootstrap et permutation par blocs, une régression à la fois. """
+    rng = np.random.default_rng(graine)
+    for secteur, portefeuille in CORRESPONDANCES.items():
+        for lag in lags:
+            df_reg = data_complete[[f"return_log_{portefeuille}"]].assign(
+                x=data_complete[f"croiss_log_brevets_{secteur}"].shift(lag)).dropna()
+            x, y = df_reg["x"].to_numpy(), df_reg[f"return_log_{portefeuille}"].to_numpy()
+            n = len(x)
+            n_blocs = -(-n // block_length)
+            for _ in range(n_replications):
+                debuts = rng.integers(0, n - block_length + 1, n_blocs)
+                index = np.concatenate([np.arange(d, d + block_length) for d in debuts])[:n]
+                stats.linregress(x[index], y[index])
+                ordre = rng.permutation(n // block_length)
+                index = np.concatenate([np.arange(k * block_length, (k + 1) * block_length) for k in ordre]
+                                       + [np.arange(n // block_length * block_length, n)])
+                stats.linregress(x[index], y)
+
+
+def verifier(data_complete, lags, block_length, size=5):
+    """ Pentes du moteur contre linregress sur les mêmes index. """
+    secteurs = list(CORRESPONDANCES)
+    x = data_complete[[f"croiss_log_brevets_{s}" for s in secteurs]].to_numpy()
+    y = data_complete[[f"return_log_{CORRESPONDANCES[s]}" for s in secteurs]].to_numpy()
+    xs, ys, n = lagged_samples(x, y, lags)
+    rng = np.random.default_rng(1)
+    for permutation in (False, True):
+        generer = block_permutation_indices if permutation else block_bootstrap_indices
+        index = generer(n, xs.shape[-1], block_length, rng, size)
+        pentes = batched_slopes(xs, ys, n, index, None if permutation else index)
+        for r in range(size):
+            for i, j in np.ndindex(n.shape):
+                k = n[i, j]
+                idx = index[r, i, j, :k]
+                cible = ys[i, j, :k] if permutation else ys[i, j, idx]
+                assert np.isclose(stats.linregress(xs[i, j, idx], cible).slope, pentes[r, i, j], rtol=1e-9)
+
+
+def executer(n_replications=10000, n_replications_boucle=50, lag_max=24, n_mois=96, n_workers=None):
+    """ Retourne les durées de la boucle (extrapolée) et du moteur. """
+    n_workers = n_workers or os.cpu_count() or 1
+    data_complete = donnees(n_mois)
+    lags = list(range(lag_max + 1))
+    block_length = default_block_length(n_mois)
+    verifier(data_complete, lags, block_length)
+
+    debut = time.perf_counter()
+    boucle(data_complete, lags, n_replications_boucle, block_length)
+    duree_boucle = (time.perf_counter() - debut) * n_replications / n_replications_boucle
+
+    debut = time.perf_counter()
+    resultats = inference_lags(data_complete, CORRESPONDANCES, lags, n_replications=n_replications,
+                               block_length=block_length, n_workers=n_workers)
+    duree_moteur = time.perf_counter() - debut
+    return {"n_regressions": len(resultats), "n_replications": n_replications, "n_workers": n_workers,
+            "boucle_extrapolee_s": duree_boucle, "moteur_s": duree_moteur, "resultats": resultats}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-replications", type=int, default=10000)
+    parser.add_argument("--lag-max", type=int, default=24)
+    parser.add_argument("--n-workers", type=int, default=None)
+    args = parser.parse_args()
+    res = executer(args.n_replications, lag_max=args.lag_max, n_workers=args.n_workers)
+    print(f"{res['n_regressions']} régressions x {res['n_replications']} réplications "
+          f"(bootstrap et permutation), {res['n_workers']} processus")
+    print(f"boucle (extrapolée)    {res['boucle_extrapolee_s']:9.1f} s")
+    print(f"moteur                 {res['moteur_s']:9.1f} s")
+    print(f"accélération x{res['boucle_extrapolee_s'] / res['moteur_s']:.0f}")
+    print(res["resultats"][res["resultats"]["Secteur"] == "auto"].head(6).to_string(index=False))
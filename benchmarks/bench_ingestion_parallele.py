@@ -0,0 +1,65 @@
+"""
+Mesure le passage à l'échelle de process_all_years_s3 selon n_workers
+sur un bucket synthétique local.
+
+    python -m benchmarks.bench_ingestion_parallele --workers 1 2 4 8 --latence 0.05
+
+L'option --latence simule le temps d'aller-retour S3 à l'ouverture de chaque ZIP.
+"""
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+
+from benchmarks.synthetique import generer_arborescence
+from scripts.importation import process_all_years_s3
+
+
+class LatenceFileSystem(LocalFileSystem):
+    """ Système de fichiers local ajoutant une latence fixe à chaque ouverture. """
+
+    latence = 0.0
+
+    def _open(self, path, mode="rb", **kwargs):
+        time.sleep(self.latence)
+        return super()._open(path, mode=mode, **kwargs)
+
+
+def executer(workers=(1, 2, 4), annees=(2017, 2018), zips_par_annee=8, xml_par_zip=100,
+             latence=0.05):
+    """ Retourne le temps d'ingestion par nombre de workers. """
+    resultats = {}
+    with tempfile.TemporaryDirectory() as racine:
+        generer_arborescence(racine, annees, zips_par_annee, xml_par_zip, profondeur=2)
+        fs = LatenceFileSystem(skip_instance_cache=True)
+        fs.latence = latence
+        reference = None
+        for n in workers:
+            debut = time.perf_counter()
+            df = process_all_years_s3(fs, racine, n_workers=n)
+            duree = time.perf_counter() - debut
+            if reference is None:
+                reference = df
+            else:
+                pd.testing.assert_frame_equal(reference, df)
+            resultats[f"workers_{n}_s"] = duree
+        resultats["n_brevets"] = len(reference)
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--zips-par-annee", type=int, default=8)
+    parser.add_argument("--xml-par-zip", type=int, default=100)
+    parser.add_argument("--latence", type=float, default=0.05)
+    args = parser.parse_args()
+    res = executer(tuple(args.workers), zips_par_annee=args.zips_par_annee,
+                   xml_par_zip=args.xml_par_zip, latence=args.latence)
+    base = res[f"workers_{args.workers[0]}_s"]
+    print(f"{res['n_brevets']} brevets")
+    for n in args.workers:
+        duree = res[f"workers_{n}_s"]
+        print(f"n_workers={n:<3d} {duree:8.2f} s   accélération x{base / duree:.2f}")
@@ -0,0 +1,93 @@
+"""
+Compare la sélection ARMA du notebook (tous les candidats estimés en série,
+tests de Ljung-Box et de White pour chacun, tous les modèles gardés) pour
+les huit secteurs, contre scripts.modeles (processus parallèles,
+initialisation depuis les modèles plus petits, tests sur le seul modèle retenu).
+
+    python -m benchmarks.bench_modeles --n-workers 4
+"""
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from statsmodels.stats.diagnostic import acorr_ljungbox, het_white
+from statsmodels.tsa.arima.model import ARIMA
+
+from scripts.modeles import candidate_orders, model_name, select_arma_orders
+from scripts.parametres import CORRESPONDANCES
+
+
+def boucle_notebook(rendements_series, modeles_candidats):
+    """ Étape 6 du notebook pour une série, sans les affichages. """
+    resultats_modeles = []
+    for nom_type, p, q in modeles_candidats:
+        model = ARIMA(rendements_series, order=(p, 0, q)).fit()
+        residus = model.resid
+        lb_pvalue = acorr_ljungbox(residus, lags=[10], return_df=True)["lb_pvalue"].values[0]
+        try:
+            white_pvalue = het_white(residus.dropna(), sm.add_constant(np.arange(len(residus.dropna()))))[1]
+        except Exception:
+            white_pvalue = np.nan
+        resultats_modeles.append({"Modèle": model_name(p, q), "p": p, "q": q, "AIC": model.aic,
+                                  "BIC": model.bic, "HQIC": model.hqic, "LB_pvalue": lb_pvalue,
+                                  "White_pvalue": white_pvalue, "model_obj": model})
+    df_resultats = pd.DataFrame(resultats_modeles)
+    return df_resultats, df_resultats.sort_values("BIC").iloc[0]
+
+
+def series_synthetiques(n_mois=90, graine=0):
+    """ Rendements mensuels ARMA de différents ordres, un par secteur. """
+    rng = np.random.default_rng(graine)
+    series = {}
+    for k, secteur in enumerate(CORRESPONDANCES):
+        bruit = rng.normal(0, 0.05, n_mois + 50)
+        serie = np.zeros(n_mois + 50)
+        phi, theta = [0.0, 0.5, -0.3, 0.2][k % 4], [0.4, 0.0, 0.3, -0.2][(k // 2) % 4]
+        for t in range(1, len(serie)):
+            serie[t] = 0.003 + phi * serie[t - 1] + bruit[t] + theta * bruit[t - 1]
+        series[secteur] = pd.Series(serie[50:])
+    return series
+
+
+def executer(n_workers=None, n_mois=90):
+    """ Retourne les durées et les modèles retenus par les deux sélections. """
+    n_workers = n_workers or min(len(CORRESPONDANCES), os.cpu_count() or 1)
+    series = series_synthetiques(n_mois)
+    candidats = candidate_orders()
+
+    debut = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        attendus = {secteur: boucle_notebook(serie, candidats)[1]["Modèle"]
+                    for secteur, serie in series.items()}
+    duree_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    df_resultats, optimaux = select_arma_orders(series, n_workers=n_workers)
+    duree_moteur = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    select_arma_orders(series, n_workers=n_workers, warm_start=False)
+    duree_sans_warm_start = time.perf_counter() - debut
+
+    retenus = {secteur: info["nom"] for secteur, info in optimaux.items()}
+    return {"n_workers": n_workers, "n_modeles": len(df_resultats), "boucle_s": duree_boucle,
+            "moteur_s": duree_moteur, "moteur_sans_warm_start_s": duree_sans_warm_start,
+            "modeles_notebook": attendus, "modeles_moteur": retenus}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-workers", type=int, default=None)
+    args = parser.parse_args()
+    res = executer(args.n_workers)
+    print(f"{res['n_modeles']} modèles, {res['n_workers']} processus")
+    print(f"boucle du notebook        {res['boucle_s']:7.2f} s")
+    print(f"moteur                    {res['moteur_s']:7.2f} s")
+    print(f"  sans warm start         {res['moteur_sans_warm_start_s']:7.2f} s")
+    for secteur, nom in res["modeles_notebook"].items():
+        print(f"  {secteur:<13} notebook {nom:<10} moteur {res['modeles_moteur'][secteur]}")
@@ -0,0 +1,101 @@
+"""
+Compare la régression en panel à effets fixes secteur et mois de
+scripts.panel (transformation within par np.bincount) contre un MCO
+statsmodels avec matrices d'indicatrices denses, sur un panel non cylindré
+à retards distribués. Les coefficients et les écarts-types (clusters par
+secteur, Driscoll-Kraay) sont vérifiés identiques, puis le moteur est
+chronométré seul sur un panel trop grand pour les indicatrices denses.
+
+    python -m benchmarks.bench_panel --n-secteurs 500 --n-mois 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from scripts.panel import build_panel, panel_ols
+
+LAGS = [0, 1, 2, 3]
+REGRESSEURS = [f"croissance_lag{lag}" for lag in LAGS]
+
+
+def donnees_larges(n_secteurs, n_mois, graine=0):
+    """ data_complete synthétique : effets secteur et mois, 5 % de mois manquants. """
+    rng = np.random.default_rng(graine)
+    dates = pd.date_range("2000-01-31", periods=n_mois, freq="ME")
+    choc_mois = rng.normal(0, 0.04, n_mois)
+    colonnes = {"Date": dates}
+    correspondances = {}
+    for k in range(n_secteurs):
+        secteur = f"s{k}"
+        croissance = rng.normal(0, 0.3, n_mois)
+        rendement = (0.01 * rng.normal() + choc_mois + 0.02 * np.roll(croissance, 1)
+                     + rng.normal(0, 0.05, n_mois))
+        rendement[rng.random(n_mois) < 0.05] = np.nan
+        colonnes[f"croiss_log_brevets_{secteur}"] = croissance
+        colonnes[f"return_log_portefeuille_{secteur}"] = rendement
+        correspondances[secteur] = f"portefeuille_{secteur}"
+    return pd.DataFrame(colonnes), correspondances
+
+
+def mco_indicatrices(panel, cov_type, cov_kwds_fn):
+    """ MCO statsmodels avec indicatrices secteur et mois denses. """
+    donnees = panel.dropna().sort_values(["Date", "Secteur"], kind="stable")
+    X = pd.concat([donnees[REGRESSEURS],
+                   pd.get_dummies(donnees["Secteur"], dtype=float),
+                   pd.get_dummies(donnees["Date"], drop_first=True, dtype=float)], axis=1)
+    res = sm.OLS(donnees["rendement"].to_numpy(), X.to_numpy()).fit(
+        cov_type=cov_type, cov_kwds=cov_kwds_fn(donnees))
+    return res.params[:len(REGRESSEURS)], res.bse[:len(REGRESSEURS)], X.shape
+
+
+def executer(n_secteurs_dense=100, n_mois_dense=240, n_secteurs=500, n_mois=2000):
+    """ Retourne les durées du MCO à indicatrices et du moteur. """
+    data_complete, correspondances = donnees_larges(n_secteurs_dense, n_mois_dense)
+    panel = build_panel(data_complete, correspondances, LAGS)
+
+    cas = {
+        "clustered": ({"cov_type": "clustered"}, "cluster",
+                      lambda d: {"groups": pd.factorize(d["Secteur"])[0]}),
+        "driscoll-kraay": ({"cov_type": "driscoll-kraay", "bandwidth": 4}, "hac-groupsum",
+                           lambda d: {"time": pd.factorize(d["Date"], sort=True)[0], "maxlags": 4}),
+    }
+    durees = {}
+    for nom, (options, cov_type, cov_kwds_fn) in cas.items():
+        debut = time.perf_counter()
+        attendu, attendu_se, forme = mco_indicatrices(panel, cov_type, cov_kwds_fn)
+        durees[f"indicatrices_{nom}_s"] = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        obtenu, _ = panel_ols(panel, "rendement", REGRESSEURS, **options)
+        durees[f"moteur_{nom}_s"] = time.perf_counter() - debut
+        np.testing.assert_allclose(obtenu["Coefficient_β"], attendu, rtol=1e-7)
+        np.testing.assert_allclose(obtenu["Std_Error"], attendu_se, rtol=1e-7)
+
+    data_complete, correspondances = donnees_larges(n_secteurs, n_mois)
+    debut = time.perf_counter()
+    grand_panel = build_panel(data_complete, correspondances, LAGS)
+    coefficients, infos = panel_ols(grand_panel, "rendement", REGRESSEURS, cov_type="driscoll-kraay")
+    durees["moteur_grand_panel_s"] = time.perf_counter() - debut
+    n_indicatrices = infos["n_entites"] + infos["n_periodes"] - 1
+    return {"forme_dense": forme, "n_obs": infos["n_obs"], "n_indicatrices": n_indicatrices,
+            "memoire_dense_go": infos["n_obs"] * (n_indicatrices + len(REGRESSEURS)) * 8 / 1e9,
+            "coefficients": coefficients, **durees}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-secteurs", type=int, default=500)
+    parser.add_argument("--n-mois", type=int, default=2000)
+    args = parser.parse_args()
+    res = executer(n_secteurs=args.n_secteurs, n_mois=args.n_mois)
+    print(f"panel vérifié : matrice d'indicatrices {res['forme_dense'][0]} x {res['forme_dense'][1]}")
+    for nom in ("clustered", "driscoll-kraay"):
+        print(f"  {nom:<15} indicatrices {res[f'indicatrices_{nom}_s']:6.2f} s   "
+              f"moteur {res[f'moteur_{nom}_s']:6.3f} s")
+    print(f"grand panel : {res['n_obs']} observations, {res['n_indicatrices']} effets fixes "
+          f"(matrice dense : {res['memoire_dense_go']:.1f} Go)")
+    print(f"  moteur, panel construit et estimé   {res['moteur_grand_panel_s']:6.2f} s")
+    print(res["coefficients"].to_string(index=False))
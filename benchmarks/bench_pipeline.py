@@ -0,0 +1,133 @@
+"""
+Compare la chaîne du notebook (toutes les étapes recalculées à chaque
+exécution) contre scripts.pipeline (sorties des étapes en cache parquet,
+indexées par le contenu des entrées et les paramètres), sur un dataset de
+brevets synthétique et des cours hors ligne avec latence simulée.
+Scénarios : cache vide, relance sans changement, puis relance après la
+modification d'un seul secteur, qui ne doit recalculer que les comptages
+sectoriels et l'aval. Les résultats sont vérifiés identiques à la chaîne.
+
+    python -m benchmarks.bench_pipeline --n 200000 --latence 1.0
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+
+from benchmarks.bench_cib import corpus
+from benchmarks.bench_prix import ecrire_fixture
+from benchmarks.synthetique import MOTS
+from scripts.dataset import write_brevets_dataset
+from scripts.parametres import SECTEURS
+from scripts.pipeline import ETAPES, PARAMETRES, run_pipeline
+from scripts.prix import fixture_provider
+
+ORGANISATIONS = ["RENAULT S.A.S.", "Valeo Systemes Thermiques", "L'OREAL", "SAFRAN AIRCRAFT ENGINES",
+                 "COMMISSARIAT A L'ENERGIE ATOMIQUE", "None", "NA", "Université de Lorraine"]
+CANDIDATS = [["AR", 1, 0], ["AR", 2, 0], ["MA", 0, 1], ["ARMA", 1, 1]]
+AVAL_SECTEURS = {"brevets_secteurs", "donnees_completes", "scan_lags", "lags_optimaux", "selection_arma"}
+
+
+def brevets(n, graine=0):
+    """ Brevets synthétiques aux colonnes de ANALYSIS_COLUMNS (types, doublons, déposants). """
+    rng = np.random.default_rng(graine)
+    df = corpus(n, graine)
+    df["year"] = df["publication_date"].dt.year.astype("Int64")
+    df["kind"] = pd.array(rng.choice(["A1", "A1", "A1", "B1", "A3", None], n), dtype="string")
+    mots = np.array(MOTS, dtype=object)
+    titres = np.array([" ".join(rng.choice(mots, 6)) + f" {k}" for k in range(n // 2)], dtype=object)
+    df["invention-title"] = pd.array(titres[rng.integers(0, len(titres), n)], dtype="string")
+    df["abstract"] = pd.array([f"resume {k}" for k in rng.integers(0, n, n)], dtype="string")
+    for k in (1, 2, 3):
+        df[f"applicant_{k}_orgname"] = pd.array(rng.choice(ORGANISATIONS + [None] * 4 * k, n), dtype="string")
+        df[f"applicant_{k}_country"] = pd.array(rng.choice(["FR", "DE", "NA", None], n), dtype="string")
+        df[f"inventor_{k}_country"] = pd.array(rng.choice(["FR", "US", "NA", None], n), dtype="string")
+    return df
+
+
+def chaine(fs, parametres, provider, prix_cache_path):
+    """ Chaîne du notebook : chaque étape appelée dans l'ordre, sans cache. """
+    sorties = {}
+    contexte = {"fs": fs, "provider": provider, "prix_cache_path": prix_cache_path, "n_processus": 1}
+    for etape, definition in ETAPES.items():
+        entrees = {e: sorties[e] for e in definition["entrees"]}
+        sorties[etape] = definition["fonction"](entrees, {p: parametres[p] for p in definition["parametres"]},
+                                                contexte)
+    return sorties
+
+
+def executer(n=200000, latence=1.0):
+    """ Retourne la durée et les étapes recalculées de chaque scénario. """
+    with tempfile.TemporaryDirectory() as dossier:
+        fs = LocalFileSystem()
+        dataset_path = os.path.join(dossier, "data_brevets")
+        write_brevets_dataset(brevets(n), fs, dataset_path)
+        chemin_cours = os.path.join(dossier, "cours.parquet")
+        ecrire_fixture(chemin_cours)
+        fixture = fixture_provider(chemin_cours)
+
+        def fournisseur(tickers, debut, fin):
+            time.sleep(latence)
+            return fixture(tickers, debut, fin)
+
+        parametres = {**PARAMETRES, "dataset_path": dataset_path, "candidats_arma": CANDIDATS}
+        resultats = {}
+
+        debut = time.perf_counter()
+        attendu = chaine(fs, parametres, fournisseur, os.path.join(dossier, "prix_chaine"))
+        resultats["chaine_notebook"] = {"duree_s": time.perf_counter() - debut, "calculees": list(ETAPES)}
+
+        def mesurer(nom, parametres):
+            debut = time.perf_counter()
+            sorties, journal = run_pipeline(
+                ["lags_optimaux", "selection_arma"], parametres, fs=fs,
+                cache_path=os.path.join(dossier, "cache"), provider=fournisseur,
+                prix_cache_path=os.path.join(dossier, "prix_pipeline"))
+            resultats[nom] = {"duree_s": time.perf_counter() - debut,
+                              "calculees": list(journal.loc[journal["statut"] == "calcul", "etape"])}
+            return sorties
+
+        sorties = mesurer("pipeline_cache_vide", parametres)
+        for etape in ("lags_optimaux", "selection_arma"):
+            pd.testing.assert_frame_equal(sorties[etape], attendu[etape])
+        mesurer("pipeline_sans_changement", parametres)
+        assert resultats["pipeline_sans_changement"]["calculees"] == []
+
+        secteurs = {**SECTEURS, "agro": SECTEURS["agro"] + ["H04W"]}
+        sorties = mesurer("pipeline_un_secteur_modifie", {**parametres, "secteurs": secteurs})
+        calculees = resultats["pipeline_un_secteur_modifie"]["calculees"]
+        assert set(calculees) == AVAL_SECTEURS, calculees
+        attendu = chaine(fs, {**parametres, "secteurs": secteurs}, fixture, os.path.join(dossier, "prix_chaine"))
+        for etape in ("lags_optimaux", "selection_arma"):
+            pd.testing.assert_frame_equal(sorties[etape], attendu[etape])
+
+        # Téléchargement échoué : prix n'est pas mis en cache et redemandé au lancement suivant
+        echecs = [RuntimeError("limite de débit")]
+
+        def fournisseur_instable(tickers, debut, fin):
+            if echecs:
+                raise echecs.pop()
+            return fixture(tickers, debut, fin)
+
+        statuts = []
+        for _ in range(3):
+            sorties, journal = run_pipeline(["prix"], parametres, fs=fs,
+                                            cache_path=os.path.join(dossier, "cache_instable"),
+                                            provider=fournisseur_instable,
+                                            prix_cache_path=os.path.join(dossier, "prix_instable"))
+            statuts.append(journal.set_index("etape").loc["prix", "statut"])
+        assert statuts == ["calcul", "calcul", "cache"], statuts
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200000)
+    parser.add_argument("--latence", type=float, default=1.0)
+    args = parser.parse_args()
+    for nom, res in executer(args.n, args.latence).items():
+        print(f"{nom:<30} {res['duree_s']:7.2f} s   étapes calculées : {len(res['calculees'])}")
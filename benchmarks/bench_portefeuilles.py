@@ -0,0 +1,75 @@
+"""
+Compare le calcul des rendements du notebook (calculer_rendement_portefeuille
+appelé portefeuille par portefeuille) contre scripts.portefeuilles
+(tous les portefeuilles en un produit matriciel).
+
+    python -m benchmarks.bench_portefeuilles --n-portefeuilles 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_prix import TICKERS
+from scripts.portefeuilles import build_weight_matrix, portfolio_returns
+
+
+def calculer_rendement_portefeuille(prices_df, tickers, poids_special=None):
+    """ Fonction du notebook, gardée comme référence. """
+    tickers_dispo = [t for t in tickers if t in prices_df.columns]
+    if len(tickers_dispo) == 0:
+        return pd.Series([np.nan] * len(prices_df))
+    poids = pd.Series(1.0, index=tickers_dispo)
+    if poids_special:
+        for ticker, weight in poids_special.items():
+            if ticker in poids.index:
+                poids[ticker] = weight
+    poids = poids / poids.sum()
+    portefeuille_value = (prices_df[tickers_dispo] * poids).sum(axis=1)
+    return np.log(portefeuille_value / portefeuille_value.shift(1))
+
+
+def executer(n_portefeuilles=5000, n_mois=96, graine=0):
+    """ Retourne les durées des deux calculs après vérification des rendements. """
+    rng = np.random.default_rng(graine)
+    prix = 100 * np.exp(np.cumsum(rng.normal(0, 0.05, (n_mois, len(TICKERS))), axis=0))
+    prices_monthly = pd.DataFrame(prix, columns=TICKERS)
+    prices_monthly.insert(0, "Date", pd.date_range("2017-01-31", periods=n_mois, freq="ME"))
+    portefeuilles = {f"portefeuille_{k}": list(rng.choice(TICKERS, rng.integers(3, 11), replace=False))
+                     for k in range(n_portefeuilles)}
+    ponderations_speciales = {"MC": 0.485}
+
+    debut = time.perf_counter()
+    data_rendements = prices_monthly[["Date"]].copy()
+    colonnes = {}
+    for nom_portfolio, tickers in portefeuilles.items():
+        colonnes[f"return_log_{nom_portfolio}"] = calculer_rendement_portefeuille(
+            prices_monthly, tickers, ponderations_speciales)
+    data_rendements = pd.concat([data_rendements, pd.DataFrame(colonnes)], axis=1)
+    duree_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    poids = build_weight_matrix(portefeuilles, ponderations_speciales, tickers=TICKERS)
+    obtenu = portfolio_returns(prices_monthly, poids)
+    duree_matrice = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    portfolio_returns(prices_monthly, poids, reequilibrage="QE", kinds=("log", "simple"))
+    duree_reequilibrage = time.perf_counter() - debut
+
+    pd.testing.assert_frame_equal(obtenu, data_rendements)
+    return {"n_portefeuilles": n_portefeuilles, "boucle_s": duree_boucle,
+            "matrice_s": duree_matrice, "matrice_reequilibrage_s": duree_reequilibrage}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-portefeuilles", type=int, default=5000)
+    args = parser.parse_args()
+    res = executer(args.n_portefeuilles)
+    print(f"{res['n_portefeuilles']} portefeuilles")
+    print(f"boucle du notebook        {res['boucle_s']:8.3f} s")
+    print(f"produit matriciel         {res['matrice_s']:8.3f} s")
+    print(f"  rééquilibrage trimestriel, log et simple {res['matrice_reequilibrage_s']:8.3f} s")
+    print(f"accélération x{res['boucle_s'] / res['matrice_s']:.0f}")
@@ -0,0 +1,108 @@
+"""
+Compare le chargement des cours du notebook (téléchargement complet à
+chaque exécution) contre le cache de scripts.prix, avec un fournisseur
+hors ligne qui simule la latence réseau de Yahoo Finance.
+
+    python -m benchmarks.bench_prix --latence 1.0
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fsspec
+import numpy as np
+import pandas as pd
+
+from scripts.prix import EMPTY_KEY, _read_cache, fixture_provider, load_prices, monthly_close
+
+TICKERS = ["RNO", "ML", "FR", "FRVIA", "OPM", "AKW", "SAN", "IPN", "DIM", "BIM", "EAPI", "VIRP",
+           "GBT", "VETO", "HO", "SAF", "AM", "ETL", "EXA", "MC", "RMS", "KER", "CDI", "SMCP",
+           "OR", "ITP", "RBT", "ORA", "EN", "OVH", "WLN", "TEP", "BN", "RI", "RCO", "SAVE",
+           "BON", "VRLA", "ALGIL", "DG", "FGR", "SGO", "SU", "LR", "SPIE", "NEX"]
+
+
+def ecrire_fixture(chemin, debut="2016-01-01", fin="2025-12-31", graine=0):
+    """ Cours journaliers synthétiques (marche aléatoire) au format large. """
+    rng = np.random.default_rng(graine)
+    dates = pd.bdate_range(debut, fin)
+    prix = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (len(dates), len(TICKERS))), axis=0))
+    data = pd.DataFrame(prix, columns=TICKERS)
+    data.insert(0, "Date", dates)
+    data.to_parquet(chemin, index=False)
+
+
+def verifier_ticker_vide(fournisseur, cache, debut="2020-01-01", fin="2020-02-01"):
+    """
+    Un ticker radié (colonne entièrement vide, comme yfinance) n'est ni mis
+    en cache ni marqué couvert, et n'est redemandé qu'après le délai de relance.
+    """
+    demandes = []
+
+    def avec_radie(tickers, a, b):
+        demandes.append(sorted(tickers))
+        prix = fournisseur([t for t in tickers if t != "DELIST"], a, b)
+        radie = pd.DataFrame({"Date": pd.bdate_range(a, b, inclusive="left"), "ticker": "DELIST",
+                              "close": np.nan})
+        return pd.concat([prix, radie.astype(prix.dtypes.to_dict())], ignore_index=True)
+
+    prices = load_prices(["OR", "DELIST"], debut, fin, avec_radie, cache_path=cache)
+    assert list(prices.columns) == ["Date", "OR"], prices.columns
+    cache_prix, couverture = _read_cache(fsspec.filesystem("file"), cache)
+    assert "DELIST" not in couverture and not cache_prix["close"].isna().any()
+    assert list(couverture[EMPTY_KEY]) == ["DELIST"], couverture
+    # Tentative récente : pas de nouvel appel ; délai écoulé : la période est redemandée
+    load_prices(["OR", "DELIST"], debut, fin, avec_radie, cache_path=cache)
+    assert demandes == [["DELIST", "OR"]], demandes
+    load_prices(["OR", "DELIST"], debut, fin, avec_radie, cache_path=cache, relance_vides_jours=0)
+    assert demandes == [["DELIST", "OR"], ["DELIST"]], demandes
+
+
+def executer(latence=1.0, debut="2017-01-01", fin="2024-12-31"):
+    """ Retourne durée et nombre d'appels au fournisseur pour chaque scénario. """
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "cours.parquet")
+        ecrire_fixture(chemin)
+        fixture = fixture_provider(chemin)
+        appels = []
+
+        def fournisseur(tickers, a, b):
+            appels.append(len(tickers))
+            time.sleep(latence)
+            return fixture(tickers, a, b)
+
+        resultats = {}
+
+        def mesurer(nom, fonction):
+            appels.clear()
+            debut_mesure = time.perf_counter()
+            prices = fonction()
+            monthly_close(prices)
+            resultats[nom] = {"duree_s": time.perf_counter() - debut_mesure,
+                              "appels_fournisseur": len(appels)}
+            return prices
+
+        # Notebook : tout le téléchargement à chaque exécution
+        attendu = mesurer("telechargement", lambda: (
+            fournisseur(TICKERS, pd.Timestamp(debut), pd.Timestamp(fin))
+            .pivot(index="Date", columns="ticker", values="close")[TICKERS].reset_index()))
+        cache = os.path.join(dossier, "cache")
+        mesurer("cache_premier", lambda: load_prices(TICKERS, debut, fin, fournisseur, cache_path=cache))
+        obtenu = mesurer("cache_suivant", lambda: load_prices(TICKERS, debut, fin, fournisseur,
+                                                              cache_path=cache))
+        # Extension de la période : seul le mois manquant est demandé
+        mesurer("cache_extension", lambda: load_prices(TICKERS, debut, "2025-02-01", fournisseur,
+                                                       cache_path=cache))
+        verifier_ticker_vide(fournisseur, os.path.join(dossier, "cache_vide"))
+    attendu.columns.name = None
+    pd.testing.assert_frame_equal(obtenu, attendu, check_column_type=False)
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latence", type=float, default=1.0)
+    args = parser.parse_args()
+    res = executer(args.latence)
+    for nom, r in res.items():
+        print(f"{nom:<16} {r['duree_s'] * 1000:9.1f} ms  {r['appels_fournisseur']} appel(s) au fournisseur")
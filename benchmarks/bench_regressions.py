@@ -0,0 +1,126 @@
+"""
+Compare la recherche des lags optimaux du notebook (LinearRegression puis
+linregress pour chaque secteur et chaque retard) contre scripts.regressions
+(toutes les régressions en forme fermée), et vérifie que les tableaux
+df_tous_resultats et df_lags_optimaux sont identiques. Les écarts-types HAC
+sont vérifiés contre statsmodels.
+
+    python -m benchmarks.bench_regressions --lag-max 36
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+from scripts.parametres import CORRESPONDANCES
+from scripts.regressions import scan_lags, select_optimal_lags
+
+
+def boucle_notebook(data_complete, correspondances, lags_a_tester):
+    """ Cellule de recherche des lags du notebook, sans les affichages. """
+    tous_resultats = []
+    for secteur_brevet, nom_portefeuille in correspondances.items():
+        col_croissance = f"croiss_log_brevets_{secteur_brevet}"
+        col_rendement = f"return_log_{nom_portefeuille}"
+        if col_croissance not in data_complete.columns or col_rendement not in data_complete.columns:
+            continue
+        for lag in lags_a_tester:
+            df_lag = data_complete[[col_croissance, col_rendement]].copy()
+            df_lag[f"{col_croissance}_lag{lag}"] = df_lag[col_croissance].shift(lag)
+            df_reg = df_lag[[f"{col_croissance}_lag{lag}", col_rendement]].dropna()
+            X = df_reg[f"{col_croissance}_lag{lag}"].values.reshape(-1, 1)
+            y = df_reg[col_rendement].values
+            model = LinearRegression()
+            model.fit(X, y)
+            r2 = r2_score(y, model.predict(X))
+            slope, intercept_scipy, r_value, p_value, std_err = stats.linregress(X.flatten(), y)
+            tous_resultats.append({
+                "Secteur": secteur_brevet, "Lag_mois": lag, "N_obs": len(df_reg),
+                "Coefficient_β": model.coef_[0], "Constante_α": model.intercept_, "R²": r2,
+                "P-value": p_value, "Std_Error": std_err,
+                "Significatif": "Oui" if p_value < 0.05 else "Non",
+            })
+    df_tous_resultats = pd.DataFrame(tous_resultats)
+
+    lag_optimal_par_secteur = []
+    for secteur in correspondances.keys():
+        df_secteur = df_tous_resultats[df_tous_resultats["Secteur"] == secteur].copy()
+        df_significatif = df_secteur[df_secteur["P-value"] < 0.05]
+        if len(df_significatif) > 0:
+            meilleur = df_significatif.loc[df_significatif["R²"].idxmax()]
+        else:
+            meilleur = df_secteur.loc[df_secteur["R²"].idxmax()]
+        lag_optimal_par_secteur.append(meilleur)
+    return df_tous_resultats, pd.DataFrame(lag_optimal_par_secteur)
+
+
+def donnees(n_mois=96, graine=0):
+    """ data_complete synthétique : les rendements dépendent de la croissance retardée d'un mois. """
+    rng = np.random.default_rng(graine)
+    data_complete = pd.DataFrame({"Date": pd.date_range("2017-01-31", periods=n_mois, freq="ME")})
+    for k, (secteur, portefeuille) in enumerate(CORRESPONDANCES.items()):
+        croissance = rng.normal(0, 0.3, n_mois)
+        rendement = 0.005 + 0.02 * (k % 3) * np.roll(croissance, 1) + rng.normal(0, 0.05, n_mois)
+        croissance[0] = np.nan
+        rendement[0] = np.nan
+        croissance[rng.random(n_mois) < 0.03] = np.nan
+        data_complete[f"croiss_log_brevets_{secteur}"] = croissance
+        data_complete[f"return_log_{portefeuille}"] = rendement
+    return data_complete
+
+
+def verifier_hac(data_complete, lags, maxlags=3):
+    """ Écarts-types et p-values HAC contre OLS.fit(cov_type="HAC") de statsmodels. """
+    obtenu = scan_lags(data_complete, CORRESPONDANCES, lags, hac_maxlags=maxlags)
+    for _, ligne in obtenu.iterrows():
+        col_croissance = f"croiss_log_brevets_{ligne['Secteur']}"
+        col_rendement = f"return_log_{CORRESPONDANCES[ligne['Secteur']]}"
+        df_reg = pd.DataFrame({"x": data_complete[col_croissance].shift(ligne["Lag_mois"]),
+                               "y": data_complete[col_rendement]}).dropna()
+        res = sm.OLS(df_reg["y"], sm.add_constant(df_reg["x"])).fit(
+            cov_type="HAC", cov_kwds={"maxlags": maxlags})
+        assert np.isclose(res.bse["x"], ligne["Std_Error"], rtol=1e-8)
+        assert np.isclose(res.pvalues["x"], ligne["P-value"], rtol=1e-8, atol=1e-300)
+
+
+def executer(lag_max=36, n_mois=96):
+    """ Retourne les durées des deux recherches après vérification des tableaux. """
+    data_complete = donnees(n_mois)
+    lags = list(range(lag_max + 1))
+
+    debut = time.perf_counter()
+    attendu, attendu_optimaux = boucle_notebook(data_complete, CORRESPONDANCES, lags)
+    duree_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    obtenu = scan_lags(data_complete, CORRESPONDANCES, lags)
+    obtenu_optimaux = select_optimal_lags(obtenu)
+    duree_forme_fermee = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    scan_lags(data_complete, CORRESPONDANCES, lags, hac_maxlags=3)
+    duree_hac = time.perf_counter() - debut
+
+    pd.testing.assert_frame_equal(obtenu, attendu, check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(obtenu_optimaux, attendu_optimaux, check_dtype=False, rtol=1e-9)
+    verifier_hac(data_complete, lags[:5])
+    return {"n_regressions": len(obtenu), "boucle_s": duree_boucle,
+            "forme_fermee_s": duree_forme_fermee, "forme_fermee_hac_s": duree_hac}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lag-max", type=int, default=36)
+    parser.add_argument("--n-mois", type=int, default=96)
+    args = parser.parse_args()
+    res = executer(args.lag_max, args.n_mois)
+    print(f"{res['n_regressions']} régressions (secteur x retard)")
+    print(f"boucle du notebook     {res['boucle_s'] * 1000:9.1f} ms")
+    print(f"forme fermée           {res['forme_fermee_s'] * 1000:9.1f} ms")
+    print(f"forme fermée, HAC      {res['forme_fermee_hac_s'] * 1000:9.1f} ms")
+    print(f"accélération x{res['boucle_s'] / res['forme_fermee_s']:.0f}")
@@ -0,0 +1,215 @@
+"""
+Extracteur historique à base de recherches ElementPath, utilisé comme
+référence (corpus doré) par bench_extracteur.
+"""
+import xml.etree.ElementTree as ET
+
+
+def extract_brevet_record_find(xml_file_path, max_entries=3):
+    """
+    Version de référence de extract_brevet_record à base de recherches
+    root.find(".//…"), conservée pour vérifier l'extracteur en un seul parcours.
+    Args:
+        xml_file_path (str): Chemin vers le fichier XML (ou objet fichier).
+        max_entries (int): Nombre maximum d'entrées pour chaque catégorie.
+    Returns:
+        dict: Colonne -> valeur (None si l'information est absente).
+    """
+    # Parse le fichier XML
+    tree = ET.parse(xml_file_path)
+    root = tree.getroot()
+    # Initialisation des variables
+    data = {}
+    # Informations générales
+    data["doc-number"] = root.attrib.get("doc-number")
+    data["kind"] = root.attrib.get("kind")
+    data["country"] = root.attrib.get("country")
+    data["status"] = root.attrib.get("status")
+    # Publication data
+    publication_data = root.find(".//fr-publication-data/fr-publication-reference")
+    if publication_data is not None:
+        data["publication_country"] = publication_data.find(".//country").text \
+            if publication_data.find(".//country") is not None else None
+        data["publication_doc-number"] = publication_data.find(".//doc-number").text \
+            if publication_data.find(".//doc-number") is not None else None
+        data["publication_date"] = publication_data.find(".//date").text \
+            if publication_data.find(".//date") is not None else None
+        data["publication_bopinum"] = publication_data.find(".//fr-bopinum").text \
+            if publication_data.find(".//fr-bopinum") is not None else None
+        data["publication_nature"] = publication_data.find(".//fr-nature").text \
+            if publication_data.find(".//fr-nature") is not None else None
+    # Application reference
+    application_reference = root.find(".//fr-application-reference")
+    if application_reference is not None:
+        data["application_country"] = application_reference.find(".//country").text \
+            if application_reference.find(".//country") is not None else None
+        data["application_doc-number"] = application_reference.find(".//doc-number").text \
+            if application_reference.find(".//doc-number") is not None else None
+        data["application_date"] = application_reference.find(".//date").text \
+            if application_reference.find(".//date") is not None else None
+    # Titre de l'invention
+    data["invention-title"] = root.find(".//invention-title").text \
+        if root.find(".//invention-title") is not None else None
+    # Déposants (applicants)
+    for i in range(1, max_entries + 1):
+        applicant = root.find(".//applicant[@sequence='{}']".format(i))
+        if applicant is not None:
+            orgname = applicant.find(".//orgname")
+            if orgname is not None:
+                data[f"applicant_{i}_orgname"] = orgname.text
+            else:
+                last_name = applicant.find(".//last-name")
+                first_name = applicant.find(".//first-name")
+                full_name = f"{last_name.text} {first_name.text}" \
+                    if last_name is not None and first_name is not None else None
+                data[f"applicant_{i}_orgname"] = full_name
+            address = applicant.find(".//address")
+            if address is not None:
+                data[f"applicant_{i}_address-1"] = address.find(".//address-1").text \
+                    if address.find(".//address-1") is not None else None
+                data[f"applicant_{i}_city"] = address.find(".//city").text \
+                    if address.find(".//city") is not None else None
+                data[f"applicant_{i}_postcode"] = address.find(".//postcode").text \
+                    if address.find(".//postcode") is not None else None
+                data[f"applicant_{i}_country"] = address.find(".//country").text \
+                    if address.find(".//country") is not None else None
+        else:
+            data[f"applicant_{i}_orgname"] = None
+            data[f"applicant_{i}_address-1"] = None
+            data[f"applicant_{i}_city"] = None
+            data[f"applicant_{i}_postcode"] = None
+            data[f"applicant_{i}_country"] = None
+    # Inventeurs (inventors)
+    for i in range(1, max_entries + 1):
+        inventor = root.find(".//inventor[@sequence='{}']".format(i))
+        if inventor is not None:
+            last_name = inventor.find(".//last-name")
+            data[f"inventor_{i}_last-name"] = last_name.text \
+                if last_name is not None else None
+            first_name = inventor.find(".//first-name")
+            data[f"inventor_{i}_first-name"] = first_name.text \
+                if first_name is not None else None
+            address = inventor.find(".//address")
+            if address is not None:
+                data[f"inventor_{i}_address-1"] = address.find(".//address-1").text \
+                    if address.find(".//address-1") is not None else None
+                data[f"inventor_{i}_city"] = address.find(".//city").text \
+                    if address.find(".//city") is not None else None
+                data[f"inventor_{i}_postcode"] = address.find(".//postcode").text \
+                    if address.find(".//postcode") is not None else None
+                data[f"inventor_{i}_country"] = address.find(".//country").text \
+                    if address.find(".//country") is not None else None
+        else:
+            data[f"inventor_{i}_last-name"] = None
+            data[f"inventor_{i}_first-name"] = None
+            data[f"inventor_{i}_address-1"] = None
+            data[f"inventor_{i}_city"] = None
+            data[f"inventor_{i}_postcode"] = None
+            data[f"inventor_{i}_country"] = None
+    # Agents
+    for i in range(1, max_entries + 1):
+        agent = root.find(".//agent[@sequence='{}']".format(i))
+        if agent is not None:
+            orgname = agent.find(".//orgname")
+            data[f"agent_{i}_orgname"] = orgname.text \
+                if orgname is not None else None
+            address = agent.find(".//address")
+            if address is not None:
+                data[f"agent_{i}_address-1"] = address.find(".//address-1").text \
+                    if address.find(".//address-1") is not None else None
+                data[f"agent_{i}_city"] = address.find(".//city").text \
+                    if address.find(".//city") is not None else None
+                data[f"agent_{i}_postcode"] = address.find(".//postcode").text \
+                    if address.find(".//postcode") is not None else None
+                data[f"agent_{i}_country"] = address.find(".//country").text \
+                    if address.find(".//country") is not None else None
+        else:
+            data[f"agent_{i}_orgname"] = None
+            data[f"agent_{i}_address-1"] = None
+            data[f"agent_{i}_city"] = None
+            data[f"agent_{i}_postcode"] = None
+            data[f"agent_{i}_country"] = None
+    # Propriétaires (owners)
+    for i in range(1, max_entries + 1):
+        owner = root.find(".//fr-owner[@sequence='{}']".format(i))
+        if owner is not None:
+            last_name = owner.find(".//last-name")
+            data[f"owner_{i}_last-name"] = last_name.text \
+                if last_name is not None else None
+            first_name = owner.find(".//first-name")
+            data[f"owner_{i}_first-name"] = first_name.text \
+                if first_name is not None else None
+            address = owner.find(".//address")
+            if address is not None:
+                data[f"owner_{i}_address-1"] = address.find(".//address-1").text \
+                    if address.find(".//address-1") is not None else None
+                data[f"owner_{i}_city"] = address.find(".//city").text \
+                    if address.find(".//city") is not None else None
+                data[f"owner_{i}_postcode"] = address.find(".//postcode").text \
+                    if address.find(".//postcode") is not None else None
+                data[f"owner_{i}_country"] = address.find(".//country").text \
+                    if address.find(".//country") is not None else None
+        else:
+            data[f"owner_{i}_last-name"] = None
+            data[f"owner_{i}_first-name"] = None
+            data[f"owner_{i}_address-1"] = None
+            data[f"owner_{i}_city"] = None
+            data[f"owner_{i}_postcode"] = None
+            data[f"owner_{i}_country"] = None
+    # Classifications CIB (IPC)
+    for i in range(1, max_entries + 1):
+        classification = root.find(".//classification-ipcr[@sequence='{}']".format(i))
+        if classification is not None:
+            data[f"classification_{i}_text"] = classification.find(".//text").text \
+                if classification.find(".//text") is not None else None
+        else:
+            data[f"classification_{i}_text"] = None
+    # Résumé (abstract)
+    abstract = root.find(".//abstract/p")
+    data["abstract"] = abstract.text if abstract is not None else None
+    # Références citées (citations)
+    for i in range(1, max_entries + 1):
+        citation = root.find(".//citation[{}]".format(i))
+        if citation is not None:
+            patcit = citation.find(".//patcit")
+            if patcit is not None:
+                data[f"citation_{i}_type"] = "patcit"
+                data[f"citation_{i}_text"] = patcit.find(".//text").text \
+                    if patcit.find(".//text") is not None else None
+                document_id = patcit.find(".//document-id")
+                if document_id is not None:
+                    data[f"citation_{i}_country"] = document_id.find(".//country").text \
+                        if document_id.find(".//country") is not None else None
+                    data[f"citation_{i}_doc-number"] = document_id.find(".//doc-number").text \
+                        if document_id.find(".//doc-number") is not None else None
+                    data[f"citation_{i}_date"] = document_id.find(".//date").text \
+                        if document_id.find(".//date") is not None else None
+            else:
+                nplcit = citation.find(".//nplcit")
+                if nplcit is not None:
+                    data[f"citation_{i}_type"] = "nplcit"
+                    data[f"citation_{i}_text"] = nplcit.find(".//text").text \
+                        if nplcit.find(".//text") is not None else None
+                else:
+                    data[f"citation_{i}_type"] = None
+                    data[f"citation_{i}_text"] = None
+                    data[f"citation_{i}_country"] = None
+                    data[f"citation_{i}_doc-number"] = None
+                    data[f"citation_{i}_date"] = None
+        else:
+            data[f"citation_{i}_type"] = None
+            data[f"citation_{i}_text"] = None
+            data[f"citation_{i}_country"] = None
+            data[f"citation_{i}_doc-number"] = None
+            data[f"citation_{i}_date"] = None
+    # Dates de disponibilité
+    date_availability = root.find(".//fr-date-availability")
+    if date_availability is not None:
+        data["last-fee-payement"] = date_availability.find(".//fr-last-fee-payement/date").text \
+            if date_availability.find(".//fr-last-fee-payement/date") is not None else None
+        data["next-fee-payement"] = date_availability.find(".//fr-next-fee-payement/date").text \
+            if date_availability.find(".//fr-next-fee-payement/date") is not None else None
+        data["date-search-completed"] = \
+            date_availability.find(".//fr-date-search-completed/date").text \
+            if date_availability.find(".//fr-date-search-completed/date") is not None else None
+    return data
@@ -0,0 +1,167 @@
+"""
+Suite des benchmarks des chemins critiques : parsing des XML et ingestion
+instrumentée des ZIP, dédoublonnage, agrégation CIB, rendements de
+portefeuilles, recherche des lags et sélection ARMA. Chaque benchmark vérifie
+ses résultats contre sa référence ; les mesures scalaires sont écrites dans un
+JSON horodaté avec le commit, les versions des bibliothèques et la machine,
+pour comparer deux commits sur la même échelle.
+
+    python -m benchmarks.run --taille petite --repetitions 3
+    python -m benchmarks.run --taille complete --profondeur 3 --benchmarks importation dedoublonnage
+    python -m benchmarks.run --comparer benchmarks/resultats/avant.json benchmarks/resultats/apres.json
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+BIBLIOTHEQUES = ["numpy", "pandas", "scipy", "statsmodels", "pyarrow", "fsspec"]
+
+# Benchmark -> (module, paramètres de executer) pour chaque taille
+SUITE = {
+    "extracteur": ("benchmarks.bench_extracteur", {"petite": {"n": 500}, "complete": {"n": 3000}}),
+    "importation": ("benchmarks.bench_importation",
+                    {"petite": {"zips_par_annee": 4, "xml_par_zip": 100},
+                     "complete": {"zips_par_annee": 16, "xml_par_zip": 500}}),
+    "dedoublonnage": ("benchmarks.bench_dedoublonnage", {"petite": {"n": 100000}, "complete": {"n": 1000000}}),
+    "cib": ("benchmarks.bench_cib", {"petite": {"n": 50000}, "complete": {"n": 500000}}),
+    "portefeuilles": ("benchmarks.bench_portefeuilles",
+                      {"petite": {"n_portefeuilles": 500}, "complete": {"n_portefeuilles": 5000}}),
+    "regressions": ("benchmarks.bench_regressions", {"petite": {"lag_max": 12}, "complete": {"lag_max": 36}}),
+    "modeles": ("benchmarks.bench_modeles", {"petite": {"n_workers": 1, "n_mois": 60},
+                                             "complete": {"n_workers": 1, "n_mois": 90}}),
+}
+
+
+def est_duree(cle):
+    """ Mesure de durée (suffixe _s ou _us), par opposition aux débits (_par_s) et compteurs. """
+    return cle.endswith(("_s", "_us")) and not cle.endswith("_par_s")
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environnement():
+    """ Commit, état du dépôt, versions et machine, pour juger si deux résultats sont comparables. """
+    versions = {}
+    for nom in BIBLIOTHEQUES:
+        try:
+            versions[nom] = metadata.version(nom)
+        except metadata.PackageNotFoundError:
+            versions[nom] = None
+    modifie = _git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": _git("rev-parse", "HEAD"), "branche": _git("rev-parse", "--abbrev-ref", "HEAD"),
+            "modifications_non_commitees": bool(modifie) if modifie is not None else None,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "bibliotheques": versions, "machine": platform.machine(), "systeme": platform.platform(),
+            "processeurs": os.cpu_count()}
+
+
+def aplatir(resultat, prefixe=""):
+    """ Garde les mesures scalaires (nombres, booléens, textes), clés imbriquées jointes par des points. """
+    mesures = {}
+    for cle, valeur in resultat.items():
+        nom = f"{prefixe}{cle}"
+        if isinstance(valeur, dict):
+            mesures.update(aplatir(valeur, nom + "."))
+        elif isinstance(valeur, (bool, int, float, str)) or valeur is None:
+            mesures[nom] = valeur
+        elif hasattr(valeur, "item") and getattr(valeur, "ndim", None) == 0:
+            mesures[nom] = valeur.item()
+    return mesures
+
+
+def executer(benchmarks=None, taille="petite", repetitions=1, profondeur=None):
+    """
+    Exécute les benchmarks demandés (tous par défaut). Les durées sont les
+    minimums sur les répétitions, les autres mesures celles de la première.
+    Returns:
+        dict: environnement, paramètres et mesures de chaque benchmark.
+    """
+    resultats = {"environnement": environnement(), "taille": taille, "repetitions": repetitions,
+                 "benchmarks": {}}
+    for nom in benchmarks or SUITE:
+        module, tailles = SUITE[nom]
+        parametres = dict(tailles[taille])
+        if nom == "importation" and profondeur is not None:
+            parametres["profondeur"] = profondeur
+        executer_bench = importlib.import_module(module).executer
+        mesures = {}
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            for cle, valeur in aplatir(executer_bench(**parametres)).items():
+                if cle not in mesures:
+                    mesures[cle] = valeur
+                elif est_duree(cle) and valeur is not None:
+                    mesures[cle] = min(mesures[cle], valeur)
+        resultats["benchmarks"][nom] = {"parametres": parametres, "total_s": time.perf_counter() - debut,
+                                        "mesures": mesures}
+        print(f"{nom:<15} {resultats['benchmarks'][nom]['total_s']:8.2f} s", file=sys.stderr)
+    return resultats
+
+
+def comparer(avant, apres):
+    """
+    Durées de deux fichiers de résultats, benchmark par benchmark.
+    Returns:
+        list: Lignes (benchmark, mesure, avant, après, rapport après / avant).
+    """
+    lignes = []
+    for nom, bench in apres["benchmarks"].items():
+        reference = avant["benchmarks"].get(nom)
+        if reference is None:
+            continue
+        if reference["parametres"] != bench["parametres"]:
+            print(f"⚠️ {nom} : paramètres différents, comparaison indicative", file=sys.stderr)
+        for cle, valeur in bench["mesures"].items():
+            ancien = reference["mesures"].get(cle)
+            if est_duree(cle) and isinstance(valeur, (int, float)) and isinstance(ancien, (int, float)):
+                lignes.append((nom, cle, ancien, valeur, valeur / ancien if ancien else float("nan")))
+    return lignes
+
+
+def _charger(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--benchmarks", nargs="+", choices=list(SUITE))
+    parser.add_argument("--taille", choices=["petite", "complete"], default="petite")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--profondeur", type=int, help="Profondeur d'imbrication des ZIP (importation)")
+    parser.add_argument("--sortie", default=os.path.join("benchmarks", "resultats"))
+    parser.add_argument("--comparer", nargs=2, metavar=("AVANT", "APRES"))
+    args = parser.parse_args()
+
+    if args.comparer:
+        avant, apres = (_charger(c) for c in args.comparer)
+        for fichier in (avant, apres):
+            env = fichier["environnement"]
+            print(f"{(env['commit'] or '?')[:10]}{' (modifié)' if env['modifications_non_commitees'] else ''}  "
+                  f"{env['date']}  {env['machine']}  {env['processeurs']} processeurs")
+        if avant["environnement"]["systeme"] != apres["environnement"]["systeme"]:
+            print("⚠️ Machines différentes, comparaison indicative", file=sys.stderr)
+        for nom, cle, ancien, valeur, rapport in comparer(avant, apres):
+            print(f"{nom:<15} {cle:<40} {ancien:10.4f} {valeur:10.4f}  x{rapport:6.2f}")
+    else:
+        resultats = executer(args.benchmarks, args.taille, args.repetitions, args.profondeur)
+        os.makedirs(args.sortie, exist_ok=True)
+        env = resultats["environnement"]
+        horodatage = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        chemin = os.path.join(args.sortie, f"{horodatage}_{(env['commit'] or 'sans-git')[:10]}_{args.taille}.json")
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=1, ensure_ascii=False, default=str)
+        print(chemin)
@@ -0,0 +1,194 @@
+import io
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+
+ORGANISATIONS = [
+    "RENAULT S.A.S", "VALEO VISION", "SAFRAN AIRCRAFT ENGINES", "L'OREAL",
+    "COMPAGNIE GENERALE DES ETABLISSEMENTS MICHELIN", "PSA AUTOMOBILES SA",
+    "COMMISSARIAT A L'ENERGIE ATOMIQUE", "SANOFI", "THALES", "ORANGE",
+]
+NOMS = ["MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "PETIT", "DURAND"]
+PRENOMS = ["Marie", "Jean", "Pierre", "Sophie", "Luc", "Claire", "Paul"]
+VILLES = [("PARIS", "75008"), ("LYON", "69003"), ("TOULOUSE", "31000"), ("LILLE", "59000")]
+CODES_CIB = [
+    "B60R  16/023", "B62D   1/04", "A61K   8/97", "A61Q  19/00", "H04L   9/32",
+    "C06B  45/00", "F02K   1/00", "A23L   2/52", "E04B   1/76", "G06F  17/30",
+]
+MOTS = ["dispositif", "procede", "systeme", "vehicule", "composition", "capteur",
+        "moteur", "batterie", "module", "cosmetique", "antenne", "structure"]
+
+
+def _texte(rng, n_mots):
+    return " ".join(rng.choice(MOTS) for _ in range(n_mots))
+
+
+def _adresse(rng):
+    ville, postcode = rng.choice(VILLES)
+    champs = [("address-1", f"{rng.randint(1, 200)} rue {rng.choice(NOMS).title()}"),
+              ("city", ville), ("postcode", postcode), ("country", rng.choice(["FR", "FR", "DE", "US"]))]
+    # Certains champs d'adresse sont absents, comme dans les bulletins réels
+    champs = [c for c in champs if rng.random() > 0.1]
+    return "<address>" + "".join(f"<{t}>{escape(v)}</{t}>" for t, v in champs) + "</address>"
+
+
+def _personne(rng):
+    return (f"<last-name>{rng.choice(NOMS)}</last-name>"
+            f"<first-name>{rng.choice(PRENOMS)}</first-name>")
+
+
+def generer_xml_brevet(rng, numero, taille_resume=40):
+    """
+    Génère le contenu (bytes) d'un document XML au format lu par
+    `extract_brevet_info` : références de publication et de dépôt,
+    déposants, inventeurs, mandataires, propriétaires, classifications CIB,
+    citations, résumé et dates de disponibilité.
+    """
+    annee = rng.randint(2016, 2024)
+    date_pub = f"{annee}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+    kind = rng.choice(["A1", "A1", "A1", "A1", "B1", "A3"])
+    parties = []
+
+    applicants = []
+    for i in range(1, rng.randint(0, 4) + 1):
+        if rng.random() < 0.8:
+            nom = f"<orgname>{escape(rng.choice(ORGANISATIONS))}</orgname>"
+        else:
+            nom = _personne(rng)
+        adresse = _adresse(rng) if rng.random() > 0.05 else ""
+        applicants.append(f'<applicant sequence="{i}" app-type="applicant">'
+                          f"<addressbook>{nom}{adresse}</addressbook></applicant>")
+    parties.append("<applicants>" + "".join(applicants) + "</applicants>")
+
+    inventors = []
+    for i in range(1, rng.randint(0, 5) + 1):
+        inventors.append(f'<inventor sequence="{i}"><addressbook>{_personne(rng)}'
+                         f"{_adresse(rng)}</addressbook></inventor>")
+    parties.append("<inventors>" + "".join(inventors) + "</inventors>")
+
+    agents = []
+    for i in range(1, rng.randint(0, 2) + 1):
+        agents.append(f'<agent sequence="{i}" rep-type="agent"><addressbook>'
+                      f"<orgname>CABINET {rng.choice(NOMS)}</orgname>{_adresse(rng)}"
+                      "</addressbook></agent>")
+    parties.append("<agents>" + "".join(agents) + "</agents>")
+
+    owners = []
+    for i in range(1, rng.randint(0, 2) + 1):
+        owners.append(f'<fr-owner sequence="{i}"><addressbook>{_personne(rng)}'
+                      f"{_adresse(rng)}</addressbook></fr-owner>")
+    if owners:
+        parties.append("<fr-owners>" + "".join(owners) + "</fr-owners>")
+
+    classifications = "".join(
+        f'<classification-ipcr sequence="{i}"><text>{rng.choice(CODES_CIB)}'
+        f"       20060101AFI{date_pub}BHFR</text></classification-ipcr>"
+        for i in range(1, rng.randint(0, 4) + 1)
+    )
+
+    citations = []
+    for _ in range(rng.randint(0, 4)):
+        if rng.random() < 0.7:
+            citations.append(
+                "<citation><patcit><document-id>"
+                f"<country>{rng.choice(['US', 'EP', 'FR', 'WO'])}</country>"
+                f"<doc-number>{rng.randint(1000000, 9999999)}</doc-number>"
+                f"<date>{rng.randint(2000, 2020)}0101</date>"
+                f"</document-id><text>{_texte(rng, 3)}</text></patcit></citation>"
+            )
+        else:
+            citations.append(f"<citation><nplcit><text>{_texte(rng, 6)}</text></nplcit></citation>")
+
+    titre = (f"<invention-title>{_texte(rng, rng.randint(3, 8))}</invention-title>"
+             if rng.random() > 0.02 else "")
+    resume = (f"<abstract><p>{_texte(rng, taille_resume)}</p></abstract>"
+              if rng.random() > 0.02 else "")
+
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<fr-patent-document id="FR{numero}{kind}" country="FR" doc-number="{numero}" '
+        f'kind="{kind}" date-publ="{date_pub}" status="n">'
+        "<fr-bibliographic-data>"
+        "<fr-publication-data><fr-publication-reference><document-id>"
+        f"<country>FR</country><doc-number>{numero}</doc-number><kind>{kind}</kind>"
+        f"<date>{date_pub}</date></document-id>"
+        f"<fr-bopinum>{annee}-{rng.randint(1, 52):02d}</fr-bopinum>"
+        "<fr-nature>DEMANDE DE BREVET D'INVENTION</fr-nature>"
+        "</fr-publication-reference></fr-publication-data>"
+        "<fr-application-reference><document-id><country>FR</country>"
+        f"<doc-number>{rng.randint(1500000, 2300000)}</doc-number>"
+        f"<date>{annee - 1}{rng.randint(1, 12):02d}15</date></document-id>"
+        "</fr-application-reference>"
+        f"<classifications-ipcr>{classifications}</classifications-ipcr>"
+        f"{titre}"
+        f"<parties>{''.join(parties)}</parties>"
+        "<fr-date-availability>"
+        f"<fr-last-fee-payement><date>{annee}0301</date></fr-last-fee-payement>"
+        f"<fr-next-fee-payement><date>{annee + 1}0301</date></fr-next-fee-payement>"
+        f"<fr-date-search-completed><date>{annee}0615</date></fr-date-search-completed>"
+        "</fr-date-availability>"
+        f"<references-cited>{''.join(citations)}</references-cited>"
+        "</fr-bibliographic-data>"
+        f"{resume}"
+        "</fr-patent-document>"
+    )
+    return xml.encode("utf-8")
+
+
+def generer_zip(rng, xml_par_zip, numero_depart, profondeur=1, compression=zipfile.ZIP_DEFLATED,
+                taille_annexe=0, destination=None):
+    """
+    Génère une archive ZIP contenant `xml_par_zip` documents et un TOC.xml.
+    Pour `profondeur` > 1, les documents sont répartis dans des ZIP imbriqués.
+    `taille_annexe` ajoute à chaque document une annexe binaire (dessins)
+    de cette taille en octets, ignorée par le parsing mais présente dans l'archive.
+    Écrit dans `destination` (objet fichier) si fourni, sinon retourne les bytes.
+    """
+    buffer = destination if destination is not None else io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        archive.writestr("TOC.xml", b"<toc/>")
+        if profondeur <= 1:
+            for k in range(xml_par_zip):
+                numero = numero_depart + k
+                archive.writestr(f"FR{numero}.xml", generer_xml_brevet(rng, numero))
+                if taille_annexe:
+                    archive.writestr(f"FR{numero}.tif", rng.randbytes(taille_annexe),
+                                     compress_type=zipfile.ZIP_STORED)
+        else:
+            n_internes = 2
+            taille = -(-xml_par_zip // n_internes)
+            for j in range(n_internes):
+                n = min(taille, xml_par_zip - j * taille)
+                if n <= 0:
+                    break
+                info = zipfile.ZipInfo(f"lot_{j}.zip")
+                info.compress_type = zipfile.ZIP_STORED
+                with archive.open(info, "w", force_zip64=True) as interne:
+                    generer_zip(rng, n, numero_depart + j * taille, profondeur - 1,
+                                compression, taille_annexe, destination=interne)
+    if destination is None:
+        return buffer.getvalue()
+
+
+def generer_arborescence(racine, annees=(2017, 2018), zips_par_annee=4, xml_par_zip=50,
+                         profondeur=1, taille_annexe=0, graine=0):
+    """
+    Écrit sous `racine` une arborescence `<année>/<semaine>/<lot>.zip`
+    comparable à celle du bucket INPI. Retourne la liste des ZIP écrits.
+    """
+    rng = random.Random(graine)
+    chemins = []
+    numero = 3000000
+    for annee in annees:
+        for k in range(zips_par_annee):
+            dossier = os.path.join(racine, str(annee), f"semaine_{k % 52 + 1:02d}")
+            os.makedirs(dossier, exist_ok=True)
+            chemin = os.path.join(dossier, f"FR_{annee}_{k:03d}.zip")
+            with open(chemin, "wb") as f:
+                generer_zip(rng, xml_par_zip, numero, profondeur, taille_annexe=taille_annexe,
+                            destination=f)
+            numero += xml_par_zip
+            chemins.append(chemin)
+    return chemins
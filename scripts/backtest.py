@@ -0,0 +1,268 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from arch import arch_model
+from scipy import stats
+from scipy.signal import lfilter
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+MODELES = ("MCO", "ARMA", "EWMA", "GARCH", "Naïf")
+
+
+def forecast_origins(n, n_train=None, fraction=0.8):
+    """
+    Dates de prévision (positions) d'une série de longueur n : chaque
+    origine t est prévue avec les seules observations antérieures à t.
+    Args:
+        n (int): Longueur de la série.
+        n_train (int): Taille du premier échantillon d'estimation,
+            int(n * fraction) par défaut (80/20 comme le notebook).
+    Returns:
+        np.ndarray: Positions n_train, ..., n - 1.
+    """
+    n_train = int(n * fraction) if n_train is None else n_train
+    return np.arange(n_train, n)
+
+
+def window_starts(origins, window=None):
+    """ Début de l'échantillon d'estimation de chaque origine (0 en fenêtre croissante). """
+    if window is None:
+        return np.zeros(len(origins), dtype=np.int64)
+    return np.maximum(np.asarray(origins) - window, 0)
+
+
+def _refit_blocks(origins, starts, refit_every):
+    """
+    Découpe les origines en blocs : les paramètres sont réestimés à la
+    première origine de chaque bloc puis réutilisés jusqu'au bloc suivant.
+    """
+    refit_every = 1 if refit_every is None else max(int(refit_every), 1)
+    for i in range(0, len(origins), refit_every):
+        j = min(i + refit_every, len(origins))
+        yield int(starts[i]), int(origins[i]), int(origins[j - 1]) + 1, slice(i, j)
+
+
+def naive_forecasts(y, origins):
+    """ Prévision naïve : la dernière valeur observée (T expliqué par T-1). """
+    return np.asarray(y, dtype="float64")[np.asarray(origins) - 1]
+
+
+def ols_forecasts(y, x, origins, window=None):
+    """
+    Prévisions MCO y_t = α + β x_t, réestimées à chaque origine en forme
+    fermée sur des sommes cumulées (aucune boucle sur les fenêtres).
+    Args:
+        y (np.ndarray): Rendements.
+        x (np.ndarray): Régresseur aligné sur y (croissance des brevets retardée).
+        origins (np.ndarray): Positions prévues.
+        window (int): Taille de la fenêtre glissante, croissante si None.
+    Returns:
+        np.ndarray: Une prévision par origine.
+    """
+    y = np.asarray(y, dtype="float64")
+    x = np.asarray(x, dtype="float64")
+    origins = np.asarray(origins)
+    starts = window_starts(origins, window)
+    # Centrage global pour limiter les pertes de précision des sommes cumulées
+    cx, cy = x - x.mean(), y - y.mean()
+
+    def somme(a):
+        cumul = np.concatenate([[0.0], np.cumsum(a)])
+        return cumul[origins] - cumul[starts]
+
+    n = (origins - starts).astype("float64")
+    sx, sy, sxx, sxy = somme(cx), somme(cy), somme(cx * cx), somme(cx * cy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        alpha = (sy - beta * sx) / n
+    return y.mean() + alpha + beta * cx[origins]
+
+
+def ewma_recursion(valeurs, alpha, niveau_initial):
+    """
+    Niveaux lissés l_t = α y_t + (1 - α) l_{t-1} à partir de niveau_initial,
+    calculés par scipy.signal.lfilter au lieu d'une boucle Python.
+    Returns:
+        np.ndarray: Niveau après chaque observation de valeurs.
+    """
+    valeurs = np.asarray(valeurs, dtype="float64")
+    niveaux, _ = lfilter([alpha], [1.0, alpha - 1.0], valeurs, zi=[(1.0 - alpha) * niveau_initial])
+    return niveaux
+
+
+def ewma_forecasts(y, origins, window=None, refit_every=12):
+    """
+    Prévisions EWMA (lissage exponentiel simple de statsmodels). α et le
+    niveau sont estimés à chaque réestimation, puis le niveau est mis à
+    jour par ewma_recursion avec le même α jusqu'à la réestimation suivante.
+    """
+    y = np.asarray(y, dtype="float64")
+    origins = np.asarray(origins)
+    previsions = np.empty(len(origins))
+    for debut, t0, t1, bloc in _refit_blocks(origins, window_starts(origins, window), refit_every):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            res = ExponentialSmoothing(y[debut:t0], trend=None, seasonal=None).fit()
+        niveau = res.forecast(1)[0]
+        niveaux = ewma_recursion(y[t0:t1 - 1], res.params["smoothing_level"], niveau)
+        previsions[bloc] = np.concatenate([[niveau], niveaux])[origins[bloc] - t0]
+    return previsions
+
+
+def arma_forecasts(y, origins, p, q, window=None, refit_every=12):
+    """
+    Prévisions à un pas d'un ARMA(p, q). Entre deux réestimations, les
+    paramètres sont gardés et le filtre de Kalman est simplement prolongé
+    sur les nouvelles observations (exact en fenêtre croissante, fenêtre de
+    la dernière réestimation en fenêtre glissante).
+    """
+    y = np.asarray(y, dtype="float64")
+    origins = np.asarray(origins)
+    previsions = np.empty(len(origins))
+    for debut, t0, t1, bloc in _refit_blocks(origins, window_starts(origins, window), refit_every):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            params = ARIMA(y[debut:t0], order=(p, 0, q)).fit().params
+            res = ARIMA(y[debut:t1], order=(p, 0, q)).filter(params)
+        previsions[bloc] = res.predict(start=t0 - debut, end=t1 - 1 - debut)[origins[bloc] - t0]
+    return previsions
+
+
+def garch_forecasts(y, origins, p, window=None, refit_every=12, echelle=100):
+    """
+    Prévisions à un pas de la moyenne d'un AR(p)-GARCH(1,1) (moyenne
+    constante si p = 0). Les paramètres estimés sur la fenêtre sont passés
+    à forecast(start=...), qui produit d'un coup toutes les prévisions du
+    bloc. Les rendements sont multipliés par echelle pour la stabilité
+    numérique, comme dans le notebook.
+    """
+    y = np.asarray(y, dtype="float64") * echelle
+    origins = np.asarray(origins)
+    previsions = np.empty(len(origins))
+    moyenne = {"mean": "AR", "lags": p} if p > 0 else {"mean": "Constant"}
+    for debut, t0, t1, bloc in _refit_blocks(origins, window_starts(origins, window), refit_every):
+        modele = arch_model(y[debut:t1], vol="GARCH", p=1, q=1, **moyenne)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            res = modele.fit(last_obs=t0 - debut, disp="off")
+            prev = res.forecast(horizon=1, start=t0 - debut - 1, reindex=False).mean.to_numpy()[:, 0]
+        previsions[bloc] = prev[origins[bloc] - t0]
+    return previsions / echelle
+
+
+def backtest_series(y, x, p, q, n_train=None, window=None, refit_every=12, modeles=MODELES):
+    """
+    Prévisions à un pas de toutes les familles de modèles pour une série.
+    Args:
+        y (pd.Series): Rendements (ex. df_auto[col_rendement]).
+        x (pd.Series): Croissance des brevets retardée, alignée sur y.
+        p, q (int): Ordres ARMA retenus (select_arma_orders), p pour la moyenne du GARCH.
+        n_train (int): Premier échantillon d'estimation, 80 % de la série par défaut.
+        window (int): Fenêtre glissante, croissante si None.
+        refit_every (int): Réestimation des paramètres toutes les refit_every
+            origines (1 = à chaque origine). Le MCO est réestimé à chaque origine.
+        modeles (tuple): Familles à évaluer parmi MODELES.
+    Returns:
+        pd.DataFrame: Indexé par les dates prévues : Réel et une colonne par modèle.
+    """
+    valeurs = np.asarray(y, dtype="float64")
+    origins = forecast_origins(len(valeurs), n_train)
+    previsions = {"Réel": valeurs[origins]}
+    if "MCO" in modeles:
+        previsions["MCO"] = ols_forecasts(valeurs, x, origins, window)
+    if "ARMA" in modeles:
+        previsions["ARMA"] = arma_forecasts(valeurs, origins, p, q, window, refit_every)
+    if "EWMA" in modeles:
+        previsions["EWMA"] = ewma_forecasts(valeurs, origins, window, refit_every)
+    if "GARCH" in modeles:
+        previsions["GARCH"] = garch_forecasts(valeurs, origins, p, window, refit_every)
+    if "Naïf" in modeles:
+        previsions["Naïf"] = naive_forecasts(valeurs, origins)
+    index = y.index[origins] if isinstance(y, pd.Series) else origins
+    return pd.DataFrame(previsions, index=index)
+
+
+def forecast_scores(previsions):
+    """ MSE et MAE de chaque modèle d'un tableau de backtest_series. """
+    erreurs = previsions.drop(columns="Réel").sub(previsions["Réel"], axis=0)
+    return pd.DataFrame({"MSE": (erreurs ** 2).mean(), "MAE": erreurs.abs().mean(),
+                         "N": erreurs.notna().sum()}).rename_axis("Modèle").reset_index()
+
+
+def diebold_mariano(erreurs_1, erreurs_2, h=1, perte="mse"):
+    """
+    Test de Diebold-Mariano avec la correction de Harvey, Leybourne et
+    Newbold (petits échantillons, loi de Student à n - 1 degrés).
+    Args:
+        erreurs_1, erreurs_2 (np.ndarray): Erreurs de prévision des deux modèles.
+        h (int): Horizon de prévision.
+        perte (str): "mse" (carré) ou "mae" (valeur absolue).
+    Returns:
+        tuple: Statistique (négative si le modèle 1 est meilleur), p-value bilatérale.
+    """
+    erreurs_1 = np.asarray(erreurs_1, dtype="float64")
+    erreurs_2 = np.asarray(erreurs_2, dtype="float64")
+    if perte == "mse":
+        d = erreurs_1 ** 2 - erreurs_2 ** 2
+    else:
+        d = np.abs(erreurs_1) - np.abs(erreurs_2)
+    d = d[np.isfinite(d)]
+    n = len(d)
+    if n < 2:
+        return np.nan, np.nan
+    dc = d - d.mean()
+    gamma = [dc @ dc / n] + [dc[k:] @ dc[:-k] / n for k in range(1, h)]
+    variance = (gamma[0] + 2 * sum(gamma[1:])) / n
+    if variance <= 0:
+        return np.nan, np.nan
+    correction = np.sqrt((n + 1 - 2 * h + h * (h - 1) / n) / n)
+    statistique = correction * d.mean() / np.sqrt(variance)
+    return statistique, 2 * stats.t.sf(abs(statistique), n - 1)
+
+
+def diebold_mariano_table(previsions, reference="Naïf", perte="mse"):
+    """ Test de Diebold-Mariano de chaque modèle contre le modèle de référence. """
+    erreurs = previsions.drop(columns="Réel").sub(previsions["Réel"], axis=0)
+    lignes = []
+    for modele in erreurs.columns.drop(reference):
+        statistique, p_value = diebold_mariano(erreurs[modele], erreurs[reference], perte=perte)
+        lignes.append({"Modèle": modele, "Référence": reference, "DM": statistique, "P-value": p_value})
+    return pd.DataFrame(lignes)
+
+
+def _backtest_sector(args):
+    secteur, (y, x, p, q), kwargs = args
+    return secteur, backtest_series(y, x, p, q, **kwargs)
+
+
+def backtest_sectors(donnees, n_train=None, window=None, refit_every=12, modeles=MODELES,
+                     reference="Naïf", perte="mse", n_workers=1):
+    """
+    Backtest de tous les secteurs, un secteur par processus.
+    Args:
+        donnees (dict): Secteur -> (rendements, croissance retardée, p, q).
+        n_workers (int): Nombre de processus (1 = en série).
+        n_train, window, refit_every, modeles: Voir backtest_series.
+        reference, perte: Voir diebold_mariano_table.
+    Returns:
+        dict: Secteur -> tableau des prévisions.
+        pd.DataFrame: MSE et MAE par secteur et par modèle.
+        pd.DataFrame: Tests de Diebold-Mariano par secteur.
+    """
+    kwargs = {"n_train": n_train, "window": window, "refit_every": refit_every, "modeles": modeles}
+    taches = [(secteur, valeurs, kwargs) for secteur, valeurs in donnees.items()]
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as pool:
+            sorties = list(pool.map(_backtest_sector, taches))
+    else:
+        sorties = [_backtest_sector(tache) for tache in taches]
+
+    previsions = dict(sorties)
+    scores = pd.concat([forecast_scores(df).assign(Secteur=secteur)
+                        for secteur, df in previsions.items()], ignore_index=True)
+    tests = pd.concat([diebold_mariano_table(df, reference, perte).assign(Secteur=secteur)
+                       for secteur, df in previsions.items() if reference in df], ignore_index=True)
+    return previsions, scores, tests
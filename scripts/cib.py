@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+CLASSIFICATION_COLUMNS = ["classification_1_text", "classification_2_text", "classification_3_text"]
+
+# Niveaux de la hiérarchie CIB extraits du texte de classification
+IPC_LEVELS = {
+    "section": r"^\s*([A-H])",
+    "classe": r"^([A-Z]\d{2})",
+    "sous_classe": r"^([A-Z]\d{2}[A-Z])",
+    # Code rapproché des secteurs : sous-classe, ou classe sans lettre
+    "code": r"^([A-Z]\d{2}[A-Z]?)",
+}
+
+
+def parse_ipc(df, columns=CLASSIFICATION_COLUMNS, id_columns=("doc-number", "year", "publication_date")):
+    """
+    Passe les codes CIB au format long (une ligne par brevet et par code,
+    dans l'ordre d'un melt) et extrait une seule fois chaque niveau de la
+    hiérarchie en colonne catégorielle. Les expressions régulières ne
+    tournent que sur les textes distincts.
+    Args:
+        df (pd.DataFrame): Brevets avec les colonnes de classification.
+        columns (list): Colonnes de classification.
+        id_columns (tuple): Colonnes d'identification reportées (si présentes).
+    Returns:
+        pd.DataFrame: id_columns, "mois" (si publication_date) et un niveau par colonne.
+    """
+    id_columns = [c for c in id_columns if c in df.columns]
+    base = df[id_columns].reset_index(drop=True)
+    if "publication_date" in base.columns:
+        base["mois"] = pd.to_datetime(base["publication_date"]).dt.to_period("M")
+    long = base.iloc[np.tile(np.arange(len(df)), len(columns))].reset_index(drop=True)
+
+    text_codes, texts = pd.factorize(pd.concat([df[c] for c in columns], ignore_index=True))
+    texts = pd.Series(texts)
+    for level, pattern in IPC_LEVELS.items():
+        level_codes, categories = pd.factorize(texts.str.extract(pattern)[0], sort=True)
+        codes = np.where(text_codes >= 0, level_codes[text_codes], -1)
+        long[level] = pd.Categorical.from_codes(codes, categories=categories)
+    return long[text_codes >= 0].reset_index(drop=True)
+
+
+def count_by_level(long, level, by="year"):
+    """
+    Nombre de brevets par code d'un niveau et par période, chaque code
+    n'étant compté qu'une fois par brevet (format de stats_class1/3/4).
+    """
+    sub = long.loc[long[level].notna(), ["doc-number", by, level]].drop_duplicates()
+    stats = sub.groupby([level, by], observed=True).size().reset_index(name="nombre")
+    stats = stats.rename(columns={level: "classification"})
+    stats["classification"] = stats["classification"].astype(long[level].cat.categories.dtype)
+    return stats
+
+
+def count_all_levels(long, levels=("section", "classe", "sous_classe"), by="year"):
+    """ count_by_level pour chaque niveau. Retourne un dictionnaire niveau -> comptes. """
+    return {level: count_by_level(long, level, by) for level in levels}
+
+
+def build_prefix_index(secteurs):
+    """ Index préfixe -> secteurs, les préfixes pouvant être de longueurs mélangées ("C06", "A61K"). """
+    index = {}
+    for nom_secteur, prefixes in secteurs.items():
+        for prefix in prefixes:
+            index.setdefault(prefix, []).append(nom_secteur)
+    return index
+
+
+def match_sectors(code, index, prefix=False):
+    """
+    Secteurs d'un code CIB. Par défaut le code doit être égal à une entrée
+    de l'index (règle du notebook) ; avec prefix=True, toute entrée qui est
+    un préfixe du code convient ("C06" couvre "C06B").
+    """
+    if not prefix:
+        return list(index.get(code, []))
+    matched = []
+    for length in range(1, len(code) + 1):
+        for nom_secteur in index.get(code[:length], []):
+            if nom_secteur not in matched:
+                matched.append(nom_secteur)
+    return matched
+
+
+def sector_monthly_counts(long, secteurs, prefix=False):
+    """
+    Séries mensuelles de brevets par secteur en un seul comptage : les
+    couples (brevet, code) distincts sont comptés par mois et par code,
+    puis ventilés sur les secteurs par une matrice d'appartenance code x secteur.
+    Args:
+        long (pd.DataFrame): Sortie de parse_ipc.
+        secteurs (dict): Secteur -> codes CIB (ex. parametres.SECTEURS).
+        prefix (bool): Voir match_sectors.
+    Returns:
+        pd.DataFrame: Index "mois" (période), une colonne brevets_<secteur> par
+            secteur, limité aux mois comptant au moins un brevet sectorisé.
+    """
+    sub = long.loc[long["code"].notna(), ["doc-number", "mois", "code"]]
+    sub = sub.drop_duplicates(subset=["doc-number", "code"])
+    sub = sub[sub["mois"].notna()]
+
+    noms = list(secteurs)
+    index = build_prefix_index(secteurs)
+    categories = long["code"].cat.categories
+    incidence = np.zeros((len(categories), len(noms)), dtype=np.int64)
+    for i, code in enumerate(categories):
+        for nom_secteur in match_sectors(code, index, prefix):
+            incidence[i, noms.index(nom_secteur)] = 1
+
+    month_codes, months = pd.factorize(sub["mois"], sort=True)
+    counts = np.bincount(month_codes * len(categories) + sub["code"].cat.codes.to_numpy(),
+                         minlength=len(months) * len(categories))
+    by_sector = counts.reshape(len(months), len(categories)) @ incidence
+    result = pd.DataFrame(by_sector, index=pd.Index(months, name="mois"),
+                          columns=[f"brevets_{nom}" for nom in noms])
+    return result[by_sector.sum(axis=1) > 0]
+
+
+def build_base_finale(counts):
+    """
+    Base mensuelle du notebook à partir de sector_monthly_counts : mois
+    (texte), brevets_<secteur>, date, puis croissance logarithmique
+    croiss_log_brevets_<secteur> (inf remplacés par NaN).
+    """
+    base_finale = counts.reset_index()
+    base_finale["mois"] = base_finale["mois"].astype(str)
+    base_finale["date"] = pd.to_datetime(base_finale["mois"] + "-01", format="%Y-%m-%d")
+    base_finale = base_finale.sort_values("date").reset_index(drop=True)
+    colonnes_brevets = [col for col in base_finale.columns if col.startswith("brevets_")]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        croissance = np.log(base_finale[colonnes_brevets] / base_finale[colonnes_brevets].shift(1))
+    croissance = croissance.replace([np.inf, -np.inf], np.nan).add_prefix("croiss_log_")
+    return pd.concat([base_finale, croissance], axis=1)
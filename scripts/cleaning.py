@@ -1,19 +1,164 @@
+import numpy as np
+import pandas as pd
+
+
 def deduplicate(df, key):
     """
     Garde, pour chaque valeur de `key`,
     l'observation la plus récente (publication_date),
     puis le plus grand doc-number en cas d'égalité.
     """
-    # Trier selon la règle métier
-    df_sorted = df.sort_values(
-        by=[key, "publication_date", "doc-number"],
-        ascending=[True, False, False]
-    )
+    return deduplicate_multi(df, [key])
 
-    # Garder la première occurrence par groupe
-    df_dedup = df_sorted.drop_duplicates(
-        subset=key,
-        keep="first"
-    )
 
-    return df_dedup.sort_index()
+def _order_codes(serie):
+    """ Entiers (ou flottants) dans l'ordre des valeurs, valeurs manquantes en dernier. """
+    if pd.api.types.is_datetime64_dtype(serie.dtype):
+        # NaT est stocké comme le plus petit int64
+        return serie.to_numpy().view("i8")
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.to_numpy(dtype="float64", na_value=-np.inf)
+    # Codes triés : l'ordre des valeurs est conservé, NA vaut -1
+    return pd.factorize(serie, sort=True)[0]
+
+
+def _priority(df, tie_break):
+    """
+    Rang de chaque ligne selon la règle métier (le plus grand est gardé) :
+    publication_date, puis doc-number, puis le plus petit `tie_break`.
+    """
+    order = np.lexsort((-tie_break, _order_codes(df["doc-number"]),
+                        _order_codes(df["publication_date"])))
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df))
+    return rank
+
+
+def deduplicate_multi(df, keys, return_dropped=False):
+    """
+    Applique la règle de `deduplicate` pour chaque clé de `keys`, dans l'ordre,
+    chaque clé portant sur les lignes gardées par la précédente.
+    Les clés texte sont codées en entiers (table de hachage, sans tri du texte)
+    et le gagnant de chaque groupe est choisi par idxmax sur un rang calculé une fois.
+    Args:
+        df (pd.DataFrame): Brevets avec publication_date et doc-number.
+        keys (list): Colonnes de dédoublonnage, ex. ["invention-title", "abstract"].
+        return_dropped (bool): Retourne aussi le détail des lignes supprimées.
+    Returns:
+        pd.DataFrame: Lignes gardées, dans l'ordre de l'index.
+        pd.DataFrame (si return_dropped): Index des lignes supprimées, avec
+            la clé responsable (`key`) et l'index de la ligne gardée (`winner`).
+    """
+    position = np.arange(len(df))
+    # Égalité parfaite : première ligne pour la première clé, puis plus petit
+    # index, comme des appels successifs à deduplicate (qui retrie l'index)
+    rank_first = _priority(df, position)
+    if len(keys) > 1 and not df.index.is_monotonic_increasing:
+        index_position = np.empty(len(df), dtype=np.int64)
+        index_position[df.index.argsort(kind="stable")] = position
+        rank_next = _priority(df, index_position)
+    else:
+        rank_next = rank_first
+
+    kept = position
+    dropped = []
+    for i, key in enumerate(keys):
+        rank = rank_first if i == 0 else rank_next
+        codes = pd.factorize(df[key].iloc[kept])[0]
+        # Position (parmi les lignes gardées) du gagnant du groupe de chaque ligne
+        winner = pd.Series(rank[kept]).groupby(codes, sort=False, dropna=False) \
+            .transform("idxmax").to_numpy()
+        is_winner = winner == np.arange(len(kept))
+        if return_dropped:
+            dropped.append(pd.DataFrame(
+                {"key": key, "winner": df.index[kept[winner[~is_winner]]]},
+                index=df.index[kept[~is_winner]],
+            ))
+        kept = kept[is_winner]
+
+    df_dedup = df.iloc[kept].sort_index()
+    if not return_dropped:
+        return df_dedup
+    if dropped:
+        report = pd.concat(dropped)
+    else:
+        report = pd.DataFrame({"key": [], "winner": []}, index=df.index[:0])
+    return df_dedup, report
+
+
+def drop_records(df, records):
+    """
+    Supprime les enregistrements repérés par leurs valeurs et non par leur
+    index, qui dépend de l'ordre de chargement (ex. partitions de load_brevets).
+    Args:
+        df (pd.DataFrame): Brevets.
+        records (list): Un dict colonne -> valeur par enregistrement, ex.
+            parametres.DOUBLONS_ECARTES ; doc-number peut être texte ou numérique.
+    Returns:
+        pd.DataFrame: Brevets sans les enregistrements repérés.
+    """
+    a_supprimer = pd.Series(False, index=df.index)
+    for record in records:
+        masque = pd.Series(True, index=df.index)
+        for colonne, valeur in record.items():
+            serie = df[colonne]
+            if pd.api.types.is_numeric_dtype(serie.dtype):
+                valeur = pd.to_numeric(valeur)
+            masque &= serie.eq(valeur).fillna(False).astype(bool)
+        a_supprimer |= masque
+    return df[~a_supprimer]
+
+
+def is_missing(serie):
+    """
+    Repère les valeurs manquantes : NA pandas (parsing actuel)
+    ou sentinelle "NA" des anciens exports parquet.
+    """
+    return serie.isna() | serie.eq("NA").fillna(False).astype(bool)
+
+
+def clean_brevets(df, kinds_exclus=("B1", "A3"), date_min="2017-01-01",
+                  keys=("invention-title", "abstract"), fusions=None, ecartes=None):
+    """
+    Nettoyage du notebook en une seule fonction, sans modifier df :
+    enregistrements erronés (ecartes, drop_records), types de publication
+    exclus ou manquants, titres et abstracts manquants, doublons
+    (deduplicate_multi sur keys), publications antérieures à date_min,
+    pays "NA" et noms de déposants normalisés (majuscules, None/NA retirés)
+    puis fusionnés (fusions, ex. parametres.ORG_FUSIONS).
+    Avec ecartes=parametres.DOUBLONS_ECARTES, le résultat est celui du
+    notebook, copie conservée du doublon 3050837 comprise. Sans ecartes, le
+    nombre de brevets est le même, car le dédoublonnage sur invention-title
+    retire aussi ce doublon, mais la copie conservée peut être l'autre ;
+    avec keys=() sans ecartes, il reste un brevet de plus.
+    Args:
+        df (pd.DataFrame): Brevets (load_brevets).
+        kinds_exclus (tuple): Types de publication supprimés.
+        date_min (str): Première date de publication gardée.
+        keys (tuple): Clés de dédoublonnage, dans l'ordre ; () pour ne pas dédoublonner.
+        fusions (dict): Nom de déposant -> nom retenu.
+        ecartes (list): Enregistrements supprimés avant tout traitement, voir drop_records.
+    Returns:
+        pd.DataFrame: Brevets nettoyés, sans la colonne kind.
+    """
+    df = drop_records(df, ecartes or [])
+    df = df[~is_missing(df["kind"]) & ~df["kind"].isin(kinds_exclus)].drop(columns=["kind"])
+    df = df[~is_missing(df["abstract"]) & ~is_missing(df["invention-title"])].copy()
+    if not pd.api.types.is_datetime64_dtype(df["publication_date"].dtype):
+        df["publication_date"] = pd.to_datetime(df["publication_date"], format="%Y%m%d", errors="coerce")
+    df["doc-number"] = pd.to_numeric(df["doc-number"], errors="coerce")
+    if keys:
+        df = deduplicate_multi(df, list(keys))
+    df = df[df["publication_date"] >= date_min].copy()
+
+    pays = list(df.filter(regex=r"^(applicant|inventor)_\d+_country$").columns)
+    df[pays] = df[pays].replace("NA", pd.NA)
+    deposants = list(df.filter(regex=r"^applicant_\d+_orgname$").columns)
+    df[deposants] = (
+        df[deposants]
+        .replace(r"\b(None|NA)\b", "", regex=True)
+        .apply(lambda col: col.str.strip().str.upper())
+        .replace("", pd.NA)
+        .replace(fusions or {})
+    )
+    return df
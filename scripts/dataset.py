@@ -0,0 +1,89 @@
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Colonnes de partitionnement (dérivées de publication_date)
+PARTITION_COLUMNS = ["publication_year", "publication_month"]
+
+# Lignes par row group : sans minimum, chaque lot Arrow produit un petit row
+# group et le pied de fichier (statistiques par colonne) dépasse les données lues
+ROWS_PER_GROUP = 128 * 1024
+
+# Colonnes utilisées par l'analyse (nettoyage, dédoublonnage, CIB, secteurs)
+ANALYSIS_COLUMNS = [
+    "doc-number", "kind", "publication_date", "year", "invention-title", "abstract",
+    "applicant_1_orgname", "applicant_2_orgname", "applicant_3_orgname",
+    "applicant_1_country", "applicant_2_country", "applicant_3_country",
+    "inventor_1_country", "inventor_2_country", "inventor_3_country",
+    "classification_1_text", "classification_2_text", "classification_3_text",
+]
+
+
+def add_partition_columns(df):
+    """ Ajoute l'année et le mois de publication utilisés comme clés de partition. """
+    df = df.copy()
+    df["publication_year"] = df["publication_date"].dt.year.astype("Int16")
+    df["publication_month"] = df["publication_date"].dt.month.astype("Int8")
+    return df
+
+
+def write_brevets_dataset(df, fs, dataset_path, partition_cols=PARTITION_COLUMNS,
+                          basename_template=None, existing_data_behavior="delete_matching"):
+    """
+    Écrit les brevets en dataset parquet partitionné façon Hive
+    (dataset_path/publication_year=2019/publication_month=3/part-0.parquet).
+    Args:
+        df (pd.DataFrame): Brevets (schéma de build_brevets_dataframe).
+        fs: Système de fichiers de sortie (s3fs ou compatible fsspec).
+        dataset_path (str): Dossier racine du dataset.
+        partition_cols (list): Colonnes de partition ; les colonnes d'année et de
+            mois de publication sont calculées si absentes. "kind" est aussi possible.
+        basename_template (str): Modèle de nom des fichiers (ex. "<id>-{i}.parquet").
+        existing_data_behavior (str): "delete_matching" remplace les partitions
+            réécrites, "overwrite_or_ignore" conserve les autres fichiers.
+    Returns:
+        list: Chemins des fichiers écrits.
+    """
+    if any(c in PARTITION_COLUMNS and c not in df.columns for c in partition_cols):
+        df = add_partition_columns(df)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    written = []
+    ds.write_dataset(
+        table,
+        dataset_path,
+        format="parquet",
+        filesystem=fs,
+        partitioning=ds.partitioning(table.select(partition_cols).schema, flavor="hive"),
+        basename_template=basename_template or "part-{i}.parquet",
+        existing_data_behavior=existing_data_behavior,
+        min_rows_per_group=ROWS_PER_GROUP,
+        max_rows_per_group=ROWS_PER_GROUP,
+        file_visitor=lambda written_file: written.append(written_file.path),
+    )
+    return written
+
+
+def load_brevets(fs, dataset_path, columns=None, filters=None):
+    """
+    Charge le dataset partitionné en ne lisant que les colonnes et les
+    partitions/row groups nécessaires.
+    Args:
+        fs: Système de fichiers (s3fs ou compatible fsspec).
+        dataset_path (str): Dossier racine du dataset.
+        columns (list): Colonnes à lire (toutes par défaut), ex. ANALYSIS_COLUMNS.
+        filters (list): Filtres au format pyarrow, ex.
+            [("kind", "not in", ["B1", "A3"]), ("publication_year", ">=", 2017)].
+            Les filtres sur les colonnes de partition éliminent des dossiers
+            entiers, les autres s'appuient sur les statistiques des row groups.
+    Returns:
+        pd.DataFrame: Brevets sélectionnés.
+    """
+    dataset = ds.dataset(dataset_path, filesystem=fs, format="parquet", partitioning="hive")
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas()
+    # Les clés de partition sont relues comme catégories : retour aux entiers
+    for column in PARTITION_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("Int16" if column.endswith("year") else "Int8")
+    return df
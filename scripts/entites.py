@@ -0,0 +1,225 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+APPLICANT_COLUMNS = ["applicant_1_orgname", "applicant_2_orgname", "applicant_3_orgname"]
+
+# Formes juridiques retirées des noms (après suppression des points : S.A.S. -> SAS)
+FORMES_JURIDIQUES = {"SA", "SAS", "SASU", "SARL", "SE", "SCA", "SNC", "GMBH", "AG", "KG", "INC",
+                     "LTD", "LLC", "CORP", "CORPORATION", "PLC", "BV", "NV", "SPA", "SRL", "CO"}
+
+
+def _normalize(nom):
+    nom = unicodedata.normalize("NFKD", nom).encode("ascii", "ignore").decode()
+    nom = re.sub(r"\b(None|NA)\b", "", nom).upper().replace(".", "")
+    tokens = re.sub(r"[^A-Z0-9]+", " ", nom).split()
+    return " ".join(t for t in tokens if t not in FORMES_JURIDIQUES)
+
+
+def normalize_names(serie):
+    """
+    Noms de déposants normalisés : majuscules sans accents, None/NA retirés
+    (comme le notebook), ponctuation remplacée par des espaces, formes
+    juridiques supprimées. Le calcul ne porte que sur les noms distincts.
+    Returns:
+        pd.Series: Même index, NA pour les noms vides.
+    """
+    codes, uniques = pd.factorize(serie)
+    normalises = np.array([_normalize(str(nom)) for nom in uniques] + [""], dtype=object)
+    resultat = pd.Series(normalises[codes], index=serie.index, dtype="object")
+    return resultat.where(resultat != "", None)
+
+
+def _trigrams(nom):
+    """ Trigrammes du nom sans espaces (L OREAL et LOREAL ont les mêmes). """
+    nom = f" {nom.replace(' ', '')} "
+    return {nom[i:i + 3] for i in range(len(nom) - 2)}
+
+
+def _incidence(ensembles, vocabulaire=None):
+    """
+    Matrice creuse éléments x vocabulaire (0/1) d'une liste d'ensembles ;
+    les éléments absents d'un vocabulaire imposé sont ignorés.
+    """
+    tailles = np.fromiter((len(e) for e in ensembles), dtype=np.int64, count=len(ensembles))
+    elements = pd.Index([x for e in ensembles for x in e], dtype="object")
+    if vocabulaire is None:
+        colonnes, vocabulaire = pd.factorize(elements)
+        vocabulaire = pd.Index(vocabulaire)
+    else:
+        colonnes = vocabulaire.get_indexer(elements)
+    lignes = np.repeat(np.arange(len(ensembles)), tailles)
+    garder = colonnes >= 0
+    matrice = sparse.csr_matrix((np.ones(garder.sum()), (lignes[garder], colonnes[garder])),
+                                shape=(len(ensembles), len(vocabulaire)))
+    return matrice, tailles, vocabulaire
+
+
+def build_name_index(entreprises, fusions=None, exclusions=None):
+    """
+    Index des noms d'entreprises cotées : alias normalisés, index inversés
+    des mots et des trigrammes de caractères.
+    Args:
+        entreprises (dict): Ticker -> noms (ex. parametres.ENTREPRISES).
+        fusions (dict): Variante -> nom d'entreprise (ex. parametres.ORG_FUSIONS) ;
+            une variante devient un alias du ticker dont un nom correspond.
+        exclusions (list): Noms de déposants jamais rapprochés d'un ticker
+            (homonymes repérés dans la table de correspondance).
+    Returns:
+        dict: alias, tickers, exclusions, index des mots et des trigrammes.
+    """
+    alias = {}
+    for ticker, noms in entreprises.items():
+        for nom in noms:
+            alias.setdefault(_normalize(nom), ticker)
+    for variante, nom in (fusions or {}).items():
+        ticker = alias.get(_normalize(nom))
+        if ticker is not None:
+            alias.setdefault(_normalize(variante), ticker)
+    # Alias vide après normalisation (ponctuation ou forme juridique seule, ex. "S.A.")
+    alias.pop("", None)
+
+    noms = list(alias)
+    mots, n_mots, vocabulaire_mots = _incidence([set(nom.split()) for nom in noms])
+    trigrammes, n_trigrammes, vocabulaire_trigrammes = _incidence([_trigrams(nom) for nom in noms])
+    return {"noms": noms, "tickers": np.array([alias[nom] for nom in noms], dtype=object),
+            "exact": {nom: i for i, nom in enumerate(noms)},
+            "exclusions": {_normalize(nom) for nom in exclusions or []},
+            "mots": mots.T.tocsr(), "n_mots": n_mots, "vocabulaire_mots": vocabulaire_mots,
+            "trigrammes": trigrammes.T.tocsr(), "n_trigrammes": n_trigrammes,
+            "vocabulaire_trigrammes": vocabulaire_trigrammes}
+
+
+def _best_per_row(scores, ordre):
+    """
+    Colonne du meilleur score non nul de chaque ligne, -1 sinon ; à égalité,
+    la plus grande valeur de ordre puis la première colonne.
+    """
+    scores = scores.tocoo()
+    meilleur = np.full(scores.shape[0], -1)
+    if scores.nnz == 0:
+        return meilleur
+    tri = np.lexsort((scores.col, -ordre[scores.col], -scores.data, scores.row))
+    lignes = scores.row[tri]
+    premier = np.r_[True, lignes[1:] != lignes[:-1]]
+    meilleur[lignes[premier]] = scores.col[tri][premier]
+    return meilleur
+
+
+def resolve_names(noms, index, seuil=0.75):
+    """
+    Rapproche des noms de déposants normalisés des tickers, sans comparer
+    chaque nom à chaque alias : les candidats viennent des produits de
+    matrices creuses noms x mots et noms x trigrammes (index inversés).
+    Trois passes, dans l'ordre :
+        exact : le nom est un alias ;
+        mots : tous les mots d'un alias figurent dans le nom (filiales,
+            ex. VALEO SYSTEMES THERMIQUES), l'alias le plus long l'emporte ;
+            un alias d'un seul mot doit être le premier mot du nom (ORANGE
+            BUSINESS SERVICES, mais pas COOPERATIVE AGRICOLE ORANGE) ;
+        trigrammes : similarité de Jaccard des trigrammes >= seuil
+            (fautes de frappe, mots collés).
+    Args:
+        noms (pd.Series): Noms normalisés (normalize_names), doublons possibles.
+        index (dict): Sortie de build_name_index.
+        seuil (float): Similarité minimale de la passe trigrammes.
+    Les noms de index["exclusions"] ne sont jamais rapprochés.
+    Returns:
+        pd.DataFrame: Une ligne par nom distinct : nom, ticker, alias, methode, score.
+    """
+    distincts = np.asarray(pd.unique(noms.dropna()), dtype=object)
+    choix = np.full(len(distincts), -1)
+    methode = np.full(len(distincts), None, dtype=object)
+    score = np.full(len(distincts), np.nan)
+    exclus = pd.Series(distincts).isin(index["exclusions"]).to_numpy()
+
+    exact = pd.Series(distincts).map(index["exact"]).to_numpy(dtype="float64")
+    trouve = ~np.isnan(exact) & ~exclus
+    choix[trouve], methode[trouve], score[trouve] = exact[trouve].astype(int), "exact", 1.0
+
+    reste = np.flatnonzero(~trouve & ~exclus)
+    mots, _, _ = _incidence([set(distincts[i].split()) for i in reste], index["vocabulaire_mots"])
+    communs = (mots @ index["mots"]).tocoo()
+    # Alias d'un seul mot (mot courant, ex. ORANGE) : seulement en tête du nom
+    premiers = np.array([(distincts[i].split() or [""])[0] for i in reste], dtype=object)
+    mot_alias = np.array([nom.split()[0] for nom in index["noms"]], dtype=object)
+    complet = (communs.data == index["n_mots"][communs.col]) & (
+        (index["n_mots"][communs.col] > 1) | (premiers[communs.row] == mot_alias[communs.col]))
+    inclus = sparse.csr_matrix((index["n_mots"][communs.col[complet]].astype("float64"),
+                                (communs.row[complet], communs.col[complet])), shape=communs.shape)
+    meilleur = _best_per_row(inclus, index["n_trigrammes"])
+    trouve = meilleur >= 0
+    choix[reste[trouve]], methode[reste[trouve]], score[reste[trouve]] = meilleur[trouve], "mots", 1.0
+
+    reste = reste[~trouve]
+    ensembles = [_trigrams(distincts[i]) for i in reste]
+    trigrammes, tailles, _ = _incidence(ensembles, index["vocabulaire_trigrammes"])
+    communs = (trigrammes @ index["trigrammes"]).tocoo()
+    jaccard = communs.data / (tailles[communs.row] + index["n_trigrammes"][communs.col] - communs.data)
+    garder = jaccard >= seuil
+    similarites = sparse.csr_matrix((jaccard[garder], (communs.row[garder], communs.col[garder])),
+                                    shape=communs.shape)
+    meilleur = _best_per_row(similarites, index["n_trigrammes"])
+    trouve = meilleur >= 0
+    choix[reste[trouve]], methode[reste[trouve]] = meilleur[trouve], "trigrammes"
+    score[reste[trouve]] = similarites.max(axis=1).toarray().ravel()[trouve]
+
+    alias = np.array(index["noms"] + [None], dtype=object)
+    tickers = np.append(index["tickers"], None)
+    return pd.DataFrame({"nom": distincts, "ticker": tickers[choix], "alias": alias[choix],
+                         "methode": methode, "score": score})
+
+
+def firm_patents(df, index, applicant_cols=APPLICANT_COLUMNS, date_col="publication_date",
+                 id_col="doc-number", seuil=0.75):
+    """
+    Brevets rattachés aux entreprises cotées : une ligne par couple
+    (brevet, ticker), quel que soit le nombre de déposants rattachés au ticker.
+    Args:
+        df (pd.DataFrame): Brevets avec les colonnes de déposants.
+        index (dict): Sortie de build_name_index.
+        applicant_cols (list): Colonnes des déposants.
+        date_col (str): Date de publication.
+        id_col (str): Identifiant du brevet (index du DataFrame s'il est absent).
+        seuil (float): Voir resolve_names.
+    Returns:
+        pd.DataFrame: id, date, ticker.
+        pd.DataFrame: Table de correspondance de resolve_names.
+    """
+    identifiants = df[id_col].to_numpy() if id_col in df.columns else df.index.to_numpy()
+    dates = pd.to_datetime(df[date_col]).dt.normalize().to_numpy()
+    noms = normalize_names(pd.concat([df[c] for c in applicant_cols], ignore_index=True))
+    correspondance = resolve_names(noms, index, seuil)
+
+    long = pd.DataFrame({"id": np.tile(identifiants, len(applicant_cols)),
+                         "date": np.tile(dates, len(applicant_cols)),
+                         "ticker": noms.map(dict(zip(correspondance["nom"], correspondance["ticker"])))})
+    long = long.dropna().drop_duplicates(subset=["id", "ticker"]).reset_index(drop=True)
+    return long, correspondance
+
+
+def firm_monthly_counts(df, index, applicant_cols=APPLICANT_COLUMNS, date_col="publication_date",
+                        id_col="doc-number", dates=None, seuil=0.75):
+    """
+    Brevets publiés par mois pour chaque entreprise cotée : un brevet compte
+    une fois par ticker, quel que soit le nombre de ses déposants rattachés.
+    Args:
+        df (pd.DataFrame): Brevets avec les colonnes de déposants.
+        index (dict): Sortie de build_name_index.
+        applicant_cols, date_col, id_col, seuil: Voir firm_patents.
+        dates (pd.Series): Dates des rendements (fin de mois, ex. data_rendements["Date"]) ;
+            les comptages sont réindexés dessus, mois sans brevet à 0.
+    Returns:
+        pd.DataFrame: Colonne Date (fin de mois) puis une colonne brevets_<ticker> par ticker trouvé.
+        pd.DataFrame: Table de correspondance de resolve_names.
+    """
+    long, correspondance = firm_patents(df, index, applicant_cols, date_col, id_col, seuil)
+    long["Date"] = long["date"] + pd.offsets.MonthEnd(0)
+    comptes = long.groupby(["Date", "ticker"]).size().unstack(fill_value=0)
+    if dates is not None:
+        comptes = comptes.reindex(pd.to_datetime(dates) + pd.offsets.MonthEnd(0), fill_value=0)
+    comptes = comptes.add_prefix("brevets_").rename_axis(index="Date", columns=None).reset_index()
+    return comptes, correspondance
@@ -0,0 +1,220 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+
+logger = logging.getLogger(__name__)
+
+
+def patent_events(brevets, min_brevets=1):
+    """
+    Événements (ticker, jour de publication) depuis les brevets rattachés aux
+    entreprises : tous les brevets d'un ticker publiés le même jour forment
+    un seul événement.
+    Args:
+        brevets (pd.DataFrame): id, date, ticker (sortie de entites.firm_patents).
+        min_brevets (int): Nombre minimal de brevets publiés le jour de l'événement.
+    Returns:
+        pd.DataFrame: ticker, date, n_brevets.
+    """
+    evenements = brevets.groupby(["ticker", "date"]).size().rename("n_brevets").reset_index()
+    return evenements[evenements["n_brevets"] >= min_brevets].reset_index(drop=True)
+
+
+def _windows(values, debuts, longueur, colonnes=None):
+    """
+    Fenêtres (E, longueur) commençant aux lignes debuts, extraites d'une vue
+    glissante de values (T,) ou (T, N) sans boucle sur les événements.
+    """
+    vues = sliding_window_view(values, longueur, axis=0)
+    return vues[debuts] if colonnes is None else vues[debuts, colonnes]
+
+
+def _window_label(fenetre):
+    return f"[{fenetre[0]},{fenetre[1]}]"
+
+
+def _market_model(r, m, min_obs):
+    """
+    MCO r = alpha + beta m sur chaque ligne (fenêtres d'estimation), valeurs
+    manquantes ignorées.
+    Returns:
+        tuple: alpha, beta, variance résiduelle, n, moyenne de m, somme des carrés centrés de m.
+    """
+    valide = ~np.isnan(r) & ~np.isnan(m)
+    n = valide.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m_bar = np.where(valide, m, 0.0).sum(axis=1) / n
+        r_bar = np.where(valide, r, 0.0).sum(axis=1) / n
+        dm = np.where(valide, m - m_bar[:, None], 0.0)
+        dr = np.where(valide, r - r_bar[:, None], 0.0)
+        sxx = (dm ** 2).sum(axis=1)
+        beta = (dm * dr).sum(axis=1) / sxx
+        alpha = r_bar - beta * m_bar
+        s2 = ((dr - beta[:, None] * dm) ** 2).sum(axis=1) / (n - 2)
+    s2[n < min_obs] = np.nan
+    return alpha, beta, s2, n, m_bar, sxx
+
+
+def event_study(prices, evenements, estimation=(-250, -11), fenetre=(-10, 10),
+                fenetres=((-1, 1), (0, 0), (0, 5), (-10, 10)), marche=None, ticker_col="ticker",
+                date_col="date", min_obs=100, taille_paquet=10000):
+    """
+    Rendements anormaux (modèle de marché) autour d'événements datés :
+    fenêtres d'estimation et d'événement extraites de vues glissantes sur la
+    matrice des rendements journaliers, paramètres du modèle de marché et
+    CAR de tous les événements calculés par paquets, sans boucle par événement.
+    Args:
+        prices (pd.DataFrame): Colonne Date puis une colonne de prix journaliers
+            par titre (ex. prices du notebook) ou par portefeuille.
+        evenements (pd.DataFrame): Une ligne par événement (ex. patent_events) ;
+            les autres colonnes sont conservées.
+        estimation (tuple): Fenêtre d'estimation en jours de bourse relatifs à l'événement.
+        fenetre (tuple): Fenêtre d'événement (rendements anormaux jour par jour).
+        fenetres (tuple): Sous-fenêtres de fenetre sur lesquelles cumuler les CAR.
+        marche (str): Colonne de prices servant de marché (ex. "^FCHI") ; moyenne
+            équipondérée des rendements de tous les titres par défaut.
+        ticker_col, date_col (str): Colonnes des événements ; un événement publié un
+            jour sans cotation est daté du jour de bourse suivant.
+        min_obs (int): Rendements minimaux dans la fenêtre d'estimation.
+        taille_paquet (int): Événements traités ensemble (borne la mémoire).
+    Returns:
+        pd.DataFrame: Une ligne par événement retenu : colonnes des événements,
+            date_evenement, alpha, beta, sigma, n_estimation, CAR[a,b] et SCAR[a,b]
+            (CAR standardisé de Patell) pour chaque sous-fenêtre.
+        np.ndarray: Rendements anormaux (événements retenus x jours de fenetre).
+    """
+    if estimation[1] >= fenetre[0]:
+        raise ValueError("La fenêtre d'estimation doit précéder la fenêtre d'événement")
+    for a, b in fenetres:
+        if a < fenetre[0] or b > fenetre[1] or a > b:
+            raise ValueError(f"Sous-fenêtre {_window_label((a, b))} hors de {_window_label(fenetre)}")
+
+    dates = pd.to_datetime(prices["Date"]).to_numpy()
+    tickers = [c for c in prices.columns if c not in ("Date", marche)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_prix = np.log(prices[tickers].to_numpy(dtype="float64"))
+        rendements = np.diff(log_prix, axis=0, prepend=np.nan)
+        if marche is None:
+            valides = ~np.isnan(rendements)
+            rendements_marche = np.where(valides, rendements, 0.0).sum(axis=1) / valides.sum(axis=1)
+        else:
+            rendements_marche = np.diff(np.log(prices[marche].to_numpy(dtype="float64")), prepend=np.nan)
+
+    colonnes = pd.Index(tickers).get_indexer(evenements[ticker_col])
+    jours = np.searchsorted(dates, pd.to_datetime(evenements[date_col]).dt.normalize().to_numpy())
+    garder = ((colonnes >= 0) & (jours < len(dates)) & (jours + estimation[0] >= 0)
+              & (jours + fenetre[1] < len(dates)))
+    retenus = np.flatnonzero(garder)
+
+    longueur_estimation = estimation[1] - estimation[0] + 1
+    longueur_fenetre = fenetre[1] - fenetre[0] + 1
+    parametres, anormaux, cumuls = [], [], []
+    for debut in range(0, len(retenus), taille_paquet):
+        paquet = retenus[debut:debut + taille_paquet]
+        t, j = jours[paquet], colonnes[paquet]
+        alpha, beta, s2, n, m_bar, sxx = _market_model(
+            _windows(rendements, t + estimation[0], longueur_estimation, j),
+            _windows(rendements_marche, t + estimation[0], longueur_estimation), min_obs)
+
+        r = _windows(rendements, t + fenetre[0], longueur_fenetre, j)
+        m = _windows(rendements_marche, t + fenetre[0], longueur_fenetre)
+        ar = r - alpha[:, None] - beta[:, None] * m
+        colonnes_car = []
+        for a, b in fenetres:
+            tranche = slice(a - fenetre[0], b - fenetre[0] + 1)
+            longueur = b - a + 1
+            car = ar[:, tranche].sum(axis=1)
+            # Variance de l'erreur de prévision cumulée (Patell) : s2 (L + L^2/n + (sum(m_t - m_bar))^2 / Sxx)
+            ecart = (m[:, tranche] - m_bar[:, None]).sum(axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scar = car / np.sqrt(s2 * (longueur + longueur ** 2 / n + ecart ** 2 / sxx))
+            colonnes_car += [car, scar]
+        parametres.append(np.column_stack([alpha, beta, np.sqrt(s2), n]))
+        anormaux.append(ar)
+        cumuls.append(np.column_stack(colonnes_car))
+
+    if not len(retenus):
+        parametres = [np.empty((0, 4))]
+        anormaux = [np.empty((0, longueur_fenetre))]
+        cumuls = [np.empty((0, 2 * len(fenetres)))]
+    parametres, anormaux, cumuls = (np.concatenate(x) for x in (parametres, anormaux, cumuls))
+
+    # Événements sans estimation valide ou avec des rendements manquants dans la fenêtre
+    complets = ~np.isnan(parametres[:, 2]) & ~np.isnan(anormaux).any(axis=1)
+    resultats = evenements.iloc[retenus[complets]].reset_index(drop=True)
+    resultats["date_evenement"] = dates[jours[retenus[complets]]]
+    resultats[["alpha", "beta", "sigma", "n_estimation"]] = parametres[complets]
+    resultats["n_estimation"] = resultats["n_estimation"].astype(int)
+    noms = [f"{prefixe}{_window_label(f)}" for f in fenetres for prefixe in ("CAR", "SCAR")]
+    resultats[noms] = cumuls[complets]
+    ecartes = len(evenements) - complets.sum()
+    if ecartes:
+        logger.warning("%s événements écartés (ticker absent, historique insuffisant ou rendements manquants)",
+                       ecartes, extra={"champs": {"evenement": "evenements_ecartes", "n_ecartes": int(ecartes),
+                                                  "n_evenements": len(evenements)}})
+    return resultats, anormaux[complets]
+
+
+def caar_tests(resultats, fenetres=((-1, 1), (0, 0), (0, 5), (-10, 10)), seuil=0.05):
+    """
+    CAAR de chaque sous-fenêtre et tests de nullité :
+        t : test t en coupe des CAR ;
+        Patell : somme des CAR standardisés, rapportée à la racine de la somme
+            de leurs variances (n - 2) / (n - 4), loi normale ;
+        BMP : test t en coupe des CAR standardisés (Boehmer, Musumeci et
+            Poulsen), robuste à la hausse de variance le jour de l'événement.
+    Args:
+        resultats (pd.DataFrame): Sortie de event_study (ou un sous-ensemble).
+        fenetres (tuple): Sous-fenêtres calculées par event_study.
+        seuil (float): Seuil de significativité (test BMP).
+    Returns:
+        pd.DataFrame: Fenetre, N_evenements, CAAR, t, P-value_t, Patell_Z,
+            P-value_Patell, BMP_t, P-value_BMP, Significatif.
+    """
+    n_est = resultats["n_estimation"].to_numpy(dtype="float64")
+    lignes = []
+    for fenetre in fenetres:
+        car = resultats[f"CAR{_window_label(fenetre)}"].to_numpy()
+        scar = resultats[f"SCAR{_window_label(fenetre)}"].to_numpy()
+        n = len(car)
+        ligne = {"Fenetre": _window_label(fenetre), "N_evenements": n, "CAAR": car.mean() if n else np.nan,
+                 "t": np.nan, "P-value_t": np.nan, "Patell_Z": np.nan, "P-value_Patell": np.nan,
+                 "BMP_t": np.nan, "P-value_BMP": np.nan}
+        if n:
+            patell = scar.sum() / np.sqrt(((n_est - 2) / (n_est - 4)).sum())
+            ligne.update({"Patell_Z": patell, "P-value_Patell": 2 * stats.norm.sf(abs(patell))})
+        # Tests en coupe non définis avec moins de deux événements ou des valeurs toutes égales
+        if n >= 2 and car.std(ddof=1) > 0:
+            t_stat = car.mean() / (car.std(ddof=1) / np.sqrt(n))
+            ligne.update({"t": t_stat, "P-value_t": 2 * stats.t.sf(abs(t_stat), n - 1)})
+        if n >= 2 and scar.std(ddof=1) > 0:
+            bmp = scar.mean() / (scar.std(ddof=1) / np.sqrt(n))
+            ligne.update({"BMP_t": bmp, "P-value_BMP": 2 * stats.t.sf(abs(bmp), n - 1)})
+        lignes.append(ligne)
+    tests = pd.DataFrame(lignes)
+    tests["Significatif"] = np.where(tests["P-value_BMP"] < seuil, "Oui", "Non")
+    return tests
+
+
+def average_abnormal_returns(anormaux, fenetre=(-10, 10)):
+    """
+    AAR et CAAR jour par jour de la fenêtre d'événement, avec le test t en coupe des AR.
+    Args:
+        anormaux (np.ndarray): Rendements anormaux de event_study.
+        fenetre (tuple): Fenêtre d'événement utilisée par event_study.
+    Returns:
+        pd.DataFrame: Jour, AAR, CAAR, t, P-value.
+    """
+    n = anormaux.shape[0]
+    longueur = fenetre[1] - fenetre[0] + 1
+    aar = anormaux.mean(axis=0) if n else np.full(longueur, np.nan)
+    t_stat = np.full(longueur, np.nan)
+    # Test t non défini avec moins de deux événements ou des AR tous égaux
+    if n >= 2:
+        erreur_type = anormaux.std(axis=0, ddof=1) / np.sqrt(n)
+        np.divide(aar, erreur_type, out=t_stat, where=erreur_type > 0)
+    return pd.DataFrame({"Jour": np.arange(fenetre[0], fenetre[1] + 1), "AAR": aar, "CAAR": aar.cumsum(),
+                         "t": t_stat, "P-value": 2 * stats.t.sf(np.abs(t_stat), n - 1)})
@@ -1,8 +1,30 @@
 import pandas as pd
+import logging
 import zipfile
 import os
-import io
+import shutil
+import tempfile
+import threading
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+
+from scripts.instrumentation import CountingFileSystem, stage
+
+logger = logging.getLogger(__name__)
+
+# Taille au-delà de laquelle un ZIP imbriqué est déversé sur disque
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# Taille des blocs de copie entre flux
+COPY_CHUNK_SIZE = 1024 * 1024
+# Nombre maximum d'entrées à considérer pour chaque catégorie
+MAX_ENTRIES = 3
+# Colonnes converties en dates (format AAAAMMJJ dans les XML INPI)
+DATE_COLUMNS = ["publication_date", "application_date", "last-fee-payement",
+                "next-fee-payement", "date-search-completed"]
+# Libellés des erreurs de lecture (champ evenement des logs structurés)
+LOG_MESSAGES = {"erreur_zip": "Erreur ZIP", "erreur_zip_interne": "Erreur ZIP interne",
+                "erreur_xml": "Erreur XML", "annee_invalide": "Dossier d'année non numérique"}
 
 
 def walk_s3_recursively(fs, root):
@@ -17,82 +39,215 @@ def walk_s3_recursively(fs, root):
             yield from walk_s3_recursively(fs, item)
 
 
-def process_all_years_s3(fs, root_s3_path):
+def process_all_years_s3(fs, root_s3_path, n_workers=1, max_in_flight=None,
+                         max_entries=MAX_ENTRIES, instrumentation=False):
     """
     Parcourt tous les dossiers d'années dans un bucket S3
-    et concatène les données extraites de chaque année.
+    et rassemble les données extraites de chaque année.
+    Args:
+        fs: Système de fichiers (s3fs ou compatible fsspec).
+        root_s3_path (str): Dossier racine contenant un sous-dossier par année.
+        n_workers (int): Nombre de téléchargements et de processus de parsing
+            simultanés. 1 conserve le traitement séquentiel historique.
+        max_in_flight (int): Nombre maximal de ZIP téléchargés mais pas encore
+            parsés (borne la mémoire). Par défaut 2 * n_workers.
+        max_entries (int): Nombre maximum de déposants, inventeurs, mandataires,
+            propriétaires, classifications et citations retenus par brevet.
+        instrumentation (bool): Émet, pour les étapes listing, parsing et
+            dataframe, un log structuré (durée, enregistrements/s, pic mémoire,
+            octets lus sur fs) ; voir instrumentation.configure_logging.
+    Returns:
+        pd.DataFrame: Identique au résultat séquentiel quel que soit n_workers.
     """
-    all_data = []
-    # Liste les sous-dossiers (par années)
-    year_dirs = [p for p in fs.ls(root_s3_path) if fs.isdir(p)]
-    for year_path in sorted(year_dirs):
-        year_name = year_path.rstrip("/").split("/")[-1]
-        df_year = process_year_folder_s3(fs, year_path)
-        if not df_year.empty:
-            df_year["year"] = year_name
-            all_data.append(df_year)
-    if all_data:
-        return pd.concat(all_data, ignore_index=True)
+    if instrumentation:
+        fs = CountingFileSystem(fs)
+    with stage("listing", instrumentation, fs, logger) as mesures:
+        # Liste les sous-dossiers (par années)
+        year_dirs = sorted(p for p in fs.ls(root_s3_path) if fs.isdir(p))
+        zips_by_year = []
+        for year_path in year_dirs:
+            year_name = year_path.rstrip("/").split("/")[-1]
+            zips_by_year.append((year_name, list_zip_files_s3(fs, year_path)))
+        all_zips = [p for _, zip_files in zips_by_year for p in zip_files]
+        mesures.update(annees=len(year_dirs), archives=len(all_zips))
+
+    if n_workers > 1:
+        records_by_zip = iter_zip_records_parallel(fs, all_zips, n_workers, max_in_flight, max_entries)
     else:
-        return pd.DataFrame()
+        records_by_zip = ((p, list(iter_zip_records_s3(fs, p, max_entries=max_entries)))
+                          for p in all_zips)
 
+    # closing : les pools du mode parallèle sont arrêtés dès la fin du parsing
+    with closing(records_by_zip), \
+            stage("parsing", instrumentation, fs, logger, n_workers=n_workers) as mesures:
+        all_records = []
+        for year_name, zip_files in zips_by_year:
+            for _ in zip_files:
+                _, records = next(records_by_zip)
+                for record in records:
+                    record["year"] = year_name
+                    all_records.append(record)
+        mesures.update(archives=len(all_zips), enregistrements=len(all_records))
 
-def process_year_folder_s3(fs, year_path):
+    with stage("dataframe", instrumentation, fs, logger) as mesures:
+        df = build_brevets_dataframe(all_records, max_entries, extra_columns=["year"])
+        mesures["enregistrements"] = len(df)
+    return df
+
+
+def process_year_folder_s3(fs, year_path, max_entries=MAX_ENTRIES):
     """ Parcourt toute l’arborescence d’une année et traite tous les ZIP rencontrés. """
-    all_brevets = []
+    all_records = []
+    for zip_s3_path in list_zip_files_s3(fs, year_path):
+        all_records.extend(iter_zip_records_s3(fs, zip_s3_path, max_entries=max_entries))
+    return build_brevets_dataframe(all_records, max_entries)
+
+
+def list_zip_files_s3(fs, year_path):
+    """ Liste, dans l'ordre de parcours, les ZIP présents sous year_path. """
     all_paths = list(walk_s3_recursively(fs, year_path))
-    zip_files = [p for p in all_paths if p.lower().endswith(".zip")]
-    for zip_s3_path in zip_files:
-        df_zip = extract_from_zip_s3(fs, zip_s3_path)
-        if not df_zip.empty:
-            all_brevets.append(df_zip)
-    return pd.concat(all_brevets, ignore_index=True) if all_brevets else pd.DataFrame()
+    return [p for p in all_paths if p.lower().endswith(".zip")]
+
+
+def iter_zip_records_parallel(fs, zip_paths, n_workers=4, max_in_flight=None,
+                              max_entries=MAX_ENTRIES):
+    """
+    Génère les couples (chemin, liste d'enregistrements) de chaque ZIP, dans
+    l'ordre de zip_paths. Au plus n_workers téléchargements tournent en même
+    temps et au plus max_in_flight archives attendent leur parsing (dans des
+    fichiers temporaires).
+    """
+    max_in_flight = max_in_flight or 2 * n_workers
+    download_slots = threading.Semaphore(n_workers)
+    with ProcessPoolExecutor(n_workers) as parse_pool, \
+            ThreadPoolExecutor(max_in_flight) as io_pool:
+
+        def download_and_parse(zip_s3_path):
+            try:
+                with download_slots:
+                    local_path = _download_to_tempfile(fs, zip_s3_path)
+            except Exception as e:
+                _log_error(logging.ERROR, "erreur_zip", zip_s3_path, e)
+                return []
+            try:
+                return parse_pool.submit(_parse_local_zip, local_path, zip_s3_path,
+                                         max_entries).result()
+            finally:
+                os.remove(local_path)
+
+        # Les tâches ne sont soumises qu'au fil de la consommation des résultats
+        paths = iter(zip_paths)
+        pending = []
+        for zip_s3_path in paths:
+            pending.append((zip_s3_path, io_pool.submit(download_and_parse, zip_s3_path)))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            zip_s3_path, future = pending.pop(0)
+            records = future.result()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, io_pool.submit(download_and_parse, next_path)))
+            yield zip_s3_path, records
+
+
+def _download_to_tempfile(fs, zip_s3_path):
+    """ Copie un ZIP S3 par blocs dans un fichier temporaire local et renvoie son chemin. """
+    with fs.open(zip_s3_path, "rb") as f, \
+            tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+        shutil.copyfileobj(f, tmp, COPY_CHUNK_SIZE)
+    return tmp.name
 
 
-def extract_from_zip_s3(fs, zip_s3_path):
+def _parse_local_zip(local_path, zip_s3_path, max_entries=MAX_ENTRIES):
+    """ Parse un ZIP téléchargé localement (exécuté dans un processus du pool). """
+    with open(local_path, "rb") as f:
+        return list(_iter_archive_records(f, zip_s3_path, max_entries))
+
+
+def extract_from_zip_s3(fs, zip_s3_path, spool=False, max_entries=MAX_ENTRIES):
     """
     Ouvre un ZIP sur S3, traite les XML, et gère aussi les ZIP imbriqués.
-    Ignore les fichiers TOC.xml.
+    Ignore les fichiers TOC.xml. Retourne un DataFrame.
+    """
+    records = list(iter_zip_records_s3(fs, zip_s3_path, spool, max_entries))
+    return build_brevets_dataframe(records, max_entries)
+
+
+def iter_zip_records_s3(fs, zip_s3_path, spool=False, max_entries=MAX_ENTRIES):
+    """
+    Génère un enregistrement (dict) par XML de brevet contenu dans un ZIP S3.
+    Le ZIP est lu directement depuis le fichier S3 (seekable), sans copie
+    complète en mémoire. Avec spool=True, il est d'abord recopié par blocs
+    dans un fichier temporaire, ce qui évite les lectures par plages sur S3.
     """
-    all_brevets = []
     try:
         with fs.open(zip_s3_path, "rb") as f:
-            zip_bytes = io.BytesIO(f.read())
-        with zipfile.ZipFile(zip_bytes, "r") as archive:
+            if not spool:
+                yield from _iter_archive_records(f, zip_s3_path, max_entries)
+                return
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as tmp:
+                shutil.copyfileobj(f, tmp, COPY_CHUNK_SIZE)
+                tmp.seek(0)
+                yield from _iter_archive_records(tmp, zip_s3_path, max_entries)
+    except Exception as e:
+        _log_error(logging.ERROR, "erreur_zip", zip_s3_path, e)
+
+
+def _spool_member(archive, name):
+    """
+    Recopie un membre d'archive dans un fichier temporaire seekable :
+    en mémoire jusqu'à SPOOL_MAX_SIZE octets, sur disque au-delà.
+    """
+    tmp = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with archive.open(name) as member:
+        shutil.copyfileobj(member, tmp, COPY_CHUNK_SIZE)
+    tmp.seek(0)
+    return tmp
+
+
+def _iter_archive_records(zip_file, zip_s3_path, max_entries=MAX_ENTRIES):
+    """ Traite le contenu d'un ZIP de premier niveau (objet fichier seekable). """
+    try:
+        with zipfile.ZipFile(zip_file, "r") as archive:
             for name in archive.namelist():
                 # Ignore les fichiers TOC.xml
                 if name.lower() == "toc.xml":
                     continue
-                # 1) Fichiers XML => extraction directe
+                # 1) Fichiers XML => extraction directe depuis le flux décompressé
                 if name.lower().endswith(".xml"):
                     try:
                         with archive.open(name) as xml_file:
-                            xml_content = io.BytesIO(xml_file.read())
-                            df = extract_brevet_info(xml_content)
-                            all_brevets.append(df)
+                            record = extract_brevet_record(xml_file, max_entries)
                     except Exception as e:
-                        print(f"⚠️ Erreur XML dans {zip_s3_path}/{name}: {e}")
+                        _log_error(logging.WARNING, "erreur_xml", f"{zip_s3_path}/{name}", e)
+                        continue
+                    yield record
                 # 2) ZIP internes => extraction récursive
                 elif name.lower().endswith(".zip"):
                     try:
-                        with archive.open(name) as nested_zip:
-                            nested_bytes = io.BytesIO(nested_zip.read())
-                            all_brevets.append(
-                                extract_from_nested_zip(nested_bytes, f"{zip_s3_path}/{name}")
-                            )
+                        with _spool_member(archive, name) as nested_file:
+                            records = list(_iter_nested_records(
+                                nested_file, f"{zip_s3_path}/{name}", max_entries))
                     except Exception as e:
-                        print(f"⚠️ Erreur ZIP interne {zip_s3_path}/{name}: {e}")
+                        _log_error(logging.WARNING, "erreur_zip_interne", f"{zip_s3_path}/{name}", e)
+                        continue
+                    yield from records
     except Exception as e:
-        print(f"❌ Erreur ZIP {zip_s3_path}: {e}")
-    return pd.concat(all_brevets, ignore_index=True) if all_brevets else pd.DataFrame()
+        _log_error(logging.ERROR, "erreur_zip", zip_s3_path, e)
 
 
-def extract_from_nested_zip(zip_bytes, label_for_logs="nested"):
+def extract_from_nested_zip(zip_bytes, label_for_logs="nested", max_entries=MAX_ENTRIES):
     """
-    Extrait XML & ZIP contenus dans un ZIP déjà chargé en mémoire.
-    Ignore les fichiers TOC.xml.
+    Extrait XML & ZIP contenus dans un ZIP déjà ouvert (BytesIO ou fichier seekable).
+    Ignore les fichiers TOC.xml. Retourne un DataFrame.
     """
-    all_brevets = []
+    records = list(_iter_nested_records(zip_bytes, label_for_logs, max_entries))
+    return build_brevets_dataframe(records, max_entries)
+
+
+def _iter_nested_records(zip_bytes, label_for_logs="nested", max_entries=MAX_ENTRIES):
+    """ Génère les enregistrements des XML d'un ZIP imbriqué, récursivement. """
     try:
         with zipfile.ZipFile(zip_bytes, "r") as archive:
             for name in archive.namelist():
@@ -102,22 +257,82 @@ def extract_from_nested_zip(zip_bytes, label_for_logs="nested"):
                 if name.lower().endswith(".xml"):
                     try:
                         with archive.open(name) as xml_file:
-                            xml_content = io.BytesIO(xml_file.read())
-                            df = extract_brevet_info(xml_content)
-                            all_brevets.append(df)
+                            record = extract_brevet_record(xml_file, max_entries)
                     except Exception as e:
-                        print(f"⚠️ Erreur XML interne dans {label_for_logs}: {e}")
+                        _log_error(logging.WARNING, "erreur_xml", f"{label_for_logs}/{name}", e)
+                        continue
+                    yield record
                 elif name.lower().endswith(".zip"):
                     try:
-                        with archive.open(name) as inner_zip:
-                            nested_bytes = io.BytesIO(inner_zip.read())
-                            df_nested = extract_from_nested_zip(nested_bytes, name)
-                            all_brevets.append(df_nested)
+                        with _spool_member(archive, name) as inner_zip:
+                            records = list(_iter_nested_records(inner_zip, name, max_entries))
                     except Exception as e:
-                        print(f"⚠️ Erreur ZIP imbriqué dans {label_for_logs}: {e}")
+                        _log_error(logging.WARNING, "erreur_zip_interne", f"{label_for_logs}/{name}", e)
+                        continue
+                    yield from records
     except Exception as e:
-        print(f"❌ Erreur ZIP imbriqué {label_for_logs}: {e}")
-    return pd.concat(all_brevets, ignore_index=True) if all_brevets else pd.DataFrame()
+        _log_error(logging.ERROR, "erreur_zip", label_for_logs, e)
+
+
+def _log_error(niveau, evenement, chemin, erreur):
+    """ Avertissement ou erreur de lecture, émis en log structuré (evenement, chemin, erreur). """
+    logger.log(niveau, "%s %s : %s", LOG_MESSAGES[evenement], chemin, erreur,
+               extra={"champs": {"evenement": evenement, "chemin": chemin, "erreur": str(erreur)}})
+
+
+def brevet_columns(max_entries=MAX_ENTRIES):
+    """ Liste ordonnée des colonnes produites par extract_brevet_record. """
+    columns = [
+        "doc-number", "kind", "country", "status",
+        "publication_country", "publication_doc-number", "publication_date",
+        "publication_bopinum", "publication_nature",
+        "application_country", "application_doc-number", "application_date",
+        "invention-title",
+    ]
+    address = ["address-1", "city", "postcode", "country"]
+    for prefix, fields in [("applicant", ["orgname"]),
+                           ("inventor", ["last-name", "first-name"]),
+                           ("agent", ["orgname"]),
+                           ("owner", ["last-name", "first-name"])]:
+        for i in range(1, max_entries + 1):
+            columns += [f"{prefix}_{i}_{field}" for field in fields + address]
+    columns += [f"classification_{i}_text" for i in range(1, max_entries + 1)]
+    columns.append("abstract")
+    for i in range(1, max_entries + 1):
+        columns += [f"citation_{i}_{field}" for field in
+                    ["type", "text", "country", "doc-number", "date"]]
+    columns += ["last-fee-payement", "next-fee-payement", "date-search-completed"]
+    return columns
+
+
+def build_brevets_dataframe(records, max_entries=MAX_ENTRIES, extra_columns=()):
+    """
+    Construit en une seule fois le DataFrame des brevets à partir d'enregistrements
+    (dicts), colonne par colonne, avec un schéma fixe : textes en dtype "string",
+    dates en datetime64, année en entier ; les valeurs absentes sont des NA pandas.
+    Un nom de dossier d'année non numérique donne une année NA et un avertissement.
+    Args:
+        records (list): Enregistrements produits par extract_brevet_record.
+        max_entries (int): Nombre d'entrées par catégorie (déposants, inventeurs...).
+        extra_columns (list): Colonnes ajoutées aux enregistrements (ex. "year").
+    Returns:
+        pd.DataFrame: Une ligne par enregistrement.
+    """
+    columns = {}
+    for column in brevet_columns(max_entries) + list(extra_columns):
+        values = [record.get(column) for record in records]
+        if column in DATE_COLUMNS or column.startswith("citation_") and column.endswith("_date"):
+            columns[column] = pd.to_datetime(pd.Series(values, dtype="string"),
+                                             format="%Y%m%d", errors="coerce")
+        elif column == "year":
+            texte = pd.Series(values, dtype="string")
+            columns[column] = pd.to_numeric(texte, errors="coerce").astype("Int64")
+            invalides = texte[texte.notna() & columns[column].isna()].value_counts()
+            for annee, n in invalides.items():
+                _log_error(logging.WARNING, "annee_invalide", annee, f"{n} enregistrements sans année")
+        else:
+            columns[column] = pd.Series(values, dtype="string")
+    return pd.DataFrame(columns)
 
 
 def extract_brevet_info(xml_file_path):
@@ -125,214 +340,214 @@ def extract_brevet_info(xml_file_path):
     Extrait les informations d'un fichier XML de brevet et retourne un DataFrame pandas
     avec toutes les sous-catégories décomposées en colonnes distinctes.
     Args:
-        xml_file_path (str): Chemin vers le fichier XML.
+        xml_file_path (str): Chemin vers le fichier XML (ou objet fichier).
     Returns:
         pd.DataFrame: DataFrame contenant toutes les informations extraites.
     """
-    # Parse le fichier XML
-    tree = ET.parse(xml_file_path)
-    root = tree.getroot()
-    # Initialisation des variables
-    data = {}
+    return build_brevets_dataframe([extract_brevet_record(xml_file_path)])
+
+
+# Schéma de l'extraction : pour chaque contexte, tag recherché -> règles
+# (clé, tag parent exigé, contexte ouvert sur l'élément trouvé, mode).
+# Chaque règle retient le premier descendant correspondant, comme root.find(".//tag") ;
+# le mode "sequence" indexe par l'attribut sequence ([@sequence='i']) et le mode
+# "position" par le rang parmi les frères de même tag (citation[i]).
+_ADDRESS = {
+    "address-1": [("address-1", None, None, None)],
+    "city": [("city", None, None, None)],
+    "postcode": [("postcode", None, None, None)],
+    "country": [("country", None, None, None)],
+}
+_PERSON = {
+    "orgname": [("orgname", None, None, None)],
+    "last-name": [("last-name", None, None, None)],
+    "first-name": [("first-name", None, None, None)],
+    "address": [("address", None, _ADDRESS, None)],
+}
+_DOCUMENT_ID = {
+    "country": [("country", None, None, None)],
+    "doc-number": [("doc-number", None, None, None)],
+    "date": [("date", None, None, None)],
+}
+_CITATION = {
+    "patcit": [("patcit", None, {
+        "text": [("text", None, None, None)],
+        "document-id": [("document-id", None, _DOCUMENT_ID, None)],
+    }, None)],
+    "nplcit": [("nplcit", None, {"text": [("text", None, None, None)]}, None)],
+}
+_SCHEMA = {
+    "fr-publication-reference": [("publication", "fr-publication-data", {
+        "country": [("country", None, None, None)],
+        "doc-number": [("doc-number", None, None, None)],
+        "date": [("date", None, None, None)],
+        "fr-bopinum": [("fr-bopinum", None, None, None)],
+        "fr-nature": [("fr-nature", None, None, None)],
+    }, None)],
+    "fr-application-reference": [("application", None, _DOCUMENT_ID, None)],
+    "invention-title": [("invention-title", None, None, None)],
+    "applicant": [("applicant", None, _PERSON, "sequence")],
+    "inventor": [("inventor", None, _PERSON, "sequence")],
+    "agent": [("agent", None, _PERSON, "sequence")],
+    "fr-owner": [("owner", None, _PERSON, "sequence")],
+    "classification-ipcr": [("classification", None, {"text": [("text", None, None, None)]},
+                             "sequence")],
+    "p": [("abstract", "abstract", None, None)],
+    "citation": [("citation", None, _CITATION, "position")],
+    "fr-date-availability": [("availability", None, {
+        "date": [("last-fee-payement", "fr-last-fee-payement", None, None),
+                 ("next-fee-payement", "fr-next-fee-payement", None, None),
+                 ("date-search-completed", "fr-date-search-completed", None, None)],
+    }, None)],
+}
+
+
+class _Context:
+    """ Élément ouvrant un contexte de recherche et premiers descendants trouvés. """
+
+    __slots__ = ("schema", "element", "found")
+
+    def __init__(self, schema, element):
+        self.schema = schema
+        self.element = element
+        self.found = {}
+
+    def text(self, key):
+        element = self.found.get(key)
+        return element.text if element is not None else None
+
+
+def _walk(element, contexts):
+    """ Parcourt une seule fois le sous-arbre en alimentant tous les contextes ouverts. """
+    positions = {}
+    for child in element:
+        tag = child.tag
+        position = positions[tag] = positions.get(tag, 0) + 1
+        opened = None
+        for context in contexts:
+            rules = context.schema.get(tag)
+            if rules is None:
+                continue
+            for key, parent_tag, schema, mode in rules:
+                if parent_tag is not None and (element.tag != parent_tag
+                                               or element is context.element):
+                    continue
+                if mode == "sequence":
+                    key = (key, child.get("sequence"))
+                elif mode == "position":
+                    key = (key, str(position))
+                if key in context.found:
+                    continue
+                if schema is None:
+                    context.found[key] = child
+                else:
+                    sub_context = _Context(schema, child)
+                    context.found[key] = sub_context
+                    opened = opened or []
+                    opened.append(sub_context)
+        if len(child):
+            _walk(child, contexts + opened if opened else contexts)
+
+
+def _fill_address(data, prefix, person):
+    address = person.found.get("address")
+    if address is not None:
+        for field in ["address-1", "city", "postcode", "country"]:
+            data[f"{prefix}_{field}"] = address.text(field)
+
+
+def extract_brevet_record(xml_file_path, max_entries=MAX_ENTRIES):
+    """
+    Extrait les informations d'un fichier XML de brevet sous forme d'enregistrement.
+    L'arbre est parcouru une seule fois (voir _SCHEMA), avec le même résultat
+    que des recherches root.find(".//…") champ par champ.
+    Args:
+        xml_file_path (str): Chemin vers le fichier XML (ou objet fichier).
+        max_entries (int): Nombre maximum d'entrées pour chaque catégorie.
+    Returns:
+        dict: Colonne -> valeur (None si l'information est absente).
+    """
+    # Parse le fichier XML puis un seul parcours de l'arbre
+    root = ET.parse(xml_file_path).getroot()
+    doc = _Context(_SCHEMA, root)
+    _walk(root, [doc])
+    found = doc.found
     # Informations générales
-    data["doc-number"] = root.attrib.get("doc-number", "NA")
-    data["kind"] = root.attrib.get("kind", "NA")
-    data["country"] = root.attrib.get("country", "NA")
-    data["status"] = root.attrib.get("status", "NA")
+    data = {
+        "doc-number": root.attrib.get("doc-number"),
+        "kind": root.attrib.get("kind"),
+        "country": root.attrib.get("country"),
+        "status": root.attrib.get("status"),
+    }
     # Publication data
-    publication_data = root.find(".//fr-publication-data/fr-publication-reference")
-    if publication_data is not None:
-        data["publication_country"] = publication_data.find(".//country").text \
-            if publication_data.find(".//country") is not None else "NA"
-        data["publication_doc-number"] = publication_data.find(".//doc-number").text \
-            if publication_data.find(".//doc-number") is not None else "NA"
-        data["publication_date"] = publication_data.find(".//date").text \
-            if publication_data.find(".//date") is not None else "NA"
-        data["publication_bopinum"] = publication_data.find(".//fr-bopinum").text \
-            if publication_data.find(".//fr-bopinum") is not None else "NA"
-        data["publication_nature"] = publication_data.find(".//fr-nature").text \
-            if publication_data.find(".//fr-nature") is not None else "NA"
+    publication = found.get("publication")
+    if publication is not None:
+        for field in ["country", "doc-number", "date", "fr-bopinum", "fr-nature"]:
+            column = "bopinum" if field == "fr-bopinum" else "nature" if field == "fr-nature" else field
+            data[f"publication_{column}"] = publication.text(field)
     # Application reference
-    application_reference = root.find(".//fr-application-reference")
-    if application_reference is not None:
-        data["application_country"] = application_reference.find(".//country").text \
-            if application_reference.find(".//country") is not None else "NA"
-        data["application_doc-number"] = application_reference.find(".//doc-number").text \
-            if application_reference.find(".//doc-number") is not None else "NA"
-        data["application_date"] = application_reference.find(".//date").text \
-            if application_reference.find(".//date") is not None else "NA"
+    application = found.get("application")
+    if application is not None:
+        for field in ["country", "doc-number", "date"]:
+            data[f"application_{field}"] = application.text(field)
     # Titre de l'invention
-    data["invention-title"] = root.find(".//invention-title").text \
-        if root.find(".//invention-title") is not None else "NA"
-    # Déposants (applicants)
-    max_entries = 3  # Nombre maximum d'entrées à considérer pour chaque catégorie
+    data["invention-title"] = doc.text("invention-title")
     for i in range(1, max_entries + 1):
-        applicant = root.find(".//applicant[@sequence='{}']".format(i))
+        sequence = str(i)
+        # Déposants (applicants) : dénomination, sinon "nom prénom"
+        applicant = found.get(("applicant", sequence))
         if applicant is not None:
-            orgname = applicant.find(".//orgname")
+            orgname = applicant.found.get("orgname")
             if orgname is not None:
                 data[f"applicant_{i}_orgname"] = orgname.text
             else:
-                last_name = applicant.find(".//last-name")
-                first_name = applicant.find(".//first-name")
-                full_name = f"{last_name.text} {first_name.text}" \
-                    if last_name is not None and first_name is not None else "NA"
-                data[f"applicant_{i}_orgname"] = full_name
-            address = applicant.find(".//address")
-            if address is not None:
-                data[f"applicant_{i}_address-1"] = address.find(".//address-1").text \
-                    if address.find(".//address-1") is not None else "NA"
-                data[f"applicant_{i}_city"] = address.find(".//city").text \
-                    if address.find(".//city") is not None else "NA"
-                data[f"applicant_{i}_postcode"] = address.find(".//postcode").text \
-                    if address.find(".//postcode") is not None else "NA"
-                data[f"applicant_{i}_country"] = address.find(".//country").text \
-                    if address.find(".//country") is not None else "NA"
-        else:
-            data[f"applicant_{i}_orgname"] = "NA"
-            data[f"applicant_{i}_address-1"] = "NA"
-            data[f"applicant_{i}_city"] = "NA"
-            data[f"applicant_{i}_postcode"] = "NA"
-            data[f"applicant_{i}_country"] = "NA"
-    # Inventeurs (inventors)
-    for i in range(1, max_entries + 1):
-        inventor = root.find(".//inventor[@sequence='{}']".format(i))
-        if inventor is not None:
-            last_name = inventor.find(".//last-name")
-            data[f"inventor_{i}_last-name"] = last_name.text \
-                if last_name is not None else "NA"
-            first_name = inventor.find(".//first-name")
-            data[f"inventor_{i}_first-name"] = first_name.text \
-                if first_name is not None else "NA"
-            address = inventor.find(".//address")
-            if address is not None:
-                data[f"inventor_{i}_address-1"] = address.find(".//address-1").text \
-                    if address.find(".//address-1") is not None else "NA"
-                data[f"inventor_{i}_city"] = address.find(".//city").text \
-                    if address.find(".//city") is not None else "NA"
-                data[f"inventor_{i}_postcode"] = address.find(".//postcode").text \
-                    if address.find(".//postcode") is not None else "NA"
-                data[f"inventor_{i}_country"] = address.find(".//country").text \
-                    if address.find(".//country") is not None else "NA"
-        else:
-            data[f"inventor_{i}_last-name"] = "NA"
-            data[f"inventor_{i}_first-name"] = "NA"
-            data[f"inventor_{i}_address-1"] = "NA"
-            data[f"inventor_{i}_city"] = "NA"
-            data[f"inventor_{i}_postcode"] = "NA"
-            data[f"inventor_{i}_country"] = "NA"
-    # Agents
-    for i in range(1, max_entries + 1):
-        agent = root.find(".//agent[@sequence='{}']".format(i))
+                last_name = applicant.found.get("last-name")
+                first_name = applicant.found.get("first-name")
+                data[f"applicant_{i}_orgname"] = f"{last_name.text} {first_name.text}" \
+                    if last_name is not None and first_name is not None else None
+            _fill_address(data, f"applicant_{i}", applicant)
+        # Inventeurs et propriétaires (owners)
+        for prefix in ["inventor", "owner"]:
+            person = found.get((prefix, sequence))
+            if person is not None:
+                data[f"{prefix}_{i}_last-name"] = person.text("last-name")
+                data[f"{prefix}_{i}_first-name"] = person.text("first-name")
+                _fill_address(data, f"{prefix}_{i}", person)
+        # Agents
+        agent = found.get(("agent", sequence))
         if agent is not None:
-            orgname = agent.find(".//orgname")
-            data[f"agent_{i}_orgname"] = orgname.text \
-                if orgname is not None else "NA"
-            address = agent.find(".//address")
-            if address is not None:
-                data[f"agent_{i}_address-1"] = address.find(".//address-1").text \
-                    if address.find(".//address-1") is not None else "NA"
-                data[f"agent_{i}_city"] = address.find(".//city").text \
-                    if address.find(".//city") is not None else "NA"
-                data[f"agent_{i}_postcode"] = address.find(".//postcode").text \
-                    if address.find(".//postcode") is not None else "NA"
-                data[f"agent_{i}_country"] = address.find(".//country").text \
-                    if address.find(".//country") is not None else "NA"
-        else:
-            data[f"agent_{i}_orgname"] = "NA"
-            data[f"agent_{i}_address-1"] = "NA"
-            data[f"agent_{i}_city"] = "NA"
-            data[f"agent_{i}_postcode"] = "NA"
-            data[f"agent_{i}_country"] = "NA"
-    # Propriétaires (owners)
-    for i in range(1, max_entries + 1):
-        owner = root.find(".//fr-owner[@sequence='{}']".format(i))
-        if owner is not None:
-            last_name = owner.find(".//last-name")
-            data[f"owner_{i}_last-name"] = last_name.text \
-                if last_name is not None else "NA"
-            first_name = owner.find(".//first-name")
-            data[f"owner_{i}_first-name"] = first_name.text \
-                if first_name is not None else "NA"
-            address = owner.find(".//address")
-            if address is not None:
-                data[f"owner_{i}_address-1"] = address.find(".//address-1").text \
-                    if address.find(".//address-1") is not None else "NA"
-                data[f"owner_{i}_city"] = address.find(".//city").text \
-                    if address.find(".//city") is not None else "NA"
-                data[f"owner_{i}_postcode"] = address.find(".//postcode").text \
-                    if address.find(".//postcode") is not None else "NA"
-                data[f"owner_{i}_country"] = address.find(".//country").text \
-                    if address.find(".//country") is not None else "NA"
-        else:
-            data[f"owner_{i}_last-name"] = "NA"
-            data[f"owner_{i}_first-name"] = "NA"
-            data[f"owner_{i}_address-1"] = "NA"
-            data[f"owner_{i}_city"] = "NA"
-            data[f"owner_{i}_postcode"] = "NA"
-            data[f"owner_{i}_country"] = "NA"
-    # Classifications CIB (IPC)
-    for i in range(1, max_entries + 1):
-        classification = root.find(".//classification-ipcr[@sequence='{}']".format(i))
-        if classification is not None:
-            data[f"classification_{i}_text"] = classification.find(".//text").text \
-                if classification.find(".//text") is not None else "NA"
-        else:
-            data[f"classification_{i}_text"] = "NA"
-    # Résumé (abstract)
-    abstract = root.find(".//abstract/p")
-    data["abstract"] = abstract.text if abstract is not None else "NA"
-    # Références citées (citations)
-    for i in range(1, max_entries + 1):
-        citation = root.find(".//citation[{}]".format(i))
+            data[f"agent_{i}_orgname"] = agent.text("orgname")
+            _fill_address(data, f"agent_{i}", agent)
+        # Classifications CIB (IPC)
+        classification = found.get(("classification", sequence))
+        data[f"classification_{i}_text"] = classification.text("text") \
+            if classification is not None else None
+        # Références citées (citations)
+        citation = found.get(("citation", sequence))
         if citation is not None:
-            patcit = citation.find(".//patcit")
+            patcit = citation.found.get("patcit")
+            nplcit = citation.found.get("nplcit")
             if patcit is not None:
                 data[f"citation_{i}_type"] = "patcit"
-                data[f"citation_{i}_text"] = patcit.find(".//text").text \
-                    if patcit.find(".//text") is not None else "NA"
-                document_id = patcit.find(".//document-id")
+                data[f"citation_{i}_text"] = patcit.text("text")
+                document_id = patcit.found.get("document-id")
                 if document_id is not None:
-                    data[f"citation_{i}_country"] = document_id.find(".//country").text \
-                        if document_id.find(".//country") is not None else "NA"
-                    data[f"citation_{i}_doc-number"] = document_id.find(".//doc-number").text \
-                        if document_id.find(".//doc-number") is not None else "NA"
-                    data[f"citation_{i}_date"] = document_id.find(".//date").text \
-                        if document_id.find(".//date") is not None else "NA"
-            else:
-                nplcit = citation.find(".//nplcit")
-                if nplcit is not None:
-                    data[f"citation_{i}_type"] = "nplcit"
-                    data[f"citation_{i}_text"] = nplcit.find(".//text").text \
-                        if nplcit.find(".//text") is not None else "NA"
-                else:
-                    data[f"citation_{i}_type"] = "NA"
-                    data[f"citation_{i}_text"] = "NA"
-                    data[f"citation_{i}_country"] = "NA"
-                    data[f"citation_{i}_doc-number"] = "NA"
-                    data[f"citation_{i}_date"] = "NA"
-        else:
-            data[f"citation_{i}_type"] = "NA"
-            data[f"citation_{i}_text"] = "NA"
-            data[f"citation_{i}_country"] = "NA"
-            data[f"citation_{i}_doc-number"] = "NA"
-            data[f"citation_{i}_date"] = "NA"
+                    for field in ["country", "doc-number", "date"]:
+                        data[f"citation_{i}_{field}"] = document_id.text(field)
+            elif nplcit is not None:
+                data[f"citation_{i}_type"] = "nplcit"
+                data[f"citation_{i}_text"] = nplcit.text("text")
+    # Résumé (abstract)
+    data["abstract"] = doc.text("abstract")
     # Dates de disponibilité
-    date_availability = root.find(".//fr-date-availability")
-    if date_availability is not None:
-        data["last-fee-payement"] = date_availability.find(".//fr-last-fee-payement/date").text \
-            if date_availability.find(".//fr-last-fee-payement/date") is not None else "NA"
-        data["next-fee-payement"] = date_availability.find(".//fr-next-fee-payement/date").text \
-            if date_availability.find(".//fr-next-fee-payement/date") is not None else "NA"
-        data["date-search-completed"] = \
-            date_availability.find(".//fr-date-search-completed/date").text \
-            if date_availability.find(".//fr-date-search-completed/date") is not None else "NA"
-    # Convertir en DataFrame
-    df = pd.DataFrame([data])
-    return df
+    availability = found.get("availability")
+    if availability is not None:
+        for field in ["last-fee-payement", "next-fee-payement", "date-search-completed"]:
+            data[field] = availability.text(field)
+    return data
 
 
-def extract_all_brevets_info(dossier_xml):
+def extract_all_brevets_info(dossier_xml, max_entries=MAX_ENTRIES):
     """
     Extrait les informations de tous les fichiers XML d'un dossier.
     Args:
@@ -340,20 +555,15 @@ def extract_all_brevets_info(dossier_xml):
     Returns:
         pd.DataFrame: DataFrame avec les infos des fichiers XML.
     """
-    # Liste pour stocker les DataFrames de chaque fichier XML
-    all_brevets = []
+    # Liste des enregistrements de chaque fichier XML
+    all_records = []
     # Parcourir chaque fichier XML dans le dossier
     for fichier_xml in os.listdir(dossier_xml):
         if fichier_xml.endswith(".xml") and fichier_xml.lower() != "toc.xml":
             chemin_fichier_xml = os.path.join(dossier_xml, fichier_xml)
             try:
-                df_brevet = extract_brevet_info(chemin_fichier_xml)
-                all_brevets.append(df_brevet)
+                all_records.append(extract_brevet_record(chemin_fichier_xml, max_entries))
             except Exception as e:
-                print(f"Erreur lors du traitement du fichier {fichier_xml}: {e}")
-    # Concaténer tous les DataFrames en un seul
-    if all_brevets:
-        df_all_brevets = pd.concat(all_brevets, ignore_index=True)
-        return df_all_brevets
-    else:
-        return pd.DataFrame()
+                _log_error(logging.WARNING, "erreur_xml", chemin_fichier_xml, e)
+    # Construire le DataFrame en une seule fois
+    return build_brevets_dataframe(all_records, max_entries)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+from contextlib import closing
+
+from scripts.dataset import PARTITION_COLUMNS, write_brevets_dataset
+from scripts.importation import (
+    MAX_ENTRIES,
+    build_brevets_dataframe,
+    iter_zip_records_parallel,
+    iter_zip_records_s3,
+)
+from scripts.instrumentation import CountingFileSystem, stage
+
+MANIFEST_NAME = "_manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def archive_fingerprint(info):
+    """
+    Empreinte d'une archive à partir des métadonnées du système de fichiers
+    (ETag et LastModified sur S3, mtime en local) et de sa taille.
+    """
+    mtime = info.get("LastModified", info.get("mtime"))
+    return {
+        "etag": info.get("ETag"),
+        "size": info.get("size"),
+        "mtime": str(mtime) if mtime is not None else None,
+    }
+
+
+def archive_id(zip_s3_path):
+    """ Identifiant stable d'une archive source, préfixe de ses fragments parquet. """
+    return hashlib.sha1(zip_s3_path.encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(fs, manifest_path):
+    """ Charge le manifeste (chemin d'archive -> empreinte et fragments écrits). """
+    if not fs.exists(manifest_path):
+        return {}
+    with fs.open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(fs, manifest_path, manifest):
+    """ Écrit le manifeste dans un fichier temporaire puis le renomme. """
+    tmp_path = manifest_path + ".tmp"
+    with fs.open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    fs.mv(tmp_path, manifest_path)
+
+
+def list_archives_s3(fs, root_s3_path):
+    """
+    Liste en un seul parcours les ZIP de chaque dossier d'année avec leurs
+    métadonnées. Retourne une liste de (année, chemin, empreinte).
+    """
+    archives = []
+    year_dirs = sorted(p for p in fs.ls(root_s3_path) if fs.isdir(p))
+    for year_path in year_dirs:
+        year_name = year_path.rstrip("/").split("/")[-1]
+        infos = fs.find(year_path, detail=True)
+        for path in sorted(infos):
+            if path.lower().endswith(".zip"):
+                archives.append((year_name, path, archive_fingerprint(infos[path])))
+    return archives
+
+
+def process_incremental_s3(fs, root_s3_path, dataset_path, out_fs=None, manifest_path=None,
+                           n_workers=1, max_in_flight=None, max_entries=MAX_ENTRIES,
+                           partition_cols=PARTITION_COLUMNS, instrumentation=False):
+    """
+    Ingestion incrémentale : ne parse que les archives nouvelles ou modifiées
+    depuis le dernier passage et les ajoute au dataset partitionné
+    (un fragment par archive et par partition, relu avec dataset.load_brevets).
+    Le manifeste est mis à jour après chaque fragment : après une interruption,
+    un nouvel appel reprend sans refaire les archives déjà terminées.
+    Args:
+        fs: Système de fichiers des archives INPI (s3fs ou compatible fsspec).
+        root_s3_path (str): Dossier racine contenant un sous-dossier par année.
+        dataset_path (str): Dossier de sortie des fragments parquet.
+        out_fs: Système de fichiers de sortie (fs par défaut).
+        manifest_path (str): Chemin du manifeste (dataset_path/_manifest.json par défaut).
+        n_workers, max_in_flight, max_entries: Voir process_all_years_s3.
+        partition_cols (list): Voir dataset.write_brevets_dataset.
+        instrumentation (bool): Log structuré des étapes listing et ingestion,
+            voir process_all_years_s3.
+    Returns:
+        list: Chemins des archives (re)traitées lors de cet appel.
+    """
+    out_fs = out_fs or fs
+    if instrumentation:
+        fs = CountingFileSystem(fs)
+    manifest_path = manifest_path or f"{dataset_path.rstrip('/')}/{MANIFEST_NAME}"
+    out_fs.makedirs(dataset_path, exist_ok=True)
+    manifest = load_manifest(out_fs, manifest_path)
+
+    with stage("listing", instrumentation, fs, logger) as mesures:
+        archives = list_archives_s3(fs, root_s3_path)
+        mesures["archives"] = len(archives)
+    # Archives disparues de la source : on retire leurs fragments
+    current_paths = {path for _, path, _ in archives}
+    for path in [p for p in manifest if p not in current_paths]:
+        _remove_fragments(out_fs, manifest.pop(path)["files"])
+        save_manifest(out_fs, manifest_path, manifest)
+
+    todo = [(year_name, path, fingerprint) for year_name, path, fingerprint in archives
+            if manifest.get(path, {}).get("fingerprint") != fingerprint]
+    todo_paths = [path for _, path, _ in todo]
+    if n_workers > 1:
+        records_by_zip = iter_zip_records_parallel(fs, todo_paths, n_workers, max_in_flight, max_entries)
+    else:
+        records_by_zip = ((p, list(iter_zip_records_s3(fs, p, max_entries=max_entries)))
+                          for p in todo_paths)
+
+    # closing : les pools du mode parallèle sont arrêtés à la fin, y compris après une interruption
+    with closing(records_by_zip), \
+            stage("ingestion", instrumentation, fs, logger, n_workers=n_workers) as mesures:
+        n_records = 0
+        for (year_name, path, fingerprint), (_, records) in zip(todo, records_by_zip):
+            for record in records:
+                record["year"] = year_name
+            df = build_brevets_dataframe(records, max_entries, extra_columns=["year"])
+            files = write_fragment(out_fs, dataset_path, path, df, partition_cols)
+            # Fragments d'une version précédente de l'archive qui n'ont pas été réécrits
+            previous = manifest.get(path, {}).get("files", [])
+            _remove_fragments(out_fs, [f for f in previous if f not in files])
+            manifest[path] = {"fingerprint": fingerprint, "files": files, "n_brevets": len(df)}
+            save_manifest(out_fs, manifest_path, manifest)
+            n_records += len(df)
+        mesures.update(archives=len(todo), enregistrements=n_records)
+    return todo_paths
+
+
+def write_fragment(out_fs, dataset_path, zip_s3_path, df, partition_cols=PARTITION_COLUMNS):
+    """ Écrit les fragments parquet d'une archive et retourne la liste des fichiers écrits. """
+    if df.empty:
+        return []
+    return write_brevets_dataset(df, out_fs, dataset_path, partition_cols,
+                                 basename_template=archive_id(zip_s3_path) + "-{i}.parquet",
+                                 existing_data_behavior="overwrite_or_ignore")
+
+
+def _remove_fragments(out_fs, files):
+    for file_path in files:
+        if out_fs.exists(file_path):
+            out_fs.rm(file_path)
@@ -0,0 +1,214 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts.regressions import _compress, lag_matrix
+
+
+def default_block_length(n):
+    """ Longueur de bloc par défaut : n^(1/3) arrondi au supérieur. """
+    return max(1, int(np.ceil(n ** (1 / 3))))
+
+
+def block_bootstrap_indices(n, longueur, block_length, rng, size):
+    """
+    Index de rééchantillonnage du bootstrap par blocs mobiles : des blocs
+    de block_length observations consécutives tirés avec remise, mis bout
+    à bout puis tronqués à n observations.
+    Args:
+        n (np.ndarray): Nombre d'observations valides de chaque série (forme quelconque).
+        longueur (int): Longueur de l'axe du temps (n <= longueur).
+        block_length (int): Longueur des blocs.
+        rng (np.random.Generator): Générateur aléatoire.
+        size (int): Nombre de réplications.
+    Returns:
+        np.ndarray: (size, *n.shape, longueur) ; seules les n premières positions sont utilisées.
+    """
+    n = np.asarray(n)
+    t = np.arange(longueur)
+    n_blocs = -(-longueur // block_length)
+    debuts = np.floor(rng.random((size,) + n.shape + (n_blocs,))
+                      * np.maximum(n - block_length + 1, 1)[..., None]).astype(np.int64)
+    index = debuts[..., t // block_length] + t % block_length
+    return np.minimum(index, longueur - 1)
+
+
+def block_permutation_indices(n, longueur, block_length, rng, size):
+    """
+    Index de permutation par blocs : l'ordre des blocs complets de
+    block_length observations est tiré au hasard, les dernières
+    observations (bloc incomplet) restent en place. La dépendance
+    temporelle à l'intérieur des blocs est conservée.
+    Args:
+        Voir block_bootstrap_indices.
+    Returns:
+        np.ndarray: (size, *n.shape, longueur).
+    """
+    n = np.asarray(n)
+    t = np.arange(longueur)
+    n_blocs = -(-longueur // block_length)
+    cles = rng.random((size,) + n.shape + (n_blocs,))
+    # Les blocs incomplets ou vides reçoivent une clé maximale et gardent leur place
+    cles = np.where(np.arange(n_blocs) >= (n // block_length)[..., None], 2.0, cles)
+    ordre = np.argsort(cles, axis=-1, kind="stable")
+    return ordre[..., t // block_length] * block_length + t % block_length
+
+
+def batched_slopes(xs, ys, n, index_x, index_y):
+    """
+    Pentes MCO de toutes les réplications en une fois, en forme fermée sur
+    les séries rééchantillonnées.
+    Args:
+        xs, ys (np.ndarray): Séries compressées (..., longueur), observations
+            valides en tête.
+        n (np.ndarray): Nombre d'observations valides (...).
+        index_x, index_y (np.ndarray): Index (size, ..., longueur) ; index_y
+            None pour garder y dans son ordre.
+    Returns:
+        np.ndarray: (size, ...) pentes, NaN si n < 3.
+    """
+    longueur = xs.shape[-1]
+    # Une colonne de zéros en fin de chaque série reçoit les positions au-delà de n,
+    # puis un seul index plat par tableau évite les index de diffusion de take_along_axis
+    decalage = np.arange(n.size).reshape(n.shape)[..., None] * (longueur + 1)
+    hors_echantillon = np.arange(longueur) >= n[..., None]
+
+    def gather(series, index):
+        plat = np.concatenate([series, np.zeros(series.shape[:-1] + (1,))], axis=-1).ravel()
+        return plat[np.where(hors_echantillon, longueur, index) + decalage]
+
+    xr = gather(xs, index_x)
+    yr = np.broadcast_to(ys, xr.shape) if index_y is None else gather(ys, index_y)
+    sx, sy = xr.sum(axis=-1), yr.sum(axis=-1)
+    sxx = np.einsum("...t,...t->...", xr, xr)
+    sxy = np.einsum("...t,...t->...", xr, yr)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pentes = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    return np.where(n < 3, np.nan, pentes)
+
+
+def _chunk_slopes(args):
+    methode, xs, ys, n, block_length, graine, size = args
+    rng = np.random.default_rng(graine)
+    if methode == "bootstrap":
+        index = block_bootstrap_indices(n, xs.shape[-1], block_length, rng, size)
+        return batched_slopes(xs, ys, n, index, index)
+    index = block_permutation_indices(n, xs.shape[-1], block_length, rng, size)
+    return batched_slopes(xs, ys, n, index, None)
+
+
+def replicate_slopes(xs, ys, n, methode="bootstrap", n_replications=10000, block_length=None,
+                     seed=0, max_memory_mb=256, n_workers=1):
+    """
+    Pentes de n_replications échantillons bootstrap ou permutés, par paquets
+    de réplications pour borner la mémoire, un paquet par processus.
+    Args:
+        xs, ys (np.ndarray): Séries compressées (..., longueur).
+        n (np.ndarray): Nombre d'observations valides (...).
+        methode (str): "bootstrap" (blocs mobiles, paires (x, y) conservées)
+            ou "permutation" (blocs de x permutés, y fixe : loi sous H0 : β = 0).
+        block_length (int): Longueur des blocs, default_block_length(max(n)) par défaut.
+        seed (int): Graine ; chaque paquet reçoit une sous-graine, le résultat
+            ne dépend pas de n_workers.
+        max_memory_mb (int): Mémoire visée par paquet.
+        n_workers (int): Nombre de processus (1 = en série).
+    Returns:
+        np.ndarray: (n_replications, ...) pentes.
+    """
+    n = np.asarray(n)
+    block_length = block_length or default_block_length(int(n.max()))
+    # Quatre tableaux float64 de la taille des séries par réplication
+    par_replication = 4 * 8 * xs.size
+    taille_paquet = max(1, min(n_replications, int(max_memory_mb * 1e6 // par_replication)))
+    tailles = [min(taille_paquet, n_replications - debut)
+               for debut in range(0, n_replications, taille_paquet)]
+    graines = np.random.SeedSequence(seed).spawn(len(tailles))
+    taches = [(methode, xs, ys, n, block_length, graine, taille)
+              for graine, taille in zip(graines, tailles)]
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as pool:
+            paquets = list(pool.map(_chunk_slopes, taches))
+    else:
+        paquets = [_chunk_slopes(tache) for tache in taches]
+    return np.concatenate(paquets, axis=0)
+
+
+def lagged_samples(x, y, lags):
+    """
+    Échantillons (x_{t-lag}, y_t) de chaque retard et de chaque série,
+    compressés comme après un dropna.
+    Args:
+        x, y (np.ndarray): (T, S).
+        lags (list): Retards.
+    Returns:
+        np.ndarray: xs, ys de forme (len(lags), S, T) centrés par échantillon.
+        np.ndarray: n, observations valides (len(lags), S).
+    """
+    xl = lag_matrix(x, lags)
+    yl = np.broadcast_to(np.asarray(y, dtype="float64"), xl.shape)
+    mask = np.isfinite(xl) & np.isfinite(yl)
+    xs, ys = _compress(mask, xl, yl)
+    n = mask.sum(axis=1)
+    valides = np.arange(mask.shape[1])[:, None] < n[:, None, :]
+    # Centrage par échantillon pour la précision des sommes (les pentes n'en dépendent pas)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xs = np.where(valides, xs - (xs.sum(axis=1) / n)[:, None, :], 0.0)
+        ys = np.where(valides, ys - (ys.sum(axis=1) / n)[:, None, :], 0.0)
+    return np.moveaxis(xs, 1, -1), np.moveaxis(ys, 1, -1), n
+
+
+def inference_lags(data_complete, correspondances, lags, n_replications=10000, block_length=None,
+                   niveau=0.95, seed=0, max_memory_mb=256, n_workers=1):
+    """
+    Intervalles de confiance bootstrap par blocs mobiles et p-values de
+    permutation par blocs de la pente de chaque régression du tableau
+    df_tous_resultats (secteur x retard), sans hypothèse de normalité des résidus.
+    Args:
+        data_complete (pd.DataFrame): Colonnes croiss_log_brevets_<secteur>
+            et return_log_<portefeuille>.
+        correspondances (dict): Secteur -> portefeuille.
+        lags (list): Retards (en mois).
+        n_replications (int): Réplications bootstrap et permutations.
+        niveau (float): Niveau des intervalles (percentiles).
+        block_length, seed, max_memory_mb, n_workers: Voir replicate_slopes.
+    Returns:
+        pd.DataFrame: Secteur, Lag_mois, N_obs, Coefficient_β, Std_Error_bootstrap,
+            IC_bas, IC_haut, P-value_permutation (ordre de scan_lags).
+    """
+    secteurs = [s for s, pf in correspondances.items()
+                if f"croiss_log_brevets_{s}" in data_complete.columns
+                and f"return_log_{pf}" in data_complete.columns]
+    x = data_complete[[f"croiss_log_brevets_{s}" for s in secteurs]].to_numpy(dtype="float64")
+    y = data_complete[[f"return_log_{correspondances[s]}" for s in secteurs]].to_numpy(dtype="float64")
+    xs, ys, n = lagged_samples(x, y, lags)
+    identite = np.broadcast_to(np.arange(xs.shape[-1]), (1,) + xs.shape)
+    beta = batched_slopes(xs, ys, n, identite, identite)[0]
+
+    options = {"n_replications": n_replications, "block_length": block_length,
+               "max_memory_mb": max_memory_mb, "n_workers": n_workers}
+    bootstrap = replicate_slopes(xs, ys, n, "bootstrap", seed=seed, **options)
+    permutation = replicate_slopes(xs, ys, n, "permutation", seed=seed + 1, **options)
+
+    alpha = (1 - niveau) / 2
+    # Retard sans assez d'observations : toutes les réplications sont NaN, résultats NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        ic_bas, ic_haut = np.nanquantile(bootstrap, [alpha, 1 - alpha], axis=0)
+        ecart_type = np.nanstd(bootstrap, axis=0, ddof=1)
+    with np.errstate(invalid="ignore"):
+        extremes = (np.abs(permutation) >= np.abs(beta)).sum(axis=0)
+    p_value = (1 + extremes) / (1 + np.isfinite(permutation).sum(axis=0))
+    p_value[~np.isfinite(beta)] = np.nan
+
+    return pd.DataFrame({
+        "Secteur": np.repeat(secteurs, len(lags)),
+        "Lag_mois": np.tile(np.asarray(lags, dtype=np.int64), len(secteurs)),
+        "N_obs": n.T.ravel(),
+        "Coefficient_β": beta.T.ravel(),
+        "Std_Error_bootstrap": ecart_type.T.ravel(),
+        "IC_bas": ic_bas.T.ravel(),
+        "IC_haut": ic_haut.T.ravel(),
+        "P-value_permutation": p_value.T.ravel(),
+    })
@@ -0,0 +1,135 @@
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("scripts")
+
+
+class JsonFormatter(logging.Formatter):
+    """ Une ligne JSON par message : horodatage, niveau, logger, message et champs structurés. """
+
+    def format(self, record):
+        ligne = {"horodatage": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), "niveau": record.levelname,
+                 "logger": record.name, "message": record.getMessage()}
+        ligne.update(getattr(record, "champs", {}))
+        if record.exc_info:
+            ligne["exception"] = self.formatException(record.exc_info)
+        return json.dumps(ligne, ensure_ascii=False, default=str)
+
+
+def configure_logging(niveau=logging.INFO, json_format=True, flux=None):
+    """
+    Affiche les messages des modules scripts.* (avertissements de parsing,
+    mesures des étapes) sur flux (stderr par défaut), en JSON ou en texte.
+    Returns:
+        logging.Handler: Handler ajouté (à retirer avec logger.removeHandler).
+    """
+    handler = logging.StreamHandler(flux or sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else
+                         logging.Formatter("%(asctime)s %(levelname)s %(name)s : %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(niveau)
+    return handler
+
+
+class CountingFile:
+    """ Fichier ouvert dont les octets lus sont ajoutés au compteur du système de fichiers. """
+
+    def __init__(self, f, compteur):
+        self._f = f
+        self._compteur = compteur
+
+    def read(self, *args):
+        donnees = self._f.read(*args)
+        self._compteur.ajouter(len(donnees))
+        return donnees
+
+    def readinto(self, tampon):
+        n = self._f.readinto(tampon)
+        self._compteur.ajouter(n or 0)
+        return n
+
+    def __getattr__(self, nom):
+        return getattr(self._f, nom)
+
+    def __iter__(self):
+        return iter(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+class CountingFileSystem:
+    """
+    Enveloppe d'un système de fichiers fsspec (s3fs...) qui compte les
+    octets lus par open(), y compris depuis plusieurs threads ; les autres
+    méthodes (ls, isdir, find...) sont celles du système enveloppé.
+    """
+
+    def __init__(self, fs):
+        self.fs = fs
+        self.octets_lus = 0
+        self._verrou = threading.Lock()
+
+    def ajouter(self, n):
+        with self._verrou:
+            self.octets_lus += n
+
+    def open(self, path, mode="rb", **kwargs):
+        f = self.fs.open(path, mode, **kwargs)
+        return CountingFile(f, self) if "r" in mode else f
+
+    def __getattr__(self, nom):
+        return getattr(self.fs, nom)
+
+
+def peak_memory_mb():
+    """ Pic de mémoire résidente (Mo) du processus et de ses processus fils terminés, None hors Unix. """
+    if resource is None:
+        return None
+    pic = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss est en octets sous macOS, en kilo-octets sous Linux
+    return pic / 1024 / 1024 if sys.platform == "darwin" else pic / 1024
+
+
+@contextmanager
+def stage(nom, actif=True, fs=None, log=logger, **champs):
+    """
+    Mesure une étape et l'émet en log structuré (champs : etape, duree_s,
+    enregistrements, enregistrements_par_s, memoire_max_mo, octets_lus).
+    Le bloc renseigne les compteurs dans le dictionnaire produit, ex.
+    mesures["enregistrements"] = len(records). Sans effet si actif=False.
+    Args:
+        nom (str): Nom de l'étape.
+        actif (bool): Active la mesure.
+        fs: CountingFileSystem dont les octets lus pendant l'étape sont reportés.
+        log (logging.Logger): Logger de destination.
+        **champs: Champs ajoutés au message (ex. chemin de l'archive).
+    """
+    mesures = {}
+    if not actif:
+        yield mesures
+        return
+    octets = fs.octets_lus if isinstance(fs, CountingFileSystem) else None
+    debut = time.perf_counter()
+    yield mesures
+    duree = time.perf_counter() - debut
+    champs = {"etape": nom, **champs, "duree_s": round(duree, 6), **mesures}
+    if "enregistrements" in mesures and duree > 0:
+        champs["enregistrements_par_s"] = mesures["enregistrements"] / duree
+    champs["memoire_max_mo"] = peak_memory_mb()
+    if octets is not None:
+        champs["octets_lus"] = fs.octets_lus - octets
+    log.info("Étape %s : %.3f s", nom, duree, extra={"champs": champs})
@@ -0,0 +1,138 @@
+import logging
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from statsmodels.stats.diagnostic import acorr_ljungbox, het_white
+from statsmodels.tsa.arima.model import ARIMA
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_orders(max_p=5, max_q=5, max_arma=3):
+    """ Grille du notebook : AR(1..max_p), MA(1..max_q), puis ARMA(p, q) pour p, q <= max_arma. """
+    candidats = [("AR", p, 0) for p in range(1, max_p + 1)]
+    candidats += [("MA", 0, q) for q in range(1, max_q + 1)]
+    candidats += [("ARMA", p, q) for p in range(1, max_arma + 1) for q in range(1, max_arma + 1)]
+    return candidats
+
+
+def model_name(p, q):
+    """ Nom affiché d'un modèle : AR(p), MA(q) ou ARMA(p,q). """
+    if q == 0:
+        return f"AR({p})"
+    if p == 0:
+        return f"MA({q})"
+    return f"ARMA({p},{q})"
+
+
+def _warm_start(fitted, p, q):
+    """
+    Paramètres initiaux [const, ar, ma, sigma2] d'un ARMA(p, q) complétés
+    de zéros depuis le plus grand modèle déjà estimé qu'il contient.
+    """
+    parents = [(pp, qq) for pp, qq in fitted if pp <= p and qq <= q]
+    if not parents:
+        return None
+    pp, qq = max(parents, key=lambda order: order[0] + order[1])
+    params = fitted[pp, qq]
+    return np.concatenate([params[:1], params[1:1 + pp], np.zeros(p - pp),
+                           params[1 + pp:1 + pp + qq], np.zeros(q - qq), params[-1:]])
+
+
+def _diagnostics(residus, lb_lags):
+    """ p-values de Ljung-Box (retard lb_lags) et de White sur les résidus. """
+    lb_pvalue = acorr_ljungbox(residus, lags=[lb_lags], return_df=True)["lb_pvalue"].values[0]
+    try:
+        residus = residus.dropna()
+        white_pvalue = het_white(residus, sm.add_constant(np.arange(len(residus))))[1]
+    except Exception:
+        white_pvalue = np.nan
+    return lb_pvalue, white_pvalue
+
+
+def fit_arma_grid(serie, candidats=None, warm_start=True, diagnostics="best", lb_lags=10):
+    """
+    Estime chaque ARMA candidat sur une série et garde le meilleur selon le BIC.
+    Les ordres sont estimés du plus petit au plus grand, chaque modèle
+    partant des paramètres du plus grand modèle déjà estimé qu'il contient.
+    Seuls les critères sont conservés pour les modèles non retenus.
+    Args:
+        serie (pd.Series): Rendements.
+        candidats (list): (type, p, q), candidate_orders() par défaut.
+        warm_start (bool): Initialisation depuis les modèles plus petits.
+        diagnostics (str): "best" pour les tests de Ljung-Box et de White sur
+            le seul modèle retenu, "all" pour tous les modèles (comme le notebook).
+        lb_lags (int): Retard du test de Ljung-Box.
+    Returns:
+        pd.DataFrame: Modèle, p, q, AIC, BIC, HQIC, LB_pvalue, White_pvalue (ordre des candidats).
+        Résultats statsmodels du modèle retenu.
+    """
+    candidats = candidats or candidate_orders()
+    fitted = {}
+    resultats = {}
+    meilleur, meilleur_bic = None, np.inf
+    for nom_type, p, q in sorted(candidats, key=lambda c: (c[1] + c[2], c[1])):
+        start_params = _warm_start(fitted, p, q) if warm_start else None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                model = ARIMA(serie, order=(p, 0, q)).fit(start_params=start_params)
+        except Exception as e:
+            logger.warning("Erreur avec modèle (%s,%s) : %s", p, q, e,
+                           extra={"champs": {"evenement": "erreur_estimation", "p": p, "q": q,
+                                             "erreur": str(e)}})
+            continue
+        fitted[p, q] = np.asarray(model.params)
+        ligne = {"Modèle": model_name(p, q), "p": p, "q": q, "AIC": model.aic,
+                 "BIC": model.bic, "HQIC": model.hqic, "LB_pvalue": np.nan, "White_pvalue": np.nan}
+        if diagnostics == "all":
+            ligne["LB_pvalue"], ligne["White_pvalue"] = _diagnostics(model.resid, lb_lags)
+        resultats[nom_type, p, q] = ligne
+        if model.bic < meilleur_bic:
+            meilleur, meilleur_bic = model, model.bic
+
+    df_resultats = pd.DataFrame([resultats[c] for c in candidats if c in resultats])
+    if meilleur is not None and diagnostics == "best":
+        best = df_resultats["BIC"].idxmin()
+        df_resultats.loc[best, ["LB_pvalue", "White_pvalue"]] = _diagnostics(meilleur.resid, lb_lags)
+    return df_resultats, meilleur
+
+
+def _fit_sector(args):
+    secteur, serie, kwargs = args
+    df_resultats, meilleur = fit_arma_grid(serie, **kwargs)
+    return secteur, df_resultats, meilleur
+
+
+def select_arma_orders(series, candidats=None, n_workers=1, warm_start=True,
+                       diagnostics="best", lb_lags=10):
+    """
+    Sélection ARMA par BIC pour plusieurs secteurs, un secteur par processus.
+    Args:
+        series (dict): Secteur -> série des rendements.
+        n_workers (int): Nombre de processus (1 = en série).
+        candidats, warm_start, diagnostics, lb_lags: Voir fit_arma_grid.
+    Returns:
+        pd.DataFrame: Critères de tous les modèles, avec une colonne Secteur.
+        dict: Secteur -> {"modele": résultats statsmodels, "nom", "p", "q"} du modèle retenu.
+    """
+    kwargs = {"candidats": candidats, "warm_start": warm_start,
+              "diagnostics": diagnostics, "lb_lags": lb_lags}
+    taches = [(secteur, serie, kwargs) for secteur, serie in series.items()]
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as pool:
+            sorties = list(pool.map(_fit_sector, taches))
+    else:
+        sorties = [_fit_sector(tache) for tache in taches]
+
+    tables, optimaux = [], {}
+    for secteur, df_resultats, meilleur in sorties:
+        tables.append(df_resultats.assign(Secteur=secteur))
+        if meilleur is not None:
+            p, q = meilleur.model.order[0], meilleur.model.order[2]
+            optimaux[secteur] = {"modele": meilleur, "nom": model_name(p, q), "p": p, "q": q}
+    df_resultats = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+    return df_resultats, optimaux
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from scripts.regressions import lag_matrix
+
+
+def build_panel(data_complete, correspondances, lags=(0,), date_col="Date"):
+    """
+    Panel secteur x mois (format long) depuis le tableau large data_complete :
+    rendement du portefeuille et croissance des brevets retardée de chaque lag.
+    Args:
+        data_complete (pd.DataFrame): Une ligne par mois, colonnes
+            croiss_log_brevets_<secteur> et return_log_<portefeuille>.
+        correspondances (dict): Secteur -> portefeuille.
+        lags (list): Retards distribués (en mois), décalés dans chaque secteur.
+        date_col (str): Colonne des dates.
+    Returns:
+        pd.DataFrame: Secteur, Date, rendement, croissance_lag<k> pour chaque lag,
+            trié par secteur puis par date.
+    """
+    secteurs = [s for s, pf in correspondances.items()
+                if f"croiss_log_brevets_{s}" in data_complete.columns
+                and f"return_log_{pf}" in data_complete.columns]
+    data_complete = data_complete.sort_values(date_col)
+    x = data_complete[[f"croiss_log_brevets_{s}" for s in secteurs]].to_numpy(dtype="float64")
+    y = data_complete[[f"return_log_{correspondances[s]}" for s in secteurs]].to_numpy(dtype="float64")
+    retards = lag_matrix(x, lags)
+
+    n_dates = len(data_complete)
+    panel = pd.DataFrame({
+        "Secteur": np.repeat(secteurs, n_dates),
+        date_col: np.tile(data_complete[date_col].to_numpy(), len(secteurs)),
+        "rendement": y.T.ravel(),
+    })
+    for i, lag in enumerate(lags):
+        panel[f"croissance_lag{lag}"] = retards[i].T.ravel()
+    return panel
+
+
+def demean(values, groupes, tol=1e-10, max_iter=1000):
+    """
+    Transformation within : retire les effets fixes de chaque groupe par
+    projections alternées (moyennes de groupe par np.bincount), sans matrice
+    d'indicatrices. Exact en une passe pour un seul effet ou un panel cylindré.
+    Args:
+        values (np.ndarray): (N,) ou (N, K).
+        groupes (list): Codes entiers (N,) de chaque effet fixe (pd.factorize).
+        tol (float): Arrêt quand toutes les moyennes de groupe sont inférieures
+            à tol fois l'écart-type initial.
+        max_iter (int): Nombre maximal de passes.
+    Returns:
+        np.ndarray: Valeurs transformées, de même forme que values.
+    """
+    values = np.array(values, dtype="float64")
+    colonne = values.ndim == 1
+    if colonne:
+        values = values[:, None]
+    comptes = [np.bincount(codes) for codes in groupes]
+    seuil = tol * max(values.std(axis=0).max(), 1.0)
+    for _ in range(max_iter):
+        ecart = 0.0
+        for codes, n in zip(groupes, comptes):
+            for k in range(values.shape[1]):
+                moyennes = np.bincount(codes, weights=values[:, k], minlength=len(n)) / n
+                values[:, k] -= moyennes[codes]
+                ecart = max(ecart, np.abs(moyennes).max())
+        if len(groupes) < 2 or ecart < seuil:
+            break
+    return values[:, 0] if colonne else values
+
+
+def _cluster_meat(scores, codes):
+    """ Somme des produits extérieurs des scores agrégés par groupe. """
+    sommes = np.column_stack([np.bincount(codes, weights=scores[:, k]) for k in range(scores.shape[1])])
+    return sommes.T @ sommes, len(sommes)
+
+
+def _driscoll_kraay_meat(scores, codes_temps, bandwidth):
+    """ Newey-West (noyau de Bartlett) sur les scores sommés par période. """
+    h = np.column_stack([np.bincount(codes_temps, weights=scores[:, k]) for k in range(scores.shape[1])])
+    meat = h.T @ h
+    for lag in range(1, bandwidth + 1):
+        gamma = h[lag:].T @ h[:-lag]
+        meat += (1 - lag / (bandwidth + 1)) * (gamma + gamma.T)
+    return meat
+
+
+def panel_ols(panel, y, x, entity="Secteur", time="Date", entity_effects=True, time_effects=True,
+              cov_type="clustered", cluster="entity", bandwidth=None, tol=1e-10, seuil=0.05):
+    """
+    Régression en panel à effets fixes secteur et/ou mois (transformation
+    within par projections alternées), écarts-types robustes.
+    Les résultats sont ceux d'un MCO avec indicatrices de statsmodels
+    (mêmes coefficients, mêmes degrés de liberté, mêmes corrections).
+    Args:
+        panel (pd.DataFrame): Format long (build_panel).
+        y (str): Variable expliquée.
+        x (list): Régresseurs (ex. croissance_lag0, croissance_lag1, ...).
+        entity, time (str): Colonnes des secteurs et des dates.
+        entity_effects, time_effects (bool): Effets fixes secteur / mois.
+        cov_type (str): "unadjusted", "clustered" ou "driscoll-kraay".
+        cluster (str): "entity" ou "time" pour cov_type="clustered".
+        bandwidth (int): Retards de Driscoll-Kraay, floor(4 (T/100)^(2/9)) par défaut.
+        tol (float): Tolérance des projections alternées.
+        seuil (float): Seuil de significativité.
+    Returns:
+        pd.DataFrame: Variable, Coefficient_β, Std_Error, t, P-value, Significatif.
+        dict: n_obs, n_entites, n_periodes, ddl_residus, r2_within, cov_type.
+    """
+    x = list(x)
+    donnees = panel[[entity, time, y] + x].dropna()
+    codes_entite, entites = pd.factorize(donnees[entity])
+    codes_temps, periodes = pd.factorize(donnees[time], sort=True)
+
+    groupes, n_absorbes = [], 0
+    if entity_effects:
+        groupes.append(codes_entite)
+        n_absorbes += len(entites)
+    if time_effects:
+        groupes.append(codes_temps)
+        n_absorbes += len(periodes) - (1 if entity_effects else 0)
+    if not groupes:
+        # Constante seule : centrage global
+        groupes.append(np.zeros(len(donnees), dtype=np.int64))
+        n_absorbes = 1
+
+    valeurs = demean(donnees[[y] + x].to_numpy(dtype="float64"), groupes, tol)
+    yd, xd = valeurs[:, 0], valeurs[:, 1:]
+    n_obs, n_params = xd.shape[0], xd.shape[1] + n_absorbes
+    ddl = n_obs - n_params
+
+    bread = np.linalg.inv(xd.T @ xd)
+    beta = bread @ (xd.T @ yd)
+    residus = yd - xd @ beta
+    scores = xd * residus[:, None]
+
+    if cov_type == "unadjusted":
+        covariance = bread * (residus @ residus) / ddl
+    elif cov_type == "clustered":
+        codes = codes_entite if cluster == "entity" else codes_temps
+        meat, n_groupes = _cluster_meat(scores, codes)
+        correction = n_groupes / (n_groupes - 1) * (n_obs - 1) / ddl
+        covariance = correction * bread @ meat @ bread
+    elif cov_type == "driscoll-kraay":
+        if bandwidth is None:
+            bandwidth = int(np.floor(4 * (len(periodes) / 100) ** (2 / 9)))
+        meat = _driscoll_kraay_meat(scores, codes_temps, bandwidth)
+        correction = len(periodes) / (len(periodes) - 1) * (n_obs - 1) / ddl
+        covariance = correction * bread @ meat @ bread
+    else:
+        raise ValueError(f"cov_type inconnu : {cov_type}")
+
+    std_error = np.sqrt(np.diag(covariance))
+    t_stat = beta / std_error
+    if cov_type == "unadjusted":
+        p_value = 2 * stats.t.sf(np.abs(t_stat), ddl)
+    else:
+        p_value = 2 * stats.norm.sf(np.abs(t_stat))
+
+    coefficients = pd.DataFrame({"Variable": x, "Coefficient_β": beta, "Std_Error": std_error,
+                                 "t": t_stat, "P-value": p_value})
+    coefficients["Significatif"] = np.where(coefficients["P-value"] < seuil, "Oui", "Non")
+    infos = {"n_obs": n_obs, "n_entites": len(entites), "n_periodes": len(periodes),
+             "ddl_residus": ddl, "r2_within": 1 - residus @ residus / (yd @ yd), "cov_type": cov_type}
+    return coefficients, infos
@@ -0,0 +1,150 @@
+# Secteurs étudiés et codes CIB associés (sous-classes ou classes)
+SECTEURS = {
+    "auto": ["B62D", "B60B", "B60C", "B60D", "B60G", "B60H", "B60J", "B60K",
+             "B60M", "B60N", "B60P", "B60Q", "B60R", "B60S", "B60T", "F02B",
+             "F02D", "F02M", "F02N", "F02P", "F01N", "F01M", "F01P", "F16H",
+             "B60L", "B60W", "H02K", "H02P", "H02M", "H02J"],
+    "space_weapon": ["B63G", "B64G", "C06", "F41", "F42", "F02K", "F01D"],
+    "pharma": ["A61K", "A61B", "A61C", "A61D", "A61F", "A61G", "A61H", "A61J",
+               "A61L", "A61M", "A61N", "H05G"],
+    "mode": ["A41B", "A41C", "A41D", "A41F", "A42B", "A43B", "A43C", "A43D",
+             "A44B", "A45C"],
+    "cosmetic": ["A61K", "A61Q", "A45D", "C11B"],
+    "telecom": ["H04L", "H04W", "H04Q", "H04M", "H04J", "H04B", "H01Q", "H01P"],
+    "agro": ["A01", "A23", "A23L", "C12", "B65"],
+    "bat": ["E04", "E06B", "E05", "E02D", "E01", "F24", "E03", "F16L", "G05B"]
+}
+
+# Portefeuilles d'entreprises cotées sur Euronext Paris associés à chaque secteur
+PORTEFEUILLES = {
+    "portefeuille_auto": ["RNO", "ML", "FR", "FRVIA", "OPM", "AKW"],
+    "portefeuille_pharma": ["SAN", "IPN", "DIM", "BIM", "EAPI", "VIRP", "GBT", "VETO"],
+    "portefeuille_space_weapon": ["HO", "SAF", "AM", "ETL", "EXA"],
+    "portefeuille_mode": ["MC", "RMS", "KER", "CDI", "SMCP"],
+    "portefeuille_cosmetic": ["OR", "ITP", "RBT"],
+    "portefeuille_telecom": ["ORA", "EN", "OVH", "WLN", "TEP"],
+    "portefeuille_agro": ["BN", "RI", "RCO", "SAVE", "BON", "VRLA", "ALGIL"],
+    "portefeuille_bat": ["DG", "FGR", "SGO", "SU", "LR", "SPIE", "NEX"]
+}
+
+PONDERATIONS_SPECIALES = {
+    "portefeuille_mode": {"MC": 0.485}  # LVMH dans le portefeuille mode
+}
+
+# Secteur de brevets -> portefeuille associé
+CORRESPONDANCES = {
+    "auto": "portefeuille_auto",
+    "pharma": "portefeuille_pharma",
+    "space_weapon": "portefeuille_space_weapon",
+    "mode": "portefeuille_mode",
+    "cosmetic": "portefeuille_cosmetic",
+    "telecom": "portefeuille_telecom",
+    "agro": "portefeuille_agro",
+    "bat": "portefeuille_bat"
+}
+
+# Retards (en mois) testés entre la croissance des brevets et les rendements
+LAGS_A_TESTER = [0, 1, 2, 3, 6, 9, 12, 18, 24]
+
+# Enregistrements erronés à supprimer : doublon de doc-number 3050837 (même date
+# de publication), dont le nom du déposant contient le résidu " None" du parsing
+DOUBLONS_ECARTES = [
+    {"doc-number": "3050837", "applicant_1_orgname": "BOARDING RING READING SAS None"},
+]
+
+# Variantes de noms de déposants -> nom de l'entreprise (filiales fusionnées)
+ORG_FUSIONS = {
+    # PSA
+    "PEUGEOT CITROEN AUTOMOBILES SA": "PSA AUTOMOBILES",
+    "PSA AUTOMOBILES SA": "PSA AUTOMOBILES",
+
+    # RENAULT
+    "RENAULT S.A.S": "RENAULT",
+    "RENAULT S.A.S.": "RENAULT",
+
+    # SAFRAN
+    "SAFRAN": "SAFRAN",
+    "SAFRAN AIRCRAFT ENGINES": "SAFRAN",
+    "SAFRAN ELECTRONICS & DEFENSE": "SAFRAN",
+    "SNECMA": "SAFRAN",
+
+    # VALEO
+    "VALEO SYSTEMES THERMIQUES": "VALEO",
+    "VALEO VISION": "VALEO",
+    "VALEO EMBRAYAGES": "VALEO",
+    "VALEO EQUIPEMENTS ELECTRIQUES MOTEUR": "VALEO",
+    "VALEO SYSTEMES D'ESSUYAGE": "VALEO",
+
+    # MICHELIN
+    "COMPAGNIE GENERALE DES ETABLISSEMENTS MICHELIN": "MICHELIN",
+    "MICHELIN RECHERCHE ET TECHNIQUE S.A.": "MICHELIN",
+
+    # CONTINENTAL
+    "CONTINENTAL AUTOMOTIVE GMBH": "CONTINENTAL",
+    "CONTINENTAL AUTOMOTIVE FRANCE": "CONTINENTAL",
+
+    # AIRBUS
+    "AIRBUS OPERATIONS": "AIRBUS",
+
+    # SAINT-GOBAIN
+    "SAINT-GOBAIN GLASS FRANCE": "SAINT-GOBAIN",
+
+    # ALSTOM
+    "ALSTOM TRANSPORT TECHNOLOGIES": "ALSTOM",
+
+    # FAURECIA
+    "FAURECIA INTERIEUR INDUSTRIE": "FAURECIA",
+
+    # STMICROELECTRONICS
+    "STMICROELECTRONICS (ROUSSET) SAS": "STMICROELECTRONICS"
+}
+
+# Ticker -> noms de l'entreprise cotée et de ses principales filiales déposantes
+ENTREPRISES = {
+    "RNO": ["RENAULT"],
+    "ML": ["MICHELIN", "MANUFACTURE FRANCAISE DES PNEUMATIQUES MICHELIN"],
+    "FR": ["VALEO"],
+    "FRVIA": ["FORVIA", "FAURECIA"],
+    "OPM": ["OPMOBILITY", "PLASTIC OMNIUM"],
+    "AKW": ["AKWEL"],
+    "SAN": ["SANOFI", "SANOFI AVENTIS", "SANOFI PASTEUR"],
+    "IPN": ["IPSEN"],
+    "DIM": ["SARTORIUS STEDIM"],
+    "BIM": ["BIOMERIEUX"],
+    "EAPI": ["EUROAPI"],
+    "VIRP": ["VIRBAC"],
+    "GBT": ["GUERBET"],
+    "VETO": ["VETOQUINOL"],
+    "HO": ["THALES"],
+    "SAF": ["SAFRAN", "SNECMA", "TURBOMECA", "MESSIER BUGATTI DOWTY", "SAGEM"],
+    "AM": ["DASSAULT AVIATION"],
+    "ETL": ["EUTELSAT"],
+    "EXA": ["EXAIL", "IXBLUE"],
+    "MC": ["LVMH", "LOUIS VUITTON", "PARFUMS CHRISTIAN DIOR", "GUERLAIN"],
+    "RMS": ["HERMES"],
+    "KER": ["KERING"],
+    "CDI": ["CHRISTIAN DIOR"],
+    "SMCP": ["SMCP"],
+    "OR": ["L'OREAL"],
+    "ITP": ["INTERPARFUMS"],
+    "RBT": ["ROBERTET"],
+    "ORA": ["ORANGE", "FRANCE TELECOM"],
+    "EN": ["BOUYGUES"],
+    "OVH": ["OVH"],
+    "WLN": ["WORLDLINE"],
+    "TEP": ["TELEPERFORMANCE"],
+    "BN": ["DANONE", "GERVAIS DANONE"],
+    "RI": ["PERNOD RICARD"],
+    "RCO": ["REMY COINTREAU"],
+    "SAVE": ["SAVENCIA"],
+    "BON": ["BONDUELLE"],
+    "VRLA": ["VERALLIA"],
+    "ALGIL": ["GROUPE GUILLIN"],
+    "DG": ["VINCI"],
+    "FGR": ["EIFFAGE"],
+    "SGO": ["SAINT-GOBAIN"],
+    "SU": ["SCHNEIDER ELECTRIC"],
+    "LR": ["LEGRAND"],
+    "SPIE": ["SPIE"],
+    "NEX": ["NEXANS"]
+}
@@ -0,0 +1,341 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import fsspec
+import pandas as pd
+
+from scripts.cib import build_base_finale, parse_ipc, sector_monthly_counts
+from scripts.cleaning import clean_brevets
+from scripts.dataset import ANALYSIS_COLUMNS, load_brevets
+from scripts.incremental import archive_fingerprint, load_manifest, save_manifest
+from scripts.modeles import select_arma_orders
+from scripts.parametres import (CORRESPONDANCES, DOUBLONS_ECARTES, LAGS_A_TESTER, ORG_FUSIONS,
+                                PONDERATIONS_SPECIALES, PORTEFEUILLES, SECTEURS)
+from scripts.portefeuilles import build_weight_matrix, portfolio_returns
+from scripts.prix import DEFAULT_CACHE_PATH as PRIX_CACHE_PATH
+from scripts.prix import fixture_provider, load_prices, monthly_close, yfinance_provider
+from scripts.regressions import scan_lags, select_optimal_lags
+
+DEFAULT_CACHE_PATH = "cache/pipeline"
+MANIFEST_NAME = "_manifest.json"
+
+logger = logging.getLogger(__name__)
+
+# Paramètres de l'analyse ; chaque étape n'est invalidée que par ceux qu'elle déclare
+PARAMETRES = {
+    "dataset_path": "mvallat/diffusion/data_brevets",
+    "colonnes": ANALYSIS_COLUMNS,
+    "kinds_exclus": ["B1", "A3"],
+    "date_min": "2017-01-01",
+    "dedoublonnage": ["invention-title", "abstract"],
+    "doublons_ecartes": DOUBLONS_ECARTES,
+    "org_fusions": ORG_FUSIONS,
+    "secteurs": SECTEURS,
+    "portefeuilles": PORTEFEUILLES,
+    "ponderations_speciales": PONDERATIONS_SPECIALES,
+    "correspondances": CORRESPONDANCES,
+    "lags_a_tester": LAGS_A_TESTER,
+    "hac_maxlags": None,
+    "seuil": 0.05,
+    "candidats_arma": None,
+}
+
+
+def _brevets_bruts(entrees, parametres, contexte):
+    return load_brevets(contexte["fs"], parametres["dataset_path"], columns=parametres["colonnes"])
+
+
+def _source_fingerprint(parametres, contexte):
+    """ Empreinte des fichiers du dataset source (taille, ETag ou date de modification). """
+    infos = contexte["fs"].find(parametres["dataset_path"], detail=True)
+    return {chemin: archive_fingerprint(info) for chemin, info in sorted(infos.items())}
+
+
+def _brevets_propres(entrees, parametres, contexte):
+    return clean_brevets(entrees["brevets_bruts"], parametres["kinds_exclus"], parametres["date_min"],
+                         parametres["dedoublonnage"], parametres["org_fusions"],
+                         parametres["doublons_ecartes"])
+
+
+def _brevets_secteurs(entrees, parametres, contexte):
+    brevets_cib = parse_ipc(entrees["brevets_propres"])
+    return build_base_finale(sector_monthly_counts(brevets_cib, parametres["secteurs"]))
+
+
+def _periode(entrees, parametres, contexte):
+    # Fin exclue : premier jour du dernier mois de publication (date_fin_brevets du notebook)
+    fin = entrees["brevets_propres"]["publication_date"].max().to_period("M").start_time
+    return pd.DataFrame({"debut": [pd.Timestamp(parametres["date_min"])], "fin": [fin]})
+
+
+def _prix(entrees, parametres, contexte):
+    tickers = [t for membres in parametres["portefeuilles"].values() for t in membres]
+    periode = entrees["periode"].iloc[0]
+    return load_prices(tickers, periode["debut"], periode["fin"], provider=contexte["provider"],
+                       cache_path=contexte["prix_cache_path"])
+
+
+def _rendements(entrees, parametres, contexte):
+    poids = build_weight_matrix(parametres["portefeuilles"], parametres["ponderations_speciales"])
+    rendements = portfolio_returns(monthly_close(entrees["prix"]), poids)
+    rendements["Date"] = pd.to_datetime(rendements["Date"]) + pd.offsets.MonthEnd(0)
+    return rendements
+
+
+def _donnees_completes(entrees, parametres, contexte):
+    base = entrees["brevets_secteurs"].rename(columns={"date": "Date"})
+    base["Date"] = pd.to_datetime(base["Date"]) + pd.offsets.MonthEnd(0)
+    return base.merge(entrees["rendements"], on="Date", how="inner")
+
+
+def _scan_lags(entrees, parametres, contexte):
+    return scan_lags(entrees["donnees_completes"], parametres["correspondances"],
+                     parametres["lags_a_tester"], parametres["hac_maxlags"], parametres["seuil"])
+
+
+def _lags_optimaux(entrees, parametres, contexte):
+    return select_optimal_lags(entrees["scan_lags"], parametres["seuil"]).reset_index(drop=True)
+
+
+def _selection_arma(entrees, parametres, contexte):
+    # Rendements de chaque secteur sur la période de sa régression au lag optimal (étape 6 du notebook)
+    data_complete = entrees["donnees_completes"]
+    series = {}
+    for _, ligne in entrees["lags_optimaux"].iterrows():
+        secteur = ligne["Secteur"]
+        col_y = f"return_log_{parametres['correspondances'][secteur]}"
+        df_secteur = data_complete[[col_y]].assign(
+            x=data_complete[f"croiss_log_brevets_{secteur}"].shift(int(ligne["Lag_mois"]))).dropna()
+        series[secteur] = df_secteur[col_y].reset_index(drop=True)
+    candidats = parametres["candidats_arma"]
+    df_resultats, optimaux = select_arma_orders(
+        series, [tuple(c) for c in candidats] if candidats else None, n_workers=contexte["n_processus"])
+    retenus = df_resultats["Secteur"].map({s: info["nom"] for s, info in optimaux.items()})
+    df_resultats["Retenu"] = df_resultats["Modèle"] == retenus
+    return df_resultats
+
+
+def _prix_complets(df):
+    # Cours partiels (téléchargement échoué, ticker sans cours) : à redemander au prochain lancement
+    return not df.attrs.get("tickers_manquants")
+
+
+# Étapes dans l'ordre du notebook : entrées (étapes amont), paramètres déclarés,
+# fonction (entrees, parametres, contexte) -> DataFrame, empreinte des données externes,
+# conserver (DataFrame -> bool) : la sortie n'est mise en cache que si elle est complète
+ETAPES = {
+    "brevets_bruts": {"entrees": [], "parametres": ["dataset_path", "colonnes"],
+                      "fonction": _brevets_bruts, "empreinte": _source_fingerprint},
+    "brevets_propres": {"entrees": ["brevets_bruts"],
+                        "parametres": ["kinds_exclus", "date_min", "dedoublonnage", "org_fusions",
+                                       "doublons_ecartes"],
+                        "fonction": _brevets_propres},
+    "brevets_secteurs": {"entrees": ["brevets_propres"], "parametres": ["secteurs"],
+                         "fonction": _brevets_secteurs},
+    "periode": {"entrees": ["brevets_propres"], "parametres": ["date_min"], "fonction": _periode},
+    "prix": {"entrees": ["periode"], "parametres": ["portefeuilles"], "fonction": _prix,
+             "conserver": _prix_complets},
+    "rendements": {"entrees": ["prix"], "parametres": ["portefeuilles", "ponderations_speciales"],
+                   "fonction": _rendements},
+    "donnees_completes": {"entrees": ["brevets_secteurs", "rendements"], "parametres": [],
+                          "fonction": _donnees_completes},
+    "scan_lags": {"entrees": ["donnees_completes"],
+                  "parametres": ["correspondances", "lags_a_tester", "hac_maxlags", "seuil"],
+                  "fonction": _scan_lags},
+    "lags_optimaux": {"entrees": ["scan_lags"], "parametres": ["seuil"], "fonction": _lags_optimaux},
+    "selection_arma": {"entrees": ["donnees_completes", "lags_optimaux"],
+                       "parametres": ["correspondances", "candidats_arma"], "fonction": _selection_arma},
+}
+
+
+def required_stages(cibles, etapes=ETAPES):
+    """ Étapes cibles et toutes leurs étapes amont, dans l'ordre de etapes. """
+    requises = set()
+    pile = list(cibles)
+    while pile:
+        etape = pile.pop()
+        if etape not in etapes:
+            raise ValueError(f"Étape inconnue : {etape}")
+        if etape not in requises:
+            requises.add(etape)
+            pile.extend(etapes[etape]["entrees"])
+    return [e for e in etapes if e in requises]
+
+
+def stage_key(etape, parametres, contenus_entrees, empreinte=None):
+    """
+    Clé de cache d'une étape : hachage de son nom, de ses paramètres déclarés,
+    du contenu de ses entrées (hachage du parquet des étapes amont) et de
+    l'empreinte des données externes.
+    """
+    description = {"etape": etape, "parametres": parametres, "entrees": contenus_entrees,
+                   "empreinte": empreinte}
+    texte = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(texte.encode("utf-8")).hexdigest()
+
+
+def _to_parquet_bytes(df):
+    tampon = io.BytesIO()
+    df.to_parquet(tampon, index=False)
+    return tampon.getvalue()
+
+
+def run_pipeline(cibles=None, parametres=None, fs=None, cache_fs=None, cache_path=DEFAULT_CACHE_PATH,
+                 provider=yfinance_provider, prix_cache_path=PRIX_CACHE_PATH, n_workers=4, n_processus=1,
+                 forcer=(), etapes=ETAPES):
+    """
+    Exécute les étapes nécessaires aux cibles. La sortie de chaque étape est
+    un parquet du cache, indexé par stage_key : une étape n'est recalculée
+    que si ses paramètres, le contenu de ses entrées ou les données externes
+    ont changé. Une entrée recalculée à l'identique n'invalide pas l'aval.
+    Les étapes indépendantes (ex. prix et comptages sectoriels) s'exécutent
+    dans des threads, dès que leurs entrées sont prêtes ; les sorties en
+    cache ne sont relues que si une étape aval doit être recalculée. Une
+    sortie incomplète (cours manquants pour prix) n'est pas mise en cache.
+    Args:
+        cibles (list): Étapes demandées (toutes par défaut).
+        parametres (dict): Remplace les valeurs de PARAMETRES.
+        fs: Système de fichiers du dataset des brevets (s3fs ou compatible fsspec).
+        cache_fs: Système de fichiers du cache (local par défaut).
+        cache_path (str): Dossier du cache (un parquet par étape et par clé, _manifest.json).
+        provider: Fournisseur des cours (voir prix.load_prices).
+        prix_cache_path (str): Cache local des cours de prix.load_prices.
+        n_workers (int): Étapes exécutées en même temps.
+        n_processus (int): Processus de la sélection ARMA.
+        forcer (list): Étapes recalculées même si leur clé est en cache.
+        etapes (dict): Définition des étapes (ETAPES par défaut).
+    Returns:
+        dict: Étape cible -> DataFrame.
+        pd.DataFrame: Journal (etape, statut "cache" ou "calcul", cle, lignes, duree_s).
+    """
+    parametres = {**PARAMETRES, **(parametres or {})}
+    cache_fs = cache_fs or fsspec.filesystem("file")
+    contexte = {"fs": fs or fsspec.filesystem("file"), "provider": provider,
+                "prix_cache_path": prix_cache_path, "n_processus": n_processus}
+    cibles = list(cibles or etapes)
+    requises = required_stages(cibles, etapes)
+
+    cache_fs.makedirs(cache_path, exist_ok=True)
+    manifest_path = f"{cache_path}/{MANIFEST_NAME}"
+    manifest = load_manifest(cache_fs, manifest_path)
+    verrou = threading.Lock()
+    cles, contenus, sorties, journal = {}, {}, {}, []
+
+    def lire(etape):
+        with verrou:
+            if etape in sorties:
+                return sorties[etape]
+            fichier = manifest[etape][cles[etape]]["fichier"]
+        with cache_fs.open(fichier, "rb") as f:
+            df = pd.read_parquet(f)
+        with verrou:
+            return sorties.setdefault(etape, df)
+
+    def calculer(etape):
+        debut = time.perf_counter()
+        definition = etapes[etape]
+        entrees = {e: lire(e) for e in definition["entrees"]}
+        valeurs = {p: parametres[p] for p in definition["parametres"]}
+        df = definition["fonction"](entrees, valeurs, contexte)
+        donnees = _to_parquet_bytes(df)
+        contenu = hashlib.sha256(donnees).hexdigest()
+        if "conserver" in definition and not definition["conserver"](df):
+            logger.warning("Sortie incomplète de l'étape %s, non mise en cache", etape,
+                           extra={"champs": {"evenement": "etape_non_conservee", "etape": etape}})
+            return df, contenu, time.perf_counter() - debut
+        fichier = f"{cache_path}/{etape}-{cles[etape][:16]}.parquet"
+        with cache_fs.open(fichier + ".tmp", "wb") as f:
+            f.write(donnees)
+        cache_fs.mv(fichier + ".tmp", fichier)
+        with verrou:
+            manifest.setdefault(etape, {})[cles[etape]] = {
+                "contenu": contenu, "fichier": fichier, "lignes": len(df),
+                "cree": pd.Timestamp.now().isoformat(timespec="seconds")}
+            save_manifest(cache_fs, manifest_path, manifest)
+        return df, contenu, time.perf_counter() - debut
+
+    restantes = list(requises)
+    en_cours = {}
+    with ThreadPoolExecutor(max_workers=max(1, n_workers)) as pool:
+        while restantes or en_cours:
+            for etape in [e for e in restantes if all(d in contenus for d in etapes[e]["entrees"])]:
+                restantes.remove(etape)
+                definition = etapes[etape]
+                empreinte = definition["empreinte"](parametres, contexte) if "empreinte" in definition else None
+                cles[etape] = stage_key(etape, {p: parametres[p] for p in definition["parametres"]},
+                                        [contenus[d] for d in definition["entrees"]], empreinte)
+                entree = manifest.get(etape, {}).get(cles[etape])
+                if entree and etape not in forcer and cache_fs.exists(entree["fichier"]):
+                    contenus[etape] = entree["contenu"]
+                    journal.append({"etape": etape, "statut": "cache", "cle": cles[etape][:16],
+                                    "lignes": entree["lignes"], "duree_s": 0.0})
+                else:
+                    en_cours[pool.submit(calculer, etape)] = etape
+            if not en_cours:
+                continue
+            terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for future in terminees:
+                etape = en_cours.pop(future)
+                df, contenu, duree = future.result()
+                with verrou:
+                    sorties[etape] = df
+                contenus[etape] = contenu
+                journal.append({"etape": etape, "statut": "calcul", "cle": cles[etape][:16],
+                                "lignes": len(df), "duree_s": duree})
+
+    resultats = {etape: lire(etape) for etape in cibles}
+    ordre = {etape: i for i, etape in enumerate(requises)}
+    journal = pd.DataFrame(journal, columns=["etape", "statut", "cle", "lignes", "duree_s"])
+    journal = journal.sort_values("etape", key=lambda s: s.map(ordre)).reset_index(drop=True)
+    return resultats, journal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scripts.pipeline",
+        description="Chaîne brevets -> secteurs -> rendements -> régressions -> ARMA, avec cache par étape.")
+    parser.add_argument("cibles", nargs="*", help=f"Étapes demandées parmi : {', '.join(ETAPES)}")
+    parser.add_argument("--dataset-path", default=PARAMETRES["dataset_path"])
+    parser.add_argument("--endpoint-url", default=None,
+                        help="Endpoint S3 du dataset (ex. https://minio.lab.sspcloud.fr) ; local sinon")
+    parser.add_argument("--parametres", default=None,
+                        help="Fichier JSON remplaçant des paramètres (ex. secteurs, lags_a_tester)")
+    parser.add_argument("--prix", default=None,
+                        help="Fichier de cours hors ligne (CSV ou parquet) au lieu de Yahoo Finance")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--forcer", nargs="*", default=[], help="Étapes recalculées sans tenir compte du cache")
+    parser.add_argument("--n-workers", type=int, default=4)
+    parser.add_argument("--n-processus", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    parametres = {"dataset_path": args.dataset_path}
+    if args.parametres:
+        with open(args.parametres, encoding="utf-8") as f:
+            parametres.update(json.load(f))
+    if args.endpoint_url:
+        import s3fs
+        fs = s3fs.S3FileSystem(client_kwargs={"endpoint_url": args.endpoint_url})
+    else:
+        fs = fsspec.filesystem("file")
+    provider = fixture_provider(args.prix) if args.prix else yfinance_provider
+
+    resultats, journal = run_pipeline(args.cibles or None, parametres, fs=fs, cache_path=args.cache,
+                                      provider=provider, n_workers=args.n_workers,
+                                      n_processus=args.n_processus, forcer=args.forcer)
+    print(journal.to_string(index=False))
+    if "lags_optimaux" in resultats:
+        print(resultats["lags_optimaux"][["Secteur", "Lag_mois", "R²", "P-value", "Significatif"]]
+              .to_string(index=False))
+    if "selection_arma" in resultats:
+        retenus = resultats["selection_arma"]
+        print(retenus[retenus["Retenu"]][["Secteur", "Modèle", "BIC"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+def build_weight_matrix(portefeuilles, ponderations_speciales=None, tickers=None):
+    """
+    Matrice des poids (portefeuilles x tickers), chaque ligne sommant à 1.
+    Args:
+        portefeuilles (dict): Portefeuille -> liste de tickers.
+        ponderations_speciales (dict): Ticker -> poids brut (appliqué dans tous
+            les portefeuilles qui contiennent le ticker), ou portefeuille ->
+            {ticker: poids} pour un seul portefeuille. Les autres tickers valent 1.
+        tickers (list): Colonnes de la matrice (tickers des portefeuilles par défaut).
+    Returns:
+        pd.DataFrame: Poids normalisés, 0 pour les tickers hors portefeuille.
+    """
+    ponderations_speciales = ponderations_speciales or {}
+    if tickers is None:
+        tickers = list(dict.fromkeys(t for membres in portefeuilles.values() for t in membres))
+    position = {ticker: j for j, ticker in enumerate(tickers)}
+    weights = np.zeros((len(portefeuilles), len(tickers)))
+    for i, (nom, membres) in enumerate(portefeuilles.items()):
+        speciales = ponderations_speciales.get(nom)
+        if not isinstance(speciales, dict):
+            speciales = {t: w for t, w in ponderations_speciales.items() if not isinstance(w, dict)}
+        for ticker in membres:
+            if ticker in position:
+                weights[i, position[ticker]] = speciales.get(ticker, 1.0)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    return pd.DataFrame(weights, index=list(portefeuilles), columns=tickers)
+
+
+def _anchor_rows(dates, reequilibrage):
+    """
+    Ligne de référence de chaque date : dernière date de rééquilibrage
+    (fin de chaque période `reequilibrage`) antérieure à la date.
+    """
+    rows = pd.Series(np.arange(len(dates)), index=pd.DatetimeIndex(dates))
+    rebalance = np.sort(rows.resample(reequilibrage).last().dropna().to_numpy().astype(np.int64))
+    previous = np.searchsorted(rebalance, np.arange(len(dates)) - 1, side="right") - 1
+    return np.where(previous >= 0, rebalance[np.maximum(previous, 0)], -1)
+
+
+def portfolio_returns(prices, weights, reequilibrage=None, kinds=("log",)):
+    """
+    Rendements de tous les portefeuilles en un produit matriciel.
+    Sans rééquilibrage, la valeur d'un portefeuille est la moyenne pondérée
+    des prix (règle du notebook). Avec `reequilibrage` (ex. "QE", "YE"),
+    les poids s'appliquent aux valeurs et sont rétablis à la fin de chaque
+    période. Le rendement entre t-1 et t ne porte que sur les tickers cotés
+    aux deux dates (et à la date de rééquilibrage), les poids étant
+    renormalisés sur ces tickers.
+    Args:
+        prices (pd.DataFrame): Colonne Date puis une colonne de prix par ticker.
+        weights (pd.DataFrame): Sortie de build_weight_matrix.
+        reequilibrage (str): Fréquence pandas de rééquilibrage, None pour aucune.
+        kinds (tuple): "log" (return_log_<portefeuille>) et/ou "simple" (return_<portefeuille>).
+    Returns:
+        pd.DataFrame: Colonne Date puis les rendements de chaque portefeuille.
+    """
+    tickers = [t for t in weights.columns if t in prices.columns]
+    w = weights[tickers].to_numpy(dtype="float64")
+    p = prices[tickers].to_numpy(dtype="float64")
+    available = ~np.isnan(p)
+
+    previous = np.full_like(p, np.nan)
+    previous[1:] = p[:-1]
+    valid = available & np.roll(available, 1, axis=0)
+    valid[0] = False
+    if reequilibrage is None:
+        anchor = np.ones_like(p)
+    else:
+        anchor_rows = _anchor_rows(prices["Date"], reequilibrage)
+        anchor = np.where(anchor_rows[:, None] >= 0, p[np.maximum(anchor_rows, 0)], np.nan)
+        valid &= ~np.isnan(anchor)
+
+    numerator = np.where(valid, p / anchor, 0.0) @ w.T
+    denominator = np.where(valid, previous / anchor, 0.0) @ w.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(denominator > 0, numerator / denominator, np.nan)
+
+    result = prices[["Date"]].copy()
+    columns = {}
+    for kind in kinds:
+        values = np.log(ratio) if kind == "log" else ratio - 1
+        prefix = "return_log_" if kind == "log" else "return_"
+        for i, nom in enumerate(weights.index):
+            columns[f"{prefix}{nom}"] = values[:, i]
+    return pd.concat([result, pd.DataFrame(columns, index=result.index)], axis=1)
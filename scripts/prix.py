@@ -0,0 +1,243 @@
+import json
+import logging
+
+import fsspec
+import pandas as pd
+
+PRICES_NAME = "prix.parquet"
+COVERAGE_NAME = "couverture.json"
+DEFAULT_CACHE_PATH = "cache/prix"
+# Clé de couverture.json des tentatives sans cours (ticker -> [début, fin, date de la tentative])
+EMPTY_KEY = "_vides"
+EMPTY_RETRY_DAYS = 7
+
+logger = logging.getLogger(__name__)
+
+
+def yfinance_provider(tickers, debut, fin, suffix=".PA"):
+    """
+    Cours de clôture journaliers sur Yahoo Finance (tickers Euronext Paris).
+    Args:
+        tickers (list): Tickers sans suffixe (ex. "OR").
+        debut, fin (pd.Timestamp): Période [debut, fin), fin exclue comme yf.download.
+        suffix (str): Suffixe de place ajouté pour Yahoo.
+    Returns:
+        pd.DataFrame: Format long (Date, ticker, close).
+    """
+    import yfinance as yf
+
+    data_yahoo = yf.download([f"{t}{suffix}" for t in tickers], start=debut.strftime("%Y-%m-%d"),
+                             end=fin.strftime("%Y-%m-%d"), progress=False)
+    if data_yahoo is None or data_yahoo.empty:
+        return _empty_prices()
+    prices = data_yahoo["Close"]
+    if isinstance(prices, pd.Series):
+        prices = prices.to_frame(name=f"{tickers[0]}{suffix}")
+    prices.columns = [col[:-len(suffix)] if suffix and col.endswith(suffix) else col
+                      for col in prices.columns]
+    return _to_long(prices)
+
+
+def fixture_provider(path, fs=None):
+    """
+    Fournisseur hors ligne lisant un fichier CSV ou parquet, au format large
+    (Date + une colonne par ticker) ou long (Date, ticker, close).
+    Retourne une fonction utilisable à la place de yfinance_provider.
+    """
+    fs = fs or fsspec.filesystem("file")
+    with fs.open(path, "rb") as f:
+        data = pd.read_parquet(f) if path.endswith(".parquet") else pd.read_csv(f)
+    data["Date"] = pd.to_datetime(data["Date"])
+    if "ticker" not in data.columns:
+        data = _to_long(data.set_index("Date"))
+
+    def provider(tickers, debut, fin):
+        mask = data["ticker"].isin(tickers) & (data["Date"] >= debut) & (data["Date"] < fin)
+        return data.loc[mask, ["Date", "ticker", "close"]]
+    return provider
+
+
+def _empty_prices():
+    return pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"),
+                         "ticker": pd.Series(dtype="string"),
+                         "close": pd.Series(dtype="float64")})
+
+
+def _to_long(prices):
+    """ Prix au format large (index Date) -> format long sans valeurs manquantes. """
+    prices = prices.copy()
+    prices.index.name = "Date"
+    prices.columns.name = "ticker"
+    long = prices.stack().dropna().rename("close").reset_index()
+    long["ticker"] = long["ticker"].astype("string")
+    long["Date"] = long["Date"].astype("datetime64[ns]")
+    return long[["Date", "ticker", "close"]]
+
+
+def missing_ranges(intervals, debut, fin):
+    """
+    Sous-périodes de [debut, fin) non couvertes par `intervals`
+    (liste de couples [début, fin) au format ISO).
+    """
+    missing = []
+    current = debut
+    for start, end in sorted((pd.Timestamp(a), pd.Timestamp(b)) for a, b in intervals):
+        if end <= current:
+            continue
+        if start >= fin:
+            break
+        if start > current:
+            missing.append((current, start))
+        current = max(current, end)
+    if current < fin:
+        missing.append((current, fin))
+    return missing
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _read_cache(fs, cache_path):
+    prices_path = f"{cache_path}/{PRICES_NAME}"
+    coverage_path = f"{cache_path}/{COVERAGE_NAME}"
+    if fs.exists(prices_path):
+        with fs.open(prices_path, "rb") as f:
+            cache = pd.read_parquet(f)
+    else:
+        cache = _empty_prices()
+    coverage = {}
+    if fs.exists(coverage_path):
+        with fs.open(coverage_path, "r") as f:
+            coverage = json.load(f)
+    return cache, coverage
+
+
+def _write_cache(fs, cache_path, cache, coverage):
+    """ Écrit les prix puis la couverture, chacun via un fichier temporaire renommé. """
+    fs.makedirs(cache_path, exist_ok=True)
+    prices_path = f"{cache_path}/{PRICES_NAME}"
+    coverage_path = f"{cache_path}/{COVERAGE_NAME}"
+    with fs.open(prices_path + ".tmp", "wb") as f:
+        cache.to_parquet(f, index=False)
+    fs.mv(prices_path + ".tmp", prices_path)
+    with fs.open(coverage_path + ".tmp", "w") as f:
+        json.dump(coverage, f, indent=1, sort_keys=True)
+    fs.mv(coverage_path + ".tmp", coverage_path)
+
+
+def load_prices(tickers, debut, fin, provider=yfinance_provider, fs=None,
+                cache_path=DEFAULT_CACHE_PATH, relance_vides_jours=EMPTY_RETRY_DAYS):
+    """
+    Cours de clôture journaliers, servis depuis un cache parquet local.
+    Seules les périodes jamais obtenues sont téléchargées, en un appel
+    au fournisseur par groupe de tickers partageant la même période manquante.
+    Une période n'est marquée couverte que pour les tickers dont le
+    fournisseur a renvoyé des cours. Pour les autres (radiés, pas encore
+    cotés, limite de débit), la tentative est notée et la période n'est
+    redemandée qu'après relance_vides_jours ; après une erreur du
+    fournisseur, elle l'est dès l'appel suivant.
+    Args:
+        tickers (list): Tickers sans suffixe.
+        debut, fin (str ou Timestamp): Période [debut, fin), fin exclue.
+        provider: Fonction (tickers, debut, fin) -> DataFrame long (Date, ticker, close),
+            ex. yfinance_provider ou fixture_provider(...) ; None pour le cache seul.
+        fs: Système de fichiers du cache (local par défaut).
+        cache_path (str): Dossier du cache (prix.parquet et couverture.json).
+        relance_vides_jours (int): Délai avant de redemander une période restée sans cours.
+    Returns:
+        pd.DataFrame: Colonne Date puis une colonne par ticker disponible ;
+            attrs["tickers_manquants"] liste les tickers dont la période
+            (jusqu'à aujourd'hui) n'est pas entièrement couverte par le cache.
+    """
+    fs = fs or fsspec.filesystem("file")
+    debut, fin = pd.Timestamp(debut), pd.Timestamp(fin)
+    cache, coverage = _read_cache(fs, cache_path)
+    today = pd.Timestamp.today().normalize()
+    limite = today - pd.Timedelta(days=relance_vides_jours)
+    vides = {}
+    for ticker, tentatives in coverage.pop(EMPTY_KEY, {}).items():
+        recentes = [v for v in tentatives if pd.Timestamp(v[2]) > limite]
+        if recentes:
+            vides[ticker] = recentes
+
+    # Regrouper les tickers qui ont exactement les mêmes périodes manquantes
+    batches = {}
+    for ticker in dict.fromkeys(tickers):
+        tentees = [v[:2] for v in vides.get(ticker, [])]
+        gaps = tuple(missing_ranges(coverage.get(ticker, []) + tentees, debut, fin))
+        if gaps:
+            batches.setdefault(gaps, []).append(ticker)
+
+    if batches and provider is None:
+        absents = sorted(t for batch in batches.values() for t in batch)
+        logger.warning("Prix absents du cache pour %s tickers", len(absents),
+                       extra={"champs": {"evenement": "prix_absents_cache", "tickers": absents}})
+    elif batches:
+        fetched = [cache]
+        sans_donnees = set()
+        for gaps, batch in batches.items():
+            for start, end in gaps:
+                erreur = False
+                try:
+                    prix = provider(batch, start, end)
+                except Exception as e:
+                    erreur = True
+                    logger.warning("Échec du téléchargement de %s tickers (%s - %s) : %s", len(batch),
+                                   f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}", e,
+                                   extra={"champs": {"evenement": "erreur_telechargement", "tickers": batch,
+                                                     "debut": start.isoformat(), "fin": end.isoformat(),
+                                                     "erreur": str(e)}})
+                    prix = _empty_prices()
+                # yfinance renvoie une colonne vide pour un ticker radié ou limité en débit
+                prix = prix.dropna(subset=["close"])
+                fetched.append(prix)
+                # Une période future n'est pas marquée couverte : elle sera redemandée
+                covered_end = min(end, today)
+                if covered_end <= start:
+                    continue
+                # Ticker sans aucune ligne : la période reste manquante, sauf si elle
+                # ne contient aucun jour ouvré (week-end)
+                recus = set(prix["ticker"].unique())
+                if not len(pd.bdate_range(start, covered_end, inclusive="left")):
+                    recus = set(batch)
+                for ticker in (t for t in batch if t not in recus):
+                    sans_donnees.add(ticker)
+                    if not erreur:
+                        vides.setdefault(ticker, []).append(
+                            [start.isoformat(), covered_end.isoformat(), today.isoformat()])
+                for ticker in (t for t in batch if t in recus):
+                    intervals = [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in coverage.get(ticker, [])]
+                    intervals.append((start, covered_end))
+                    coverage[ticker] = [[a.isoformat(), b.isoformat()]
+                                        for a, b in _merge_intervals(intervals)]
+        cache = pd.concat([f for f in fetched if len(f)] or [_empty_prices()], ignore_index=True)
+        cache = (cache.drop_duplicates(subset=["ticker", "Date"], keep="last")
+                 .sort_values(["ticker", "Date"]).reset_index(drop=True))
+        _write_cache(fs, cache_path, cache, {**coverage, EMPTY_KEY: vides} if vides else coverage)
+        if sans_donnees:
+            logger.warning("Aucun cours reçu pour %s tickers, période non marquée couverte : %s",
+                           len(sans_donnees), ", ".join(sorted(sans_donnees)),
+                           extra={"champs": {"evenement": "prix_non_recus", "tickers": sorted(sans_donnees)}})
+
+    mask = cache["ticker"].isin(tickers) & (cache["Date"] >= debut) & (cache["Date"] < fin)
+    prices = cache[mask].pivot(index="Date", columns="ticker", values="close")
+    prices = prices[[t for t in dict.fromkeys(tickers) if t in prices.columns]]
+    prices = prices.reset_index()
+    prices.columns.name = None
+    prices.attrs["tickers_manquants"] = [
+        t for t in dict.fromkeys(tickers)
+        if any(len(pd.bdate_range(a, b, inclusive="left"))
+               for a, b in missing_ranges(coverage.get(t, []), debut, min(fin, today)))]
+    return prices
+
+
+def monthly_close(prices):
+    """ Dernier cours de chaque mois (Date en fin de mois), comme resample("ME").last(). """
+    return prices.set_index("Date").resample("ME").last().reset_index()
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def lag_matrix(values, lags):
+    """
+    Décalages d'une ou plusieurs séries en un seul tableau.
+    Args:
+        values (np.ndarray): Séries (T,) ou (T, S).
+        lags (list): Retards en périodes (0 à 36 mois par exemple).
+    Returns:
+        np.ndarray: (len(lags), T, ...) avec NaN sur les premières périodes,
+            comme Series.shift(lag).
+    """
+    values = np.asarray(values, dtype="float64")
+    lagged = np.full((len(lags),) + values.shape, np.nan)
+    for i, lag in enumerate(lags):
+        if lag == 0:
+            lagged[i] = values
+        elif lag < len(values):
+            lagged[i, lag:] = values[:-lag]
+    return lagged
+
+
+def _compress(mask, *arrays):
+    """
+    Place les observations valides en tête de l'axe du temps (axe -2) en
+    conservant leur ordre, comme un dropna. Les positions libérées valent 0.
+    """
+    order = np.argsort(~mask, axis=-2, kind="stable")
+    compressed = [np.take_along_axis(np.where(mask, a, 0.0), order, axis=-2) for a in arrays]
+    return compressed
+
+
+def ols_lag_scan(x, y, lags, hac_maxlags=None, use_correction=False):
+    """
+    Régressions y_t = α + β x_{t-lag} pour chaque retard et chaque série,
+    en forme fermée sur des sommes vectorisées (une ligne par observation
+    où x retardé et y sont tous deux renseignés).
+    Args:
+        x (np.ndarray): Régresseurs (T, S), ex. croissance des brevets par secteur.
+        y (np.ndarray): Variables expliquées (T, S), ex. rendements des portefeuilles.
+        lags (list): Retards testés.
+        hac_maxlags (int): Si renseigné, écarts-types de Newey-West (noyau de
+            Bartlett) avec ce nombre de retards et p-values de loi normale,
+            comme OLS.fit(cov_type="HAC") de statsmodels.
+        use_correction (bool): Correction n / (n - 2) de la matrice HAC.
+    Returns:
+        dict: Tableaux (len(lags), S) : n, beta, alpha, r2, std_error, p_value.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    if x.ndim == 1:
+        x, y = x[:, None], y[:, None]
+    xl = lag_matrix(x, lags)
+    yl = np.broadcast_to(y, xl.shape)
+    mask = np.isfinite(xl) & np.isfinite(yl)
+    xm, ym = np.where(mask, xl, 0.0), np.where(mask, yl, 0.0)
+
+    n = mask.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = xm.sum(axis=1) / n
+        mean_y = ym.sum(axis=1) / n
+        dx = np.where(mask, xl - mean_x[:, None], 0.0)
+        dy = np.where(mask, yl - mean_y[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+
+        beta = sxy / sxx
+        alpha = mean_y - beta * mean_x
+        r2 = sxy * sxy / (sxx * syy)
+        ssr = np.maximum(syy - beta * sxy, 0.0)
+        std_error = np.sqrt(ssr / (n - 2) / sxx)
+        if hac_maxlags is None:
+            t_stat = beta / std_error
+            p_value = 2 * stats.t.sf(np.abs(t_stat), n - 2)
+        else:
+            std_error = _hac_std_error(mask, xl, yl, n, mean_x, sxx, beta, alpha,
+                                       hac_maxlags, use_correction)
+            p_value = 2 * stats.norm.sf(np.abs(beta / std_error))
+    too_small = n < 3
+    for values in (beta, alpha, r2, std_error, p_value):
+        values[too_small] = np.nan
+    return {"n": n, "beta": beta, "alpha": alpha, "r2": r2,
+            "std_error": std_error, "p_value": p_value}
+
+
+def _hac_std_error(mask, xl, yl, n, mean_x, sxx, beta, alpha, maxlags, use_correction):
+    """ Écart-type de Newey-West de β sur les séries compressées (après dropna). """
+    residuals = np.where(mask, yl - alpha[:, None] - beta[:, None] * xl, 0.0)
+    e, xe = _compress(mask, residuals, residuals * xl)
+    scores = (e, xe)
+
+    def gamma(a, b, j):
+        if j == 0:
+            return (scores[a] * scores[b]).sum(axis=1)
+        return (scores[a][:, j:] * scores[b][:, :-j]).sum(axis=1)
+
+    s = {}
+    for a, b in ((0, 0), (0, 1), (1, 1)):
+        s[a, b] = gamma(a, b, 0)
+        for j in range(1, maxlags + 1):
+            weight = 1 - j / (maxlags + 1)
+            s[a, b] = s[a, b] + weight * (gamma(a, b, j) + gamma(b, a, j))
+    # Ligne de β dans (X'X)^-1 : [-Σx, n] / det, avec det = n * sxx
+    det = n * sxx
+    h0 = -(mean_x * n) / det
+    h1 = n / det
+    variance = h0 * h0 * s[0, 0] + 2 * h0 * h1 * s[0, 1] + h1 * h1 * s[1, 1]
+    if use_correction:
+        variance = variance * n / (n - 2)
+    return np.sqrt(variance)
+
+
+def scan_lags(data_complete, correspondances, lags, hac_maxlags=None, seuil=0.05):
+    """
+    Tableau df_tous_resultats du notebook : une régression du rendement du
+    portefeuille sur la croissance des brevets retardée, par secteur et par retard.
+    Args:
+        data_complete (pd.DataFrame): Colonnes croiss_log_brevets_<secteur>
+            et return_log_<portefeuille>.
+        correspondances (dict): Secteur -> portefeuille.
+        lags (list): Retards testés (en mois).
+        hac_maxlags (int): Voir ols_lag_scan.
+        seuil (float): Seuil de significativité.
+    Returns:
+        pd.DataFrame: Secteur, Lag_mois, N_obs, Coefficient_β, Constante_α, R²,
+            P-value, Std_Error, Significatif.
+    """
+    secteurs = [s for s, pf in correspondances.items()
+                if f"croiss_log_brevets_{s}" in data_complete.columns
+                and f"return_log_{pf}" in data_complete.columns]
+    x = data_complete[[f"croiss_log_brevets_{s}" for s in secteurs]].to_numpy(dtype="float64")
+    y = data_complete[[f"return_log_{correspondances[s]}" for s in secteurs]].to_numpy(dtype="float64")
+    res = ols_lag_scan(x, y, lags, hac_maxlags)
+
+    # Ordre du notebook : secteur par secteur, puis retard par retard
+    df_tous_resultats = pd.DataFrame({
+        "Secteur": np.repeat(secteurs, len(lags)),
+        "Lag_mois": np.tile(np.asarray(lags, dtype=np.int64), len(secteurs)),
+        "N_obs": res["n"].T.ravel(),
+        "Coefficient_β": res["beta"].T.ravel(),
+        "Constante_α": res["alpha"].T.ravel(),
+        "R²": res["r2"].T.ravel(),
+        "P-value": res["p_value"].T.ravel(),
+        "Std_Error": res["std_error"].T.ravel(),
+    })
+    df_tous_resultats["Significatif"] = np.where(df_tous_resultats["P-value"] < seuil, "Oui", "Non")
+    return df_tous_resultats
+
+
+def select_optimal_lags(df_tous_resultats, seuil=0.05):
+    """
+    Lag optimal par secteur (df_lags_optimaux) : meilleur R² parmi les
+    retards significatifs, ou meilleur R² tout court si aucun ne l'est.
+    Les secteurs sans aucune régression estimable sont ignorés.
+    """
+    lignes = []
+    for _, df_secteur in df_tous_resultats.groupby("Secteur", sort=False):
+        df_significatif = df_secteur[df_secteur["P-value"] < seuil]
+        candidats = df_significatif if len(df_significatif) > 0 else df_secteur
+        if candidats["R²"].notna().any():
+            lignes.append(candidats["R²"].idxmax())
+    return df_tous_resultats.loc[lignes]